@@ -140,7 +140,26 @@ export default async function AdminPage({
           s.consented_at,
           s.state_json->>'participantName' as participant_name,
           s.state_json->'game'->>'game_state' as game_state,
-          s.state_json as state_json,
+          -- 설명/토론 기록은 session_transcript에 따로 저장되므로 (transcript: "table") 다시 채워서 보여준다
+          case when s.state_json->'game'->>'transcript' = 'table' then
+            jsonb_set(
+              jsonb_set(
+                s.state_json,
+                '{game,descriptions}',
+                coalesce((
+                  select jsonb_object_agg(t.name, t.text order by t.id)
+                  from session_transcript t
+                  where t.session_id = s.session_id and t.kind = 'descriptions'
+                ), '{}'::jsonb)
+              ),
+              '{game,discussions}',
+              coalesce((
+                select jsonb_agg(t.text order by t.id)
+                from session_transcript t
+                where t.session_id = s.session_id and t.kind = 'discussions'
+              ), '[]'::jsonb)
+            )
+          else s.state_json end as state_json,
           coalesce(e.event_count, 0) as event_count,
           e.last_ts
         from sessions s
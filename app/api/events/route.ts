@@ -8,14 +8,14 @@ export async function POST(req: Request) {
     return NextResponse.json({ error: "Missing sessionId/type" }, { status: 400 });
   }
 
-  const ts = body.ts ?? new Date().toISOString();
-  const payload = body.payload ?? {};
+  // ts는 서버 시각으로 기록 (브라우저 시계가 틀리면 ts 순 조회/재생이 어긋남). 클라이언트 시각은 payload.clientTs로 보관
+  const payload = body.ts ? { ...(body.payload ?? {}), clientTs: body.ts } : (body.payload ?? {});
 
   await sql`
     insert into events (session_id, ts, type, payload)
     values (
       ${body.sessionId}::uuid,
-      ${ts}::timestamptz,
+      now(),
       ${body.type},
       ${JSON.stringify(payload)}::jsonb
     )
@@ -0,0 +1,14 @@
+import { NextResponse } from "next/server";
+
+export async function GET(req: Request) {
+  const base = process.env.GAME_BACKEND_URL;
+  if (!base) return NextResponse.json({ error: "Missing GAME_BACKEND_URL" }, { status: 500 });
+
+  // sessionId / after 쿼리를 그대로 전달
+  const { search } = new URL(req.url);
+
+  const r = await fetch(`${base}/game/poll${search}`, { cache: "no-store" });
+
+  const text = await r.text();
+  return new NextResponse(text, { status: r.status, headers: { "Content-Type": "application/json" } });
+}
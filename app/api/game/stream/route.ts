@@ -0,0 +1,23 @@
+import { NextResponse } from "next/server";
+
+export async function POST(req: Request) {
+  const base = process.env.GAME_BACKEND_URL;
+  if (!base) return NextResponse.json({ error: "Missing GAME_BACKEND_URL" }, { status: 500 });
+
+  const body = await req.json().catch(() => ({}));
+
+  const r = await fetch(`${base}/game/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+
+  // SSE 본문을 버퍼링 없이 그대로 전달
+  return new Response(r.body, {
+    status: r.status,
+    headers: {
+      "Content-Type": r.headers.get("Content-Type") ?? "text/event-stream",
+      "Cache-Control": "no-cache",
+    },
+  });
+}
@@ -41,6 +41,12 @@ function sleep(ms: number) {
   return new Promise((r) => setTimeout(r, ms))
 }
 
+// 큐 모드(AI_WORKER_MODE=queue) 진행 확인 주기 / 최대 횟수
+const POLL_INTERVAL_MS = 1000
+const POLL_MAX_ATTEMPTS = 180
+// 입력이 이만큼 멈추면 추측 생성 요청
+const SPECULATE_DEBOUNCE_MS = 700
+
 export default function PlayPage() {
   const router = useRouter()
 
@@ -70,6 +76,10 @@ export default function PlayPage() {
   const [minimizedFinalVote, setMinimizedFinalVote] = useState(false)
 
   const pumpingRef = useRef(false)
+  // /game/poll에서 이어 받을 위치 (pending 응답의 cursor)
+  const pollCursorRef = useRef<number | null>(null)
+  // 마지막 서버 응답이 워커 진행 중(pending)이었는지 (큐 모드)
+  const pendingRef = useRef(false)
 
   const hasVotedRef = useRef(false)
   const pendingPostVotePumpRef = useRef(false)
@@ -270,6 +280,9 @@ export default function PlayPage() {
     setPublicState(data.publicState)
     setPrivateState(data.privateState)
     setUiNeed(data.ui?.need ?? null)
+    // 이미 이어 받던 위치가 있으면 그대로 (그 사이 워커가 남긴 메시지를 건너뛰지 않도록)
+    if (data.cursor != null && pollCursorRef.current == null) pollCursorRef.current = data.cursor
+    pendingRef.current = data.pending === true
 
     if (Array.isArray(data.messages) && data.messages.length) {
       let msgs = data.messages as any[]
@@ -335,6 +348,126 @@ export default function PlayPage() {
     return data
   }
 
+  // 토큰 스트리밍 중인 AI 발화 (name -> 임시 메시지 id)
+  const draftIdsRef = useRef<Record<string, string>>({})
+
+  function appendDraftToken(name: string, delta: string) {
+    if (!name || !delta) return
+    const existing = draftIdsRef.current[name]
+    if (existing) {
+      setMessages((prev) => prev.map((m) => (m.id === existing ? { ...m, content: m.content + delta } : m)))
+      return
+    }
+    const id = `draft-${Date.now()}-${Math.random().toString(16).slice(2)}`
+    draftIdsRef.current[name] = id
+    setMessages((prev) => [...prev, { id, sender: "ai", name, content: delta, timestamp: new Date() }])
+  }
+
+  // 완성된 메시지가 오면 같은 이름의 임시 메시지를 최종 문장으로 교체. 교체했으면 true
+  function finalizeDraft(m: ApiMsg, isDescription: boolean) {
+    const id = m.name ? draftIdsRef.current[m.name] : undefined
+    if (!id) return false
+    delete draftIdsRef.current[m.name]
+    setMessages((prev) => prev.map((x) => (x.id === id ? { ...x, id: id.replace("draft-", ""), content: m.content } : x)))
+    if (isDescription) upsertDescription(m.name, m.content)
+    return true
+  }
+
+  // 최종 문장이 오지 않은 임시 메시지 제거 (요청 마감으로 끊긴 턴은 다음 요청에서 다시 생성됨)
+  function discardDrafts() {
+    const ids = new Set(Object.values(draftIdsRef.current))
+    if (ids.size === 0) return
+    draftIdsRef.current = {}
+    setMessages((prev) => prev.filter((m) => !ids.has(m.id)))
+  }
+
+  /**
+   * ✅ SSE로 AI 턴을 요청 하나에서 끝까지 받기
+   * - token 이벤트: 생성 중인 AI 발화를 임시 메시지로 바로 표시
+   * - message 이벤트: 임시 메시지를 최종 문장으로 교체 (없으면 화면 큐에 추가)
+   * - state 이벤트: 최종 상태 반영 (메시지는 이미 받았으므로 제외)
+   * - 스트림을 쓸 수 없으면 null → 기존 noop 반복으로 대체
+   */
+  async function callStream(): Promise<any | null> {
+    if (!sessionId) return null
+
+    let res: Response
+    try {
+      res = await fetch("/api/game/stream", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ sessionId, action: { type: "noop" } }),
+      })
+    } catch {
+      return null
+    }
+    if (!res.ok || !res.body) return null
+
+    const reader = res.body.getReader()
+    const decoder = new TextDecoder()
+    const isDescriptionBatch = phase === "DESCRIPTION"
+    let buffer = ""
+    let finalState: any = null
+
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      let sep = buffer.indexOf("\n\n")
+      while (sep >= 0) {
+        const chunk = buffer.slice(0, sep)
+        buffer = buffer.slice(sep + 2)
+        sep = buffer.indexOf("\n\n")
+
+        let event = "message"
+        let dataStr = ""
+        for (const line of chunk.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim()
+          else if (line.startsWith("data:")) dataStr += line.slice(5).trim()
+        }
+        if (!dataStr) continue
+
+        const data = JSON.parse(dataStr)
+        if (event === "token") {
+          appendDraftToken(data.name, data.delta)
+        } else if (event === "message") {
+          if (!finalizeDraft(data, isDescriptionBatch)) enqueueApiMessages([data], isDescriptionBatch)
+        } else if (event === "state") {
+          finalState = data
+        } else if (event === "error") {
+          // 내 턴 아니면 409가 뜰 수 있으니 “에러로 죽이지 말고” 그냥 반환
+          if (data.status === 409) return { __conflict: true, raw: data.detail }
+          throw new Error(data.detail)
+        }
+      }
+    }
+
+    discardDrafts()
+    if (!finalState) return null
+    applyServerResponse({ ...finalState, messages: [] })
+    return finalState
+  }
+
+  /**
+   * ✅ 큐 모드: AI 턴은 워커가 진행하므로 끝날 때까지 /game/poll로 새 메시지와 상태를 받기
+   */
+  async function pollAI() {
+    if (!sessionId) return
+    for (let i = 0; i < POLL_MAX_ATTEMPTS; i++) {
+      await sleep(POLL_INTERVAL_MS)
+      const qs = new URLSearchParams({ sessionId })
+      if (pollCursorRef.current != null) qs.set("after", String(pollCursorRef.current))
+
+      const res = await fetch(`/api/game/poll?${qs.toString()}`, { cache: "no-store" })
+      if (!res.ok) throw new Error(await res.text())
+      const data = await res.json()
+      pollCursorRef.current = data.cursor ?? pollCursorRef.current
+      applyServerResponse(data)
+      if (!data.pending) break
+    }
+  }
+
   /**
    * ✅ AI 턴 자동 진행
    * - 핵심: noop을 여러 번 호출해서(가능하면 1 AI step씩) 메시지가 “생성되는 즉시” 화면에 들어오게
@@ -353,6 +486,25 @@ export default function PlayPage() {
     pumpingRef.current = true
     setAiBusy(true)
     try {
+      // ⭐ 큐 모드에서 워커가 진행 중이면 스트림(서버에서 AI를 돌리지 않음) 없이 바로 폴링
+      if (pendingRef.current) {
+        await pollAI()
+        return
+      }
+
+      // ⭐ 스트리밍을 지원하면 요청 하나로 인간 차례까지 진행 (메시지는 생성 즉시 도착)
+      // 요청 마감으로 남은 AI 턴이 있으면(aiDeferred) 이어서 다시 요청
+      let streamed = await callStream()
+      for (let i = 0; streamed?.aiDeferred && i < max; i++) {
+        streamed = await callStream()
+      }
+      if (streamed?.pending) {
+        await pollAI()
+        return
+      }
+      // 충돌(409)이면 아래 noop 반복으로 다시 확인
+      if (streamed && !streamed.__conflict) return
+
       for (let i = 0; i < max; i++) {
         if (isPopupBlocking) break
         if (uiNeed === "mid-check") break
@@ -361,6 +513,10 @@ export default function PlayPage() {
         const data = await callStep({ type: "noop", maxAiSteps: 1 })
 
         if (!data || data.__conflict) break
+        if (data.pending) {
+          await pollAI()
+          break
+        }
         if (data.ui?.need === "mid-check") break
         if (data.phase === "ENDED") break
         if (!force && data.phase === "VOTING" && !hasVotedRef.current) break
@@ -416,6 +572,7 @@ export default function PlayPage() {
 
     if (!res.ok) throw new Error(await res.text())
     const data = await res.json()
+    pollCursorRef.current = data.cursor ?? null
     applyServerResponse(data)
 
     // ✅ 들어오자마자 “설명 세션 안내 팝업”
@@ -477,8 +634,25 @@ export default function PlayPage() {
     showPostVoteInterview,
   ])
 
+  // 토론 차례에 입력이 잠시 멈추면, 그 문장을 보낸다고 보고 다음 AI 발언을 서버가 미리 생성
+  const draftTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null)
+
+  function handleDraftChange(text: string) {
+    if (draftTimerRef.current) clearTimeout(draftTimerRef.current)
+    const draft = text.trim()
+    if (!sessionId || !draft || phase !== "DISCUSSION" || !isMyTurn) return
+    draftTimerRef.current = setTimeout(() => {
+      fetch("/api/game/speculate", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ sessionId, text: draft }),
+      }).catch(() => {})
+    }, SPECULATE_DEBOUNCE_MS)
+  }
+
   // 채팅 전송(내 턴일 때만)
   async function handleSend(text: string) {
+    if (draftTimerRef.current) clearTimeout(draftTimerRef.current)
     try {
       if (!isMyTurn) {
         await pumpAI()
@@ -672,6 +846,7 @@ export default function PlayPage() {
         <ChatPanel
           messages={messages}
           onSend={handleSend}
+          onDraftChange={handleDraftChange}
           disabled={!isMyTurn || forceDisable}
           statusText={statusText}
         />
@@ -0,0 +1,58 @@
+# backend/bench_codec.py
+"""
+세션 상태 직렬화 벤치마크: JSON(serialize_game + json) vs 바이너리 코덱(backend/codec.py)
+
+    python -m backend.bench_codec [반복 횟수]
+"""
+import sys
+import json
+import timeit
+
+from backend.codec import decode_session, decode_transcript, encode_session
+from backend.serialize import serialize_game, deserialize_game
+from game.game_session import GameSession
+from game.ai_player import AIPlayer
+from game.player import Player
+from game.constants import GameState, Role
+
+def _sample_game(ai_count: int = 4) -> GameSession:
+    """토론 2라운드가 끝난 시점의 게임 (설명/토론 로그가 가장 긴 상태)"""
+    g = GameSession()
+    g.add_player("Human")
+    for i in range(ai_count):
+        name = f"Bot_{i + 1}"
+        g.players[name] = AIPlayer(name)
+    g.start_game()
+    for p in list(g.turn_order):
+        g.handle_description(f"{p.name} says something about this word that is reasonably long, like a real answer.")
+    g.reorder_for_discussion()
+    while g.game_state == GameState.DISCUSSION:
+        p = g.current_player
+        g.handle_discussion(f"I think Bot_2 sounded vague, and {p.name} wants to hear more before voting.")
+    return g
+
+def _bench(label: str, fn, number: int) -> None:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{label:<28} {seconds / number * 1e6:9.1f} us")
+
+def main(number: int = 2000) -> None:
+    game = _sample_game()
+    extra = {"participantName": "Human", "votes_cast": {}, "mid_check_done": True}
+
+    as_json = json.dumps({"game": serialize_game(game, include_transcript=True), **extra}).encode("utf-8")
+    as_bin = encode_session(game, extra)
+    print(f"size: json={len(as_json)} B  binary={len(as_bin)} B  ({len(as_bin) / len(as_json):.0%})")
+
+    _bench("encode json", lambda: json.dumps({"game": serialize_game(game, include_transcript=True), **extra}), number)
+    _bench("encode binary", lambda: encode_session(game, extra), number)
+    _bench(
+        "decode json",
+        lambda: deserialize_game(json.loads(as_json)["game"], GameSession, Player, AIPlayer, GameState, Role),
+        number,
+    )
+    _bench("decode binary", lambda: decode_session(as_bin), number)
+    _bench("decode binary (no transcript)", lambda: decode_session(as_bin, transcript=False), number)
+    _bench("decode transcript only", lambda: decode_transcript(as_bin), number)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,322 @@
+# backend/codec.py
+"""
+GameSession 바이너리 코덱 (버전 포함, struct 기반).
+
+JSON(serialize_game)과 달리 플레이어 이름은 한 번만 쓰고 이후엔 번호로 참조하며,
+enum은 이름 대신 아래 표의 순번으로, 플레이어 플래그는 비트로 묶어 저장한다.
+transcript(설명/토론)는 길이가 붙은 별도 구역이라 decode_session(..., transcript=False)로 건너뛰거나
+decode_transcript()로 그 부분만 읽을 수 있다. 건너뛰고 읽은 game은 읽기 전용이다.
+
+플레이어 번호와 turn_order 길이는 u8(0xFF는 "없음")이라 플레이어는 254명까지,
+설명/토론 수는 u16까지다. 범위를 넘으면 잘라 쓰지 않고 CodecError.
+
+레이아웃 (v1, little-endian):
+    b"LGS" u8 version
+    u8 game_state  u8 winner  u8 n_players
+    players: str8 name, u8 flags(is_ai|described|voted|fool, role<<4), u16 votes_received
+    u8 n_order [u8 player_id ...]
+    u8 liar  u8 fool  u8 suspect                  (0xFF = 없음)
+    u16 turn_index  u8 discussion_rounds  u8 discussion_round_index  u16 current_round
+    str16 category  str16 keyword  str16 human_suspect_name
+    u32 extra_len  extra(JSON, 세션 최상위 값)
+    u32 transcript_len
+        u16 n_desc  [u8 player_id, str32 text ...]
+        u16 n_disc  [u8 speaker_id, str32 message ...]   (speaker_id 0xFF면 message가 줄 전체)
+"""
+import json
+import struct
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+
+from game.game_session import GameSession
+from game.ai_player import AIPlayer
+from game.player import Player
+from game.constants import GameState, Role
+from backend.serialize import transcript_loaded
+
+MAGIC = b"LGS"
+VERSION = 1
+
+# 순번은 저장 포맷의 일부: 새 값은 뒤에만 추가
+_GAME_STATES = ("READY", "DESCRIPTION", "DISCUSSION", "VOTING", "FINAL_GUESS", "ENDED")
+_ROLES = ("CITIZEN", "LIAR")
+_GAME_STATE_ID = {name: i for i, name in enumerate(_GAME_STATES)}
+_ROLE_ID = {name: i for i, name in enumerate(_ROLES)}
+
+_NONE8 = 0xFF
+_NONE16 = 0xFFFF
+_NO_ROLE = 0xF
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_HEAD = struct.Struct("<3sBBBB")       # magic, version, game_state, winner, n_players
+_PLAYER_TAIL = struct.Struct("<BH")    # flags, votes_received
+_REFS = struct.Struct("<BBB")          # liar, fool, suspect
+_COUNTERS = struct.Struct("<HBBH")     # turn_index, discussion_rounds, discussion_round_index, current_round
+_DISC_ITEM = struct.Struct("<BI")      # speaker_id, message 길이
+
+class CodecError(ValueError):
+    """알 수 없는 포맷/버전이거나 데이터가 잘림"""
+
+def is_encoded(data: Any) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:3]) == MAGIC
+
+# --- encode ---
+
+def _str8(out: bytearray, s: str) -> None:
+    b = s.encode("utf-8")
+    if len(b) >= _NONE8:
+        raise CodecError(f"player name too long: {s!r}")
+    out += _U8.pack(len(b))
+    out += b
+
+def _str16(out: bytearray, s: Optional[str]) -> None:
+    if s is None:
+        out += _U16.pack(_NONE16)
+        return
+    b = s.encode("utf-8")
+    if len(b) >= _NONE16:
+        raise CodecError("string too long")
+    out += _U16.pack(len(b))
+    out += b
+
+def _str32(out: bytearray, s: str) -> None:
+    b = s.encode("utf-8")
+    out += _U32.pack(len(b))
+    out += b
+
+def _enum_id(table: Dict[str, int], value: Any, none: int) -> int:
+    if value is None:
+        return none
+    return table[value.name]
+
+def _count(out: bytearray, packer: struct.Struct, n: int, limit: int, what: str) -> None:
+    if n > limit:
+        raise CodecError(f"too many {what}: {n} (max {limit})")
+    out += packer.pack(n)
+
+def encode_session(game: GameSession, extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    game + 세션 최상위 값(extra, JSON으로 직렬화 가능한 dict)을 bytes로.
+    포맷 범위를 넘는 값이나 transcript 없이 읽은 game이면 CodecError.
+    """
+    if not transcript_loaded(game):
+        raise CodecError("game was decoded without its transcript and is read-only")
+    try:
+        return _encode(game, extra)
+    except (struct.error, OverflowError) as e:
+        raise CodecError(f"value out of range for codec v{VERSION}: {e}")
+
+def _encode(game: GameSession, extra: Optional[Dict[str, Any]]) -> bytes:
+    names = list(game.players)
+    if len(names) >= _NONE8:
+        raise CodecError(f"too many players: {len(names)}")
+    ids = {name: i for i, name in enumerate(names)}
+
+    def ref(p) -> int:
+        return ids[p.name] if p is not None else _NONE8
+
+    out = bytearray(_HEAD.pack(
+        MAGIC,
+        VERSION,
+        _GAME_STATE_ID[game.game_state.name],
+        _enum_id(_ROLE_ID, game.winner, _NONE8),
+        len(names),
+    ))
+    for name in names:
+        p = game.players[name]
+        flags = (
+            (1 if p.is_ai else 0)
+            | (2 if p.has_described else 0)
+            | (4 if p.has_voted else 0)
+            | (8 if p.is_fool else 0)
+            | (_enum_id(_ROLE_ID, p.role, _NO_ROLE) << 4)
+        )
+        _str8(out, name)
+        out += _PLAYER_TAIL.pack(flags, p.votes_received)
+
+    turn_ids = game.turn_order_ids
+    _count(out, _U8, len(turn_ids), 0xFF, "turns")
+    out += bytes(turn_ids)
+    out += _REFS.pack(ref(game.liar), ref(game.fool_player), ref(game.suspect))
+    out += _COUNTERS.pack(game.turn_index, game.discussion_rounds, game.discussion_round_index, game.current_round)
+    _str16(out, game.category)
+    _str16(out, game.keyword)
+    _str16(out, game.human_suspect_name)
+
+    extra_bytes = json.dumps(extra or {}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    out += _U32.pack(len(extra_bytes))
+    out += extra_bytes
+
+    transcript = bytearray()
+    _count(transcript, _U16, len(game.descriptions), 0xFFFF, "descriptions")
+    for name, text in game.descriptions.items():
+        # 플레이어가 아닌 이름(나간 참가자 등)은 번호 대신 이름을 그대로
+        transcript += _U8.pack(ids.get(name, _NONE8))
+        if name not in ids:
+            _str16(transcript, name)
+        _str32(transcript, text)
+    _count(transcript, _U16, len(game.discussions), 0xFFFF, "discussions")
+    for line in game.discussions:
+        # 토론 로그는 "이름: 발언" 형식 -> 이름은 번호로
+        speaker, sep, message = line.partition(": ")
+        if sep and speaker in ids:
+            transcript += _U8.pack(ids[speaker])
+            _str32(transcript, message)
+        else:
+            transcript += _U8.pack(_NONE8)
+            _str32(transcript, line)
+    out += _U32.pack(len(transcript))
+    out += transcript
+    return bytes(out)
+
+# --- decode ---
+# 디코더는 호출 수를 줄이려고 bytes + 위치(pos)를 직접 다룬다
+
+_u8 = _U8.unpack_from
+_u16 = _U16.unpack_from
+_u32 = _U32.unpack_from
+
+def _read_header(data: bytes) -> Tuple[int, int, int]:
+    magic, version, gs, winner, n_players = _HEAD.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise CodecError("not an encoded session")
+    if version != VERSION:
+        raise CodecError(f"unsupported codec version {version}")
+    return gs, winner, n_players
+
+def _read_str16(data: bytes, pos: int) -> Tuple[Optional[str], int]:
+    (n,) = _u16(data, pos)
+    pos += 2
+    if n == _NONE16:
+        return None, pos
+    return data[pos:pos + n].decode("utf-8"), pos + n
+
+def _read_names(data: bytes, pos: int, n_players: int) -> Tuple[List[Tuple[str, int, int]], int]:
+    players = []
+    for _ in range(n_players):
+        (n,) = _u8(data, pos)
+        name = data[pos + 1:pos + 1 + n].decode("utf-8")
+        pos += 1 + n
+        flags, votes = _PLAYER_TAIL.unpack_from(data, pos)
+        pos += _PLAYER_TAIL.size
+        players.append((name, flags, votes))
+    return players, pos
+
+def _read_transcript(data: bytes, pos: int, names: List[str]) -> Tuple[Dict[str, str], List[str], int]:
+    descriptions: Dict[str, str] = {}
+    (count,) = _u16(data, pos)
+    pos += 2
+    for _ in range(count):
+        (pid,) = _u8(data, pos)
+        pos += 1
+        if pid == _NONE8:
+            name, pos = _read_str16(data, pos)
+        else:
+            name = names[pid]
+        (n,) = _u32(data, pos)
+        pos += 4
+        descriptions[name] = data[pos:pos + n].decode("utf-8")
+        pos += n
+
+    discussions: List[str] = []
+    (count,) = _u16(data, pos)
+    pos += 2
+    for _ in range(count):
+        pid, n = _DISC_ITEM.unpack_from(data, pos)
+        pos += _DISC_ITEM.size
+        text = data[pos:pos + n].decode("utf-8")
+        pos += n
+        discussions.append(text if pid == _NONE8 else names[pid] + ": " + text)
+    return descriptions, discussions, pos
+
+def _skip_to_transcript(data: bytes, pos: int) -> Tuple[Dict[str, Any], int, int]:
+    """turn_order 이후 ~ extra까지 읽고 (extra, transcript 길이, transcript 시작 위치)"""
+    (n,) = _u32(data, pos)
+    pos += 4
+    extra = json.loads(data[pos:pos + n])
+    pos += n
+    (size,) = _u32(data, pos)
+    return extra, size, pos + 4
+
+def decode_session(data: bytes, transcript: bool = True) -> Tuple[GameSession, Dict[str, Any]]:
+    """
+    bytes -> (GameSession, extra).
+    transcript=False면 transcript 구역을 건너뛴다. 상태/플레이어만 필요한 조회용이라
+    descriptions / discussions는 빈 읽기 전용 값이 되고, 게임을 진행하면 오류가 나며
+    encode_session / transcript_rows / serialize_game(include_transcript)도 저장을 거부한다.
+    """
+    data = bytes(data)
+    try:
+        gs, winner, n_players = _read_header(data)
+        raw_players, pos = _read_names(data, _HEAD.size, n_players)
+
+        g = GameSession()
+        g.game_state = GameState[_GAME_STATES[gs]]
+        g.winner = Role[_ROLES[winner]] if winner != _NONE8 else None
+
+        names: List[str] = []
+        order: List[Player] = []
+        players: Dict[str, Player] = {}
+        for name, flags, votes in raw_players:
+            p = AIPlayer(name) if flags & 1 else Player(name)
+            p.has_described = bool(flags & 2)
+            p.has_voted = bool(flags & 4)
+            p.is_fool = bool(flags & 8)
+            role = flags >> 4
+            if role != _NO_ROLE:
+                p.role = Role[_ROLES[role]]
+            p.votes_received = votes
+            names.append(name)
+            order.append(p)
+            players[name] = p
+        g.players = players
+
+        (n,) = _u8(data, pos)
+        g.turn_order_ids = list(data[pos + 1:pos + 1 + n])
+        pos += 1 + n
+
+        liar, fool, suspect = _REFS.unpack_from(data, pos)
+        pos += _REFS.size
+        g.liar = order[liar] if liar != _NONE8 else None
+        g.fool_player = order[fool] if fool != _NONE8 else None
+        g.suspect = order[suspect] if suspect != _NONE8 else None
+        g.turn_index, g.discussion_rounds, g.discussion_round_index, g.current_round = _COUNTERS.unpack_from(data, pos)
+        pos += _COUNTERS.size
+        g.category, pos = _read_str16(data, pos)
+        g.keyword, pos = _read_str16(data, pos)
+        g.human_suspect_name, pos = _read_str16(data, pos)
+
+        extra, size, pos = _skip_to_transcript(data, pos)
+        if pos + size != len(data):
+            raise CodecError("length mismatch (truncated data?)")
+        if transcript:
+            g.descriptions, g.discussions, end = _read_transcript(data, pos, names)
+            if end != len(data):
+                raise CodecError("transcript length mismatch")
+        else:
+            g.descriptions, g.discussions = MappingProxyType({}), ()
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError) as e:
+        if isinstance(e, CodecError):
+            raise
+        raise CodecError(f"corrupt or truncated data: {e}")
+    return g, extra
+
+def decode_transcript(data: bytes) -> Tuple[Dict[str, str], List[str]]:
+    """transcript 구역만 읽기 (플레이어 이름 외의 나머지 필드는 해석하지 않음)"""
+    data = bytes(data)
+    try:
+        _, _, n_players = _read_header(data)
+        raw_players, pos = _read_names(data, _HEAD.size, n_players)
+        (n,) = _u8(data, pos)
+        pos += 1 + n + _REFS.size + _COUNTERS.size
+        for _ in range(3):
+            _, pos = _read_str16(data, pos)
+        _, _, pos = _skip_to_transcript(data, pos)
+        descriptions, discussions, _ = _read_transcript(data, pos, [name for name, _, _ in raw_players])
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError) as e:
+        if isinstance(e, CodecError):
+            raise
+        raise CodecError(f"corrupt or truncated data: {e}")
+    return descriptions, discussions
@@ -1,53 +1,458 @@
 # backend/db.py
 import os
+import asyncio
+from typing import List, Optional, Tuple, Union
 from dotenv import load_dotenv
-import psycopg
+from psycopg import AsyncConnection
 from psycopg.rows import dict_row
 from psycopg.types.json import Json
+from psycopg_pool import AsyncConnectionPool
 
 # Next가 쓰는 .env.local 재사용 (루트에서 uvicorn 실행한다는 전제)
 load_dotenv(".env.local")
 
-def _conn():
+# 풀 설정 (환경변수로 조정 가능)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))            # 커넥션 대기 최대 시간(초)
+POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))         # 유휴 커넥션 회수 시간(초)
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))  # 커넥션 재생성 주기(초)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+_pool: Optional[AsyncConnectionPool] = None
+_pool_guard = asyncio.Lock()
+
+def _database_url() -> str:
     url = os.getenv("DATABASE_URL")
     if not url:
         raise RuntimeError("Missing DATABASE_URL (set it in .env.local or env)")
-    return psycopg.connect(url, row_factory=dict_row)
+    return url
+
+async def open_connection(autocommit: bool = False) -> AsyncConnection:
+    """풀 밖의 단독 커넥션 (오래 들고 있어야 하는 용도: 세션 advisory 락 등)"""
+    return await AsyncConnection.connect(_database_url(), autocommit=autocommit, row_factory=dict_row)
+
+async def get_pool() -> AsyncConnectionPool:
+    """프로세스 전역 커넥션 풀 (첫 사용 시 생성)"""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_guard:
+        if _pool is None:
+            pool = AsyncConnectionPool(
+                _database_url(),
+                kwargs={"row_factory": dict_row},
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                timeout=POOL_TIMEOUT,
+                max_idle=POOL_MAX_IDLE,
+                max_lifetime=POOL_MAX_LIFETIME,
+                check=AsyncConnectionPool.check_connection,  # 꺼내줄 때 살아있는지 확인
+                name="sdg",
+                open=False,
+            )
+            await pool.open()
+            _pool = pool
+    return _pool
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+def get_pool_stats() -> dict:
+    """풀 대기 시간 / 포화도 지표"""
+    if _pool is None:
+        return {"open": False}
+    stats = _pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    stats.update({
+        "open": True,
+        "in_use": size - available,
+        "saturation": (size - available) / POOL_MAX_SIZE if POOL_MAX_SIZE else 0.0,
+        "avg_wait_ms": (wait_ms / requests) if requests else 0.0,
+    })
+    return stats
+
+async def ensure_schema() -> None:
+    """backend/schema.sql 적용 (idempotent)"""
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        ddl = f.read()
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        await conn.execute(ddl)
+
+class VersionConflict(Exception):
+    """save_session_state의 compare-and-swap 실패 (다른 곳에서 먼저 저장함)"""
+    def __init__(self, session_id: str, expected: int):
+        super().__init__(f"session {session_id} is no longer at version {expected}")
+        self.session_id = session_id
+        self.expected = expected
+
+async def get_session_state(session_id: str) -> dict:
+    """
+    state_json + 현재 버전(state["version"]).
+    transcript가 session_transcript에 있으면 state["game"]의 descriptions / discussions로 채워서 돌려준다.
+    """
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(
+            """
+            select s.state_json, s.state_version,
+                   (select coalesce(jsonb_agg(jsonb_build_array(t.kind, t.name, t.text) order by t.id), '[]'::jsonb)
+                    from session_transcript t where t.session_id = s.session_id) as transcript
+            from sessions s where s.session_id = %s::uuid
+            """,
+            (session_id,),
+        )
+        row = await cur.fetchone()
+        if not row:
+            raise KeyError("session not found")
+        state = row["state_json"] or {}
+        state["version"] = row["state_version"]
+        game = state.get("game")
+        if game and game.get("transcript") == "table":
+            descriptions, discussions = {}, []
+            for kind, name, text in row["transcript"]:
+                if kind == "descriptions":
+                    descriptions[name] = text
+                else:
+                    discussions.append(text)
+            game["descriptions"] = descriptions
+            game["discussions"] = discussions
+        return state
 
-def get_session_state(session_id: str) -> dict:
-    with _conn() as conn:
-        row = conn.execute(
-            "select state_json from sessions where session_id = %s::uuid",
+async def get_session_version(session_id: str) -> int:
+    """state 전체를 가져오지 않고 현재 버전만 확인 (캐시 검증용)"""
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(
+            "select state_version from sessions where session_id = %s::uuid",
             (session_id,),
-        ).fetchone()
+        )
+        row = await cur.fetchone()
         if not row:
             raise KeyError("session not found")
-        return row["state_json"] or {}
-
-def save_session_state(session_id: str, state: dict) -> None:
-    with _conn() as conn:
-        conn.execute(
-            "update sessions set state_json = %s::jsonb where session_id = %s::uuid",
-            (Json(state), session_id),
-        )
-        conn.commit()
-
-def insert_event(session_id: str, type_: str, payload: dict) -> None:
-    with _conn() as conn:
-        conn.execute(
-            "insert into events (session_id, type, payload) values (%s::uuid, %s, %s::jsonb)",
-            (session_id, type_, Json(payload)),
-        )
-        conn.commit()
-
-def insert_context_message(session_id: str, role: str, name: str, content: str, phase: str) -> None:
-    insert_event(
-        session_id,
-        "CONTEXT_MESSAGE",
-        {
-            "role": role,
-            "name": name,
-            "content": content,
-            "phase": phase,
-        },
+        return row["state_version"]
+
+# (교체할 kind 목록, 추가할 (kind, name, text) 행)
+TranscriptDelta = Tuple[List[str], List[Tuple[str, Optional[str], str]]]
+
+class EventBuffer:
+    """
+    한 step 동안 발생한 이벤트를 모아두는 버퍼 (unit of work).
+    save_session_state(..., events=buf)로 상태 저장과 같은 트랜잭션에서 한 번에 flush 된다.
+    """
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.events: List[Tuple[str, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def add(self, type_: str, payload: dict) -> None:
+        self.events.append((type_, payload))
+
+    def add_context_message(self, role: str, name: str, content: str, phase: str) -> None:
+        self.add(
+            "CONTEXT_MESSAGE",
+            {
+                "role": role,
+                "name": name,
+                "content": content,
+                "phase": phase,
+            },
+        )
+
+async def _flush_events(conn, session_id: str, events: List[Tuple[str, dict]]) -> Optional[dict]:
+    """이번에 기록한 마지막 이벤트의 {seq, ts} (없으면 None)"""
+    if not events:
+        return None
+    # 다중 행 insert 1회. 한 트랜잭션 안에서는 now()가 같으므로
+    # ts에 순번만큼 마이크로초를 더해 ts 정렬로도 기록 순서가 유지되게 한다.
+    cur = await conn.execute(
+        """
+        insert into events (session_id, ts, type, payload)
+        select %s::uuid, now() + e.ord * interval '1 microsecond', e.type, e.payload
+        from unnest(%s::text[], %s::jsonb[]) with ordinality as e(type, payload, ord)
+        order by e.ord
+        returning seq, ts
+        """,
+        (session_id, [t for t, _ in events], [Json(p) for _, p in events]),
     )
+    return max(await cur.fetchall(), key=lambda r: r["seq"])
+
+async def _write_transcript(conn, session_id: str, transcript: TranscriptDelta) -> None:
+    replace, rows = transcript
+    if replace:
+        await conn.execute(
+            "delete from session_transcript where session_id = %s::uuid and kind = any(%s)",
+            (session_id, replace),
+        )
+    if rows:
+        await conn.execute(
+            """
+            insert into session_transcript (session_id, kind, name, text)
+            select %s::uuid, r.kind, r.name, r.text
+            from unnest(%s::text[], %s::text[], %s::text[]) with ordinality as r(kind, name, text, ord)
+            order by r.ord
+            """,
+            (session_id, [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows]),
+        )
+
+async def save_session_state(
+    session_id: str,
+    state: dict,
+    events: Optional[EventBuffer] = None,
+    enqueue_job: bool = False,
+    expected_version: Optional[int] = None,
+    game_patch: Optional[dict] = None,
+    transcript: Optional[TranscriptDelta] = None,
+    snapshot: Optional[Union[dict, bytes]] = None,
+    complete_job: Optional[int] = None,
+) -> int:
+    """
+    state를 저장하고 버전을 1 올린 뒤 새 버전을 돌려준다 (state["version"]도 갱신).
+    expected_version을 주면 현재 버전이 같을 때만 저장하고, 아니면 VersionConflict (이벤트/작업도 함께 롤백).
+
+    game_patch를 주면 state_json 전체를 덮어쓰지 않고 델타로 저장한다:
+    state의 최상위 키를 병합하고, state_json["game"]에는 바뀐 필드(game_patch)만 병합한다.
+    transcript는 (교체할 kind 목록, 추가할 (kind, name, text) 행)으로 session_transcript에 반영된다.
+    snapshot을 주면 이번 이벤트까지 반영된 스냅샷으로 session_snapshots에 기록한다 (backend/replay.py).
+    bytes면 바이너리 코덱(state_bin), dict면 JSON(state)으로 저장.
+    complete_job을 주면 그 AI 작업을 같은 트랜잭션에서 done으로 표시한다 (워커가 진행 결과를 저장할 때).
+    """
+    if game_patch is None:
+        state_expr = "%s::jsonb"
+        state_params: tuple = (Json(state),)
+    else:
+        state_expr = """jsonb_set(
+                        state_json || %s::jsonb,
+                        '{game}',
+                        (coalesce(state_json->'game', '{}'::jsonb) - 'descriptions' - 'discussions') || %s::jsonb
+                    )"""
+        state_params = (Json(state), Json(game_patch))
+
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        async with conn.transaction():
+            cur = await conn.execute(
+                f"""
+                update sessions
+                set state_version = state_version + 1,
+                    state_json = {state_expr} || jsonb_build_object('version', state_version + 1)
+                where session_id = %s::uuid
+                  and (%s::bigint is null or state_version = %s::bigint)
+                returning state_version
+                """,
+                state_params + (session_id, expected_version, expected_version),
+            )
+            row = await cur.fetchone()
+            if row is None:
+                exists = await conn.execute("select 1 from sessions where session_id = %s::uuid", (session_id,))
+                if await exists.fetchone() is None:
+                    raise KeyError("session not found")
+                raise VersionConflict(session_id, expected_version)
+            new_version = row["state_version"]
+            if transcript is not None:
+                await _write_transcript(conn, session_id, transcript)
+            last_event = None
+            if events is not None:
+                last_event = await _flush_events(conn, session_id, events.events)
+            if snapshot is not None and last_event is not None:
+                # 스냅샷 경계는 이 트랜잭션에서 쓴 마지막 이벤트. 다른 경로(/api/events 등)로
+                # 들어온 이벤트의 ts/seq와 섞이지 않는다.
+                is_bin = isinstance(snapshot, bytes)
+                await conn.execute(
+                    """
+                    insert into session_snapshots (session_id, through_ts, through_seq, state, state_bin)
+                    values (%s::uuid, %s, %s, %s::jsonb, %s::bytea)
+                    on conflict (session_id, through_ts)
+                    do update set through_seq = excluded.through_seq,
+                                  state = excluded.state, state_bin = excluded.state_bin
+                    """,
+                    (
+                        session_id, last_event["ts"], last_event["seq"],
+                        None if is_bin else Json(snapshot), snapshot if is_bin else None,
+                    ),
+                )
+            if complete_job is not None:
+                await _complete_ai_job(conn, complete_job)
+            if enqueue_job:
+                # 상태 저장과 같은 트랜잭션에서 AI 작업 등록 (이미 대기/실행 중이면 무시)
+                await conn.execute(
+                    """
+                    insert into ai_jobs (session_id) values (%s::uuid)
+                    on conflict (session_id) where status in ('queued', 'running') do nothing
+                    """,
+                    (session_id,),
+                )
+    state["version"] = new_version
+    if events is not None:
+        events.events.clear()
+    return new_version
+
+# --- AI 작업 큐 (ai_jobs) ---
+
+async def claim_ai_job(lease_seconds: float) -> Optional[dict]:
+    """
+    대기 중인 작업 하나를 가져와 running으로 표시 (여러 워커가 동시에 호출해도 SKIP LOCKED로 겹치지 않음).
+    lease_seconds 동안 갱신이 없던 running 작업(죽은 워커)도 다시 가져온다.
+    """
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(
+            """
+            update ai_jobs set status = 'running', attempts = attempts + 1, updated_at = now()
+            where id = (
+                select id from ai_jobs
+                where status = 'queued'
+                   or (status = 'running' and updated_at < now() - make_interval(secs => %s))
+                order by id
+                for update skip locked
+                limit 1
+            )
+            returning id, session_id::text as session_id, attempts
+            """,
+            (lease_seconds,),
+        )
+        return await cur.fetchone()
+
+async def _complete_ai_job(conn, job_id: int) -> None:
+    await conn.execute(
+        "update ai_jobs set status = 'done', error = null, updated_at = now() where id = %s",
+        (job_id,),
+    )
+
+async def touch_ai_job(job_id: int) -> None:
+    """실행 중인 작업의 lease 갱신 (오래 걸리는 작업이 죽은 작업으로 회수되지 않도록)"""
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        await conn.execute(
+            "update ai_jobs set updated_at = now() where id = %s and status = 'running'",
+            (job_id,),
+        )
+
+async def finish_ai_job(job_id: int, error: Optional[str] = None, max_attempts: int = 3) -> None:
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        if error is None:
+            await _complete_ai_job(conn, job_id)
+        else:
+            # 재시도 횟수가 남았으면 다시 대기열로
+            await conn.execute(
+                """
+                update ai_jobs
+                set status = case when attempts >= %s then 'failed' else 'queued' end,
+                    error = %s, updated_at = now()
+                where id = %s
+                """,
+                (max_attempts, error, job_id),
+            )
+
+async def get_ai_job_status(session_id: str) -> Optional[str]:
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(
+            "select status from ai_jobs where session_id = %s::uuid order by id desc limit 1",
+            (session_id,),
+        )
+        row = await cur.fetchone()
+        return row["status"] if row else None
+
+async def get_last_event_seq(session_id: str) -> int:
+    """세션의 마지막 이벤트 순번 (/game/poll의 첫 cursor, 이벤트가 없으면 0)"""
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute("select coalesce(max(seq), 0) as seq from events where session_id = %s::uuid", (session_id,))
+        row = await cur.fetchone()
+        return row["seq"]
+
+async def get_events_after(session_id: str, after_seq: Optional[int], types: List[str]) -> List[dict]:
+    """
+    after_seq 이후에 기록된 해당 타입 이벤트 (기록 순).
+    ts는 클라이언트가 찍은 값(/api/events)이 섞여 있어 순번(seq)으로 자른다.
+    한 세션의 게임 이벤트는 세션 락 아래에서만 기록되므로 seq가 커밋 순서와 같다.
+    """
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(
+            """
+            select seq, ts, type, payload from events
+            where session_id = %s::uuid
+              and (%s::bigint is null or seq > %s::bigint)
+              and type = any(%s)
+            order by seq
+            """,
+            (session_id, after_seq, after_seq, types),
+        )
+        return await cur.fetchall()
+
+# --- 이벤트 재생 (backend/replay.py) ---
+
+async def get_replay_source(
+    session_id: str,
+    at: Optional[str],
+    types: List[str],
+) -> Tuple[Optional[dict], List[dict], int]:
+    """
+    at(ISO 문자열, None이면 현재) 시점을 재구성하는 데 필요한 것:
+    (가장 가까운 스냅샷 또는 None, 그 이후의 이벤트 (seq 순), 현재 state 버전).
+    마지막 GAME_STARTED가 스냅샷보다 뒤면 스냅샷 없이 그 이벤트부터 돌려준다.
+    순서와 경계는 서버가 매기는 events.seq로 정한다 (at만 ts로 비교).
+    """
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(
+            "select state_version from sessions where session_id = %s::uuid",
+            (session_id,),
+        )
+        row = await cur.fetchone()
+        if not row:
+            raise KeyError("session not found")
+        version = row["state_version"]
+
+        cur = await conn.execute(
+            """
+            select through_seq, state, state_bin from session_snapshots
+            where session_id = %s::uuid and through_seq is not null
+              and (%s::timestamptz is null or through_ts <= %s::timestamptz)
+            order by through_seq desc limit 1
+            """,
+            (session_id, at, at),
+        )
+        snapshot = await cur.fetchone()
+
+        cur = await conn.execute(
+            """
+            select max(seq) as seq from events
+            where session_id = %s::uuid and type = 'GAME_STARTED'
+              and (%s::timestamptz is null or ts <= %s::timestamptz)
+            """,
+            (session_id, at, at),
+        )
+        started_seq = (await cur.fetchone())["seq"]
+
+        if snapshot is not None and (started_seq is None or snapshot["through_seq"] >= started_seq):
+            where_from, from_seq = "seq > %s", snapshot["through_seq"]
+        elif started_seq is not None:
+            snapshot, where_from, from_seq = None, "seq >= %s", started_seq
+        else:
+            return None, [], version
+
+        cur = await conn.execute(
+            f"""
+            select ts, type, payload from events
+            where session_id = %s::uuid and {where_from}
+              and (%s::timestamptz is null or ts <= %s::timestamptz)
+              and type = any(%s)
+            order by seq
+            """,
+            (session_id, from_seq, at, at, types),
+        )
+        return snapshot, await cur.fetchall(), version
@@ -0,0 +1,105 @@
+# backend/llm_rate.py
+import os
+from typing import Set
+
+from backend.db import get_pool
+from game.llm_scheduler import RateLimit, llm_scheduler
+
+# rate limit 버킷 위치 (환경변수로 조정 가능)
+# local: 프로세스마다 따로 (API 프로세스 1개일 때) / postgres: llm_rate_buckets 테이블을 모든 프로세스가 같이 씀
+LLM_RATE_BACKEND = os.getenv("LLM_RATE_BACKEND", "local")  # local | postgres
+
+class PgRateStore:
+    """
+    llm_rate_buckets 행 하나 = 모델 하나의 버킷 (요청 수 / 토큰 수).
+    행 잠금(for update) 안에서 경과 시간만큼 채우고 차감하므로 API 프로세스 / 워커가 여럿이어도 한도를 넘지 않는다.
+    """
+    def __init__(self) -> None:
+        self._known: Set[str] = set()
+
+    async def _ensure_row(self, conn, model: str, limit: RateLimit) -> None:
+        if model in self._known:
+            return
+        await conn.execute(
+            """
+            insert into llm_rate_buckets (model, requests, tokens, updated_at)
+            values (%s, %s, %s, clock_timestamp())
+            on conflict (model) do nothing
+            """,
+            (model, limit.request_capacity, limit.token_capacity),
+        )
+        self._known.add(model)
+
+    async def take(self, model: str, limit: RateLimit, tokens: int) -> float:
+        # 제한 없는 항목은 용량/속도 0, 차감 0으로 넘겨 항상 통과시킨다
+        requests = 1 if limit.rpm else 0
+        tokens = tokens if limit.tpm else 0
+        pool = await get_pool()
+        async with pool.connection() as conn:
+            await self._ensure_row(conn, model, limit)
+            cur = await conn.execute(
+                """
+                with cur as (
+                    select model,
+                           least(%(rcap)s, requests + extract(epoch from clock_timestamp() - updated_at) * %(rrate)s) as r,
+                           least(%(tcap)s, tokens + extract(epoch from clock_timestamp() - updated_at) * %(trate)s) as t
+                    from llm_rate_buckets
+                    where model = %(model)s
+                    for update
+                ), ok as (
+                    select model, r, t, (r >= %(req)s and t >= %(tok)s) as granted from cur
+                )
+                update llm_rate_buckets b
+                set requests = case when ok.granted then ok.r - %(req)s else ok.r end,
+                    tokens = case when ok.granted then ok.t - %(tok)s else ok.t end,
+                    updated_at = clock_timestamp()
+                from ok
+                where b.model = ok.model
+                returning ok.granted as granted, ok.r as r, ok.t as t
+                """,
+                {
+                    "model": model,
+                    "rcap": limit.request_capacity,
+                    "rrate": limit.request_rate,
+                    "tcap": limit.token_capacity,
+                    "trate": limit.token_rate,
+                    "req": requests,
+                    "tok": tokens,
+                },
+            )
+            row = await cur.fetchone()
+        if row is None:
+            # 행이 지워졌으면 다음 호출에서 다시 만든다
+            self._known.discard(model)
+            return 0.0
+        if row["granted"]:
+            return 0.0
+        wait = 0.0
+        if limit.rpm and row["r"] < requests:
+            wait = max(wait, (requests - row["r"]) / limit.request_rate)
+        if limit.tpm and row["t"] < tokens:
+            wait = max(wait, (tokens - row["t"]) / limit.token_rate)
+        return max(wait, 0.001)
+
+    async def adjust(self, model: str, limit: RateLimit, requests: float, tokens: float) -> None:
+        pool = await get_pool()
+        async with pool.connection() as conn:
+            await conn.execute(
+                """
+                update llm_rate_buckets
+                set requests = least(%s, requests - %s),
+                    tokens = least(%s, tokens - %s)
+                where model = %s
+                """,
+                (
+                    limit.request_capacity,
+                    requests if limit.rpm else 0,
+                    limit.token_capacity,
+                    tokens if limit.tpm else 0,
+                    model,
+                ),
+            )
+
+def install_rate_store(backend: str = LLM_RATE_BACKEND) -> None:
+    """서버 / 워커 시작 시 호출. postgres면 llm_scheduler가 공유 버킷을 쓴다."""
+    llm_scheduler.set_shared_store(PgRateStore() if backend == "postgres" else None)
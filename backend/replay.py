@@ -0,0 +1,189 @@
+# backend/replay.py
+"""
+events 테이블로부터 GameSession 재구성 (event sourcing).
+
+가장 가까운 스냅샷(session_snapshots)에서 시작해 그 이후 이벤트를 apply_event로 접어서 상태를 만든다.
+스냅샷은 재생 대상 이벤트가 SESSION_SNAPSHOT_EVERY개 쌓일 때마다 저장과 같은 트랜잭션에서 기록되므로
+재생해야 하는 이벤트 수가 제한된다.
+
+- SESSION_STATE_SOURCE=events 이면 캐시 미스 시 state_json 대신 이벤트로 세션을 복원한다.
+- 특정 시점 상태 확인(분석용):
+    python -m backend.replay <session_id> [ISO 시각]
+"""
+import os
+import sys
+import json
+import asyncio
+from typing import Any, Dict, Optional, Tuple, Union
+
+from backend.db import get_replay_source
+from backend.codec import decode_session, encode_session
+from backend.serialize import serialize_game, deserialize_game
+from game.game_session import GameSession
+from game.ai_player import AIPlayer
+from game.player import Player
+from game.constants import GameState, Role
+
+SESSION_STATE_SOURCE = os.getenv("SESSION_STATE_SOURCE", "state")  # state | events
+SESSION_SNAPSHOT_EVERY = int(os.getenv("SESSION_SNAPSHOT_EVERY", "16"))  # 0이면 스냅샷 안 찍음
+SESSION_SNAPSHOT_CODEC = os.getenv("SESSION_SNAPSHOT_CODEC", "binary")  # binary | json
+
+# 상태를 바꾸는 이벤트 (CONTEXT_MESSAGE, NOOP, GAME_ENDED 등은 재생에 필요 없음)
+REPLAY_EVENT_TYPES = [
+    "GAME_STARTED",
+    "HUMAN_DESCRIPTION",
+    "AI_DESCRIPTION",
+    "MID_CHECK",
+    "HUMAN_DISCUSSION",
+    "AI_DISCUSSION",
+    "HUMAN_VOTE",
+    "AI_VOTE",
+    "AI_FINAL_GUESS",
+]
+_REPLAY_EVENT_SET = frozenset(REPLAY_EVENT_TYPES)
+
+class ReplayError(Exception):
+    """이벤트가 현재 상태와 맞지 않거나 재생에 필요한 정보가 없음"""
+
+def count_replay_events(events) -> int:
+    return sum(1 for type_, _ in events if type_ in _REPLAY_EVENT_SET)
+
+def _order(game: GameSession, names) -> list:
+    try:
+        return [game.players[n] for n in names]
+    except KeyError as e:
+        raise ReplayError(f"unknown player in turn order: {e}")
+
+def _start_game(payload: Dict[str, Any]) -> Tuple[GameSession, Dict[str, Any]]:
+    if "turnOrder" not in payload or "players" not in payload:
+        raise ReplayError("GAME_STARTED was recorded without turn order (before event replay support)")
+
+    g = GameSession()
+    for pdata in payload["players"]:
+        name = pdata["name"]
+        g.players[name] = AIPlayer(name) if pdata.get("is_ai") else Player(name)
+    liar = payload.get("liar")
+    for p in g.players.values():
+        p.role = Role.LIAR if p.name == liar else Role.CITIZEN
+    g.liar = g.players.get(liar) if liar else None
+
+    fool = payload.get("fool")
+    g.fool_player = g.players.get(fool) if fool else None
+    if g.fool_player is not None:
+        g.fool_player.is_fool = True
+
+    g.category = payload.get("category")
+    g.keyword = payload.get("keyword")
+    g.turn_order = _order(g, payload["turnOrder"])
+    g.discussion_rounds = int(payload.get("discussionRounds", g.discussion_rounds))
+    g.game_state = GameState.DESCRIPTION
+
+    state = {"participantName": payload.get("participantName"), "votes_cast": {}}
+    return g, state
+
+def _expect_turn(game: GameSession, by: Optional[str], type_: str) -> None:
+    if not game.turn_order or game.current_player.name != by:
+        current = game.current_player.name if game.turn_order else None
+        raise ReplayError(f"{type_} by {by} but it is {current}'s turn")
+
+def apply_event(
+    game: Optional[GameSession],
+    state: Dict[str, Any],
+    type_: str,
+    payload: Dict[str, Any],
+) -> Tuple[GameSession, Dict[str, Any]]:
+    """이벤트 하나를 (game, state)에 반영. GAME_STARTED면 새 게임을 돌려준다."""
+    if type_ == "GAME_STARTED":
+        return _start_game(payload)
+    if game is None:
+        raise ReplayError(f"{type_} before GAME_STARTED")
+
+    if type_ in ("HUMAN_DESCRIPTION", "AI_DESCRIPTION"):
+        _expect_turn(game, payload.get("by"), type_)
+        game.handle_description(payload.get("text", ""))
+    elif type_ in ("HUMAN_DISCUSSION", "AI_DISCUSSION"):
+        _expect_turn(game, payload.get("by"), type_)
+        game.handle_discussion(payload.get("text", ""))
+    elif type_ == "MID_CHECK":
+        if "turnOrder" not in payload:
+            raise ReplayError("MID_CHECK was recorded without turn order (before event replay support)")
+        game.human_suspect_name = payload.get("suspectName")
+        game.turn_order = _order(game, payload["turnOrder"])
+        game.turn_index = 0
+        game.discussion_round_index = 1
+        state["mid_check_done"] = True
+    elif type_ in ("HUMAN_VOTE", "AI_VOTE"):
+        by, target = payload.get("by"), payload.get("target")
+        voter = game.players.get(by)
+        if voter is None:
+            raise ReplayError(f"{type_} by unknown player {by}")
+        game.handle_vote(voter, target)
+        state.setdefault("votes_cast", {})[by] = target
+    elif type_ == "AI_FINAL_GUESS":
+        game.handle_final_guess(payload.get("guess") or "")
+    return game, state
+
+def snapshot_state(game: GameSession, state: Dict[str, Any]) -> Dict[str, Any]:
+    """session_snapshots.state 용 (transcript 포함, 자기완결적)"""
+    return {
+        "participantName": state.get("participantName"),
+        "votes_cast": dict(state.get("votes_cast") or {}),
+        "mid_check_done": bool(state.get("mid_check_done", False)),
+        "game": serialize_game(game, include_transcript=True),
+    }
+
+def encode_snapshot(game: GameSession, state: Dict[str, Any]) -> Union[bytes, Dict[str, Any]]:
+    """SESSION_SNAPSHOT_CODEC에 맞춰 session_snapshots에 넣을 값"""
+    snap = snapshot_state(game, state)
+    if SESSION_SNAPSHOT_CODEC == "binary":
+        del snap["game"]
+        return encode_session(game, snap)
+    return snap
+
+def _restore_snapshot(row: Dict[str, Any]) -> Tuple[GameSession, Dict[str, Any]]:
+    # 바이너리가 있으면 우선, 없으면 (예전) JSON 스냅샷
+    if row.get("state_bin") is not None:
+        g, state = decode_session(row["state_bin"])
+    else:
+        snap = row["state"]
+        g = deserialize_game(snap["game"], GameSession, Player, AIPlayer, GameState, Role)
+        state = {k: v for k, v in snap.items() if k != "game"}
+    state["votes_cast"] = dict(state.get("votes_cast") or {})
+    return g, state
+
+async def rebuild_session(session_id: str, at: Optional[str] = None) -> Tuple[GameSession, Dict[str, Any]]:
+    """
+    at(ISO 문자열) 시점(None이면 현재)의 (GameSession, state).
+    state에는 participantName / votes_cast / mid_check_done / version / events_since_snapshot만 들어 있다.
+    KeyError: 세션 없음, ReplayError: 재생할 게임이 없거나 이벤트가 맞지 않음
+    """
+    snapshot, rows, version = await get_replay_source(session_id, at, REPLAY_EVENT_TYPES)
+
+    game: Optional[GameSession] = None
+    state: Dict[str, Any] = {}
+    if snapshot is not None:
+        game, state = _restore_snapshot(snapshot)
+    for row in rows:
+        game, state = apply_event(game, state, row["type"], row["payload"] or {})
+    if game is None:
+        raise ReplayError("no game to replay for this session")
+
+    # 재생 결과는 DB에 이미 저장된 상태이므로 다음 저장은 델타만
+    game.mark_saved()
+    state["version"] = version
+    state["events_since_snapshot"] = len(rows)
+    return game, state
+
+async def _main(session_id: str, at: Optional[str]) -> None:
+    from backend.db import close_pool
+
+    try:
+        game, state = await rebuild_session(session_id, at)
+        print(json.dumps(snapshot_state(game, state), ensure_ascii=False, indent=2))
+    finally:
+        await close_pool()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m backend.replay <session_id> [ISO timestamp]")
+    asyncio.run(_main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,63 @@
+-- backend/schema.sql
+-- 백엔드가 추가로 사용하는 테이블/컬럼. 서버 시작 시 ensure_schema()로 적용되며 여러 번 실행해도 안전하다.
+-- (sessions / events 테이블은 Next 쪽에서 관리)
+
+-- 세션 state 버전 (compare-and-swap 저장 / 캐시 검증용 probe)
+alter table sessions add column if not exists state_version bigint not null default 0;
+-- 컬럼 도입 전 state_json에만 있던 버전 이관
+update sessions set state_version = (state_json->>'version')::bigint
+where state_version = 0 and (state_json->>'version') is not null;
+
+-- 게임 transcript (설명 / 토론 발언). state_json에는 넣지 않고 추가분만 insert
+create table if not exists session_transcript (
+    id bigserial primary key,
+    session_id uuid not null,
+    kind text not null,      -- descriptions | discussions
+    name text,               -- descriptions: 설명한 플레이어
+    text text not null
+);
+create index if not exists session_transcript_session on session_transcript (session_id, id);
+
+-- 폴링 / 이벤트 재생에서 세션별 ts 순 조회
+create index if not exists events_session_ts on events (session_id, ts);
+-- 서버가 매기는 기록 순번. ts는 클라이언트가 보낸 값일 수 있어 폴링 cursor로 쓰지 않는다
+alter table events add column if not exists seq bigserial;
+create index if not exists events_session_seq on events (session_id, seq);
+
+-- 이벤트 재생용 스냅샷: through_ts까지의 이벤트가 반영된 상태 (backend/replay.py)
+create table if not exists session_snapshots (
+    session_id uuid not null,
+    through_ts timestamptz not null,
+    state jsonb not null,
+    created_at timestamptz not null default now(),
+    primary key (session_id, through_ts)
+);
+-- 바이너리 코덱(backend/codec.py)으로 저장한 스냅샷. 있으면 state(JSON) 대신 사용
+alter table session_snapshots add column if not exists state_bin bytea;
+alter table session_snapshots alter column state drop not null;
+-- 스냅샷에 반영된 마지막 이벤트의 seq. 재생은 이 seq 다음부터 (through_seq 없는 옛 스냅샷은 쓰지 않음)
+alter table session_snapshots add column if not exists through_seq bigint;
+
+-- AI 턴 작업 큐 (AI_WORKER_MODE=queue)
+create table if not exists ai_jobs (
+    id bigserial primary key,
+    session_id uuid not null,
+    status text not null default 'queued',   -- queued | running | done | failed
+    attempts int not null default 0,
+    error text,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+-- 세션당 대기/실행 중인 작업은 하나만
+create unique index if not exists ai_jobs_active_session
+    on ai_jobs (session_id) where status in ('queued', 'running');
+create index if not exists ai_jobs_pick on ai_jobs (status, id);
+
+-- OpenAI 호출 rate limit 버킷 (LLM_RATE_BACKEND=postgres, backend/llm_rate.py)
+-- 모델별로 남은 요청 수 / 토큰 수와 마지막 갱신 시각. 값은 읽을 때 경과 시간만큼 채운다.
+create table if not exists llm_rate_buckets (
+    model text primary key,
+    requests double precision not null,
+    tokens double precision not null,
+    updated_at timestamptz not null default now()
+);
@@ -1,41 +1,87 @@
 # backend/serialize.py
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
 
 def _enum_name(x):
     return getattr(x, "name", x)
 
-def serialize_game(game) -> dict:
-    players = {}
-    for name, p in game.players.items():
-        players[name] = {
-            "name": p.name,
-            "is_ai": bool(getattr(p, "is_ai", False)),
-            "role": _enum_name(getattr(p, "role", None)),
-            "has_described": bool(getattr(p, "has_described", False)),
-            "has_voted": bool(getattr(p, "has_voted", False)),
-            "votes_received": int(getattr(p, "votes_received", 0)),
-            "is_fool": bool(getattr(p, "is_fool", False)),
-        }
-
+def _serialize_players(game) -> dict:
+    # Player.STATE_FIELDS에 선언된 필드만 (role만 enum -> 이름)
     return {
-        "game_state": _enum_name(game.game_state),
-        "category": game.category,
-        "keyword": game.keyword,
-        "turn_order": [p.name for p in game.turn_order],
-        "turn_index": int(game.turn_index),
-        "liar": getattr(getattr(game, "liar", None), "name", None),
-        "fool_player": getattr(getattr(game, "fool_player", None), "name", None),
-        "suspect": getattr(getattr(game, "suspect", None), "name", None),
-        "winner": _enum_name(getattr(game, "winner", None)),
-        "descriptions": dict(getattr(game, "descriptions", {}) or {}),
-        "discussions": list(getattr(game, "discussions", []) or []),
-        "discussion_rounds": int(getattr(game, "discussion_rounds", 1)),
-        "discussion_round_index": int(getattr(game, "discussion_round_index", 1)),
-        "human_suspect_name": getattr(game, "human_suspect_name", None),
-        "current_round": int(getattr(game, "current_round", 1)),
-        "players": players,
+        name: {f: _enum_name(getattr(p, f)) for f in p.STATE_FIELDS}
+        for name, p in game.players.items()
     }
 
+def _player_name(p):
+    return p.name if p is not None else None
+
+def _turn_order_names(game) -> list:
+    names = list(game.players)
+    return [names[i] for i in game.turn_order_ids]
+
+# GameSession 필드 -> state_json["game"] 값
+# (descriptions / discussions는 session_transcript 테이블에 따로 저장)
+_GAME_FIELDS = {
+    "game_state": lambda g: _enum_name(g.game_state),
+    "category": lambda g: g.category,
+    "keyword": lambda g: g.keyword,
+    "turn_order": _turn_order_names,
+    "turn_index": lambda g: g.turn_index,
+    "liar": lambda g: _player_name(g.liar),
+    "fool_player": lambda g: _player_name(g.fool_player),
+    "suspect": lambda g: _player_name(g.suspect),
+    "winner": lambda g: _enum_name(g.winner),
+    "discussion_rounds": lambda g: g.discussion_rounds,
+    "discussion_round_index": lambda g: g.discussion_round_index,
+    "human_suspect_name": lambda g: g.human_suspect_name,
+    "current_round": lambda g: g.current_round,
+    "players": _serialize_players,
+}
+
+def transcript_loaded(game) -> bool:
+    """False면 transcript 없이 읽은 읽기 전용 game (backend/codec.py decode_session(transcript=False))"""
+    return not isinstance(game.descriptions, MappingProxyType)
+
+def _require_transcript(game) -> None:
+    if not transcript_loaded(game):
+        raise ValueError("game was decoded without its transcript and is read-only")
+
+def serialize_game(game, fields: Optional[set] = None, include_transcript: bool = False) -> dict:
+    """
+    state_json["game"] 용 dict. fields를 주면 그 필드만 (델타 저장용).
+    transcript(descriptions / discussions)는 기본적으로 포함하지 않는다 -> transcript_rows()
+    include_transcript면 예전 형식처럼 dict 안에 함께 넣는다 (스냅샷용).
+    """
+    out = {}
+    for key, fn in _GAME_FIELDS.items():
+        if fields is None or key in fields:
+            out[key] = fn(game)
+    if include_transcript:
+        _require_transcript(game)
+        out["descriptions"] = dict(game.descriptions)
+        out["discussions"] = list(game.discussions)
+    else:
+        out["transcript"] = "table"
+    return out
+
+def transcript_rows(game, full: bool = False) -> Tuple[List[str], List[Tuple[str, Optional[str], str]]]:
+    """
+    session_transcript에 쓸 (교체할 kind 목록, 추가할 (kind, name, text) 행).
+    full이면 전체를 교체하고, 아니면 마지막 저장 이후 추가분만.
+    """
+    _require_transcript(game)
+    dirty = game.dirty_fields()
+    replace = [k for k in ("descriptions", "discussions") if full or k in dirty]
+    if full:
+        descs = list(game.descriptions.items())
+        discs = list(game.discussions)
+    else:
+        descs = game.new_descriptions()
+        discs = game.new_discussions()
+    rows = [("descriptions", name, text) for name, text in descs]
+    rows += [("discussions", None, line) for line in discs]
+    return replace, rows
+
 def deserialize_game(state: dict, GameSession, Player, AIPlayer, GameState, Role):
     g = GameSession()
     g.category = state.get("category")
@@ -49,31 +95,27 @@ def deserialize_game(state: dict, GameSession, Player, AIPlayer, GameState, Role
     g.current_round = int(state.get("current_round", 1))
 
     # game_state 복원
+    game_states = GameState.__members__
+    roles = Role.__members__
     gs = state.get("game_state")
-    if gs and hasattr(GameState, gs):
-        g.game_state = getattr(GameState, gs)
+    if gs in game_states:
+        g.game_state = game_states[gs]
 
     # players 복원
     g.players = {}
     for name, pdata in (state.get("players") or {}).items():
-        is_ai = bool(pdata.get("is_ai", False))
-        p = AIPlayer(name) if is_ai else Player(name)
-
+        p = AIPlayer(name) if pdata.get("is_ai") else Player(name)
+        # 선언된 필드 중 저장돼 있는 것만 덮어씀 (없으면 생성자 기본값)
+        for f in p.STATE_FIELDS:
+            if f in pdata and f not in ("name", "is_ai"):
+                setattr(p, f, pdata[f])
         role = pdata.get("role")
-        if role and hasattr(Role, role):
-            p.role = getattr(Role, role)
-
-        p.has_described = bool(pdata.get("has_described", False))
-        p.has_voted = bool(pdata.get("has_voted", False))
-        p.votes_received = int(pdata.get("votes_received", 0))
-        if pdata.get("is_fool"):
-            setattr(p, "is_fool", True)
-
+        p.role = roles[role] if role in roles else None
         g.players[name] = p
 
-    # turn_order 복원
-    order = state.get("turn_order") or []
-    g.turn_order = [g.players[n] for n in order if n in g.players]
+    # turn_order 복원 (players 순서 기준 번호)
+    ids = {n: i for i, n in enumerate(g.players)}
+    g.turn_order_ids = [ids[n] for n in (state.get("turn_order") or []) if n in ids]
 
     liar = state.get("liar")
     g.liar = g.players.get(liar) if liar else None
@@ -85,28 +127,33 @@ def deserialize_game(state: dict, GameSession, Player, AIPlayer, GameState, Role
     g.suspect = g.players.get(suspect) if suspect else None
 
     winner = state.get("winner")
-    if winner and hasattr(Role, winner):
-        g.winner = getattr(Role, winner)
+    if winner in roles:
+        g.winner = roles[winner]
 
+    # transcript가 이미 테이블에 있으면 지금 상태가 "저장된 상태" (다음 저장은 델타만)
+    # 예전 형식(state_json 안에 transcript)이면 전부 dirty로 남겨서 다음 저장 때 이관
+    if state.get("transcript") == "table":
+        g.mark_saved()
     return g
 
 def present_for_player(game, me_name: str, Role) -> dict:
     me = game.players.get(me_name)
-    my_role = getattr(me, "role", None)
+    my_role = me.role if me is not None else None
     keyword_for_me = game.keyword if my_role == Role.CITIZEN else "???"
+    order = _turn_order_names(game)
 
     return {
         "phase": _enum_name(game.game_state),
         "publicState": {
-            "round": int(getattr(game, "current_round", 1)),
-            "discussion_round_index": int(getattr(game, "discussion_round_index", 1)),
-            "discussion_rounds": int(getattr(game, "discussion_rounds", 1)),
+            "round": game.current_round,
+            "discussion_round_index": game.discussion_round_index,
+            "discussion_rounds": game.discussion_rounds,
             "topic": game.category,
-            "players": [{"name": p.name, "is_ai": bool(getattr(p, "is_ai", False))} for p in game.players.values()],
+            "players": [{"name": p.name, "is_ai": p.is_ai} for p in game.players.values()],
             "turn": {
-                "order": [p.name for p in game.turn_order],
-                "index": int(game.turn_index),
-                "currentPlayer": game.turn_order[game.turn_index].name if game.turn_order else None,
+                "order": order,
+                "index": game.turn_index,
+                "currentPlayer": order[game.turn_index] if order else None,
             },
         },
         "privateState": {
@@ -1,39 +1,264 @@
 # backend/server.py
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+import json
 import logging
 from pydantic import BaseModel
-from typing import Any, Dict, Optional, List
-from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Tuple
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv(".env.local")
 
-from backend.db import get_session_state, save_session_state, insert_event, insert_context_message
-from backend.serialize import serialize_game, deserialize_game, present_for_player
+from backend.db import (
+    EventBuffer,
+    get_session_state,
+    get_session_version,
+    save_session_state,
+    VersionConflict,
+    get_ai_job_status,
+    finish_ai_job,
+    get_events_after,
+    get_last_event_seq,
+    ensure_schema,
+    close_pool,
+    get_pool_stats,
+)
+from backend.worker import AI_WORKER_MODE, notify_job_enqueued, start_workers, stop_workers
+from backend.replay import (
+    SESSION_SNAPSHOT_EVERY,
+    SESSION_STATE_SOURCE,
+    ReplayError,
+    count_replay_events,
+    encode_snapshot,
+    rebuild_session,
+)
+from backend.session_lock import SessionBusy, SessionLock, session_locks
+from backend.session_cache import session_cache, SESSION_CACHE_ENABLED
+from backend.speculation import speculator
+from backend.llm_rate import install_rate_store
+from backend.serialize import serialize_game, deserialize_game, present_for_player, transcript_rows
 
 # 너의 엔진 코드 import (루트에 game/ 패키지가 있다는 전제)
 from game.game_session import GameSession
-from game.ai_player import AIPlayer
+from game.ai_player import AIPlayer, generate_bulk_votes
+from game.prompt_context import PromptContext
 from game.player import Player
 from game.constants import GameState, Role
-from game.config import FIXED_AI_DESCRIPTIONS, AMBIGUOUS_BOTS, DISCUSSION_AUTHORITATIVE
+from game.llm_client import close_clients
+from game.llm_cache import llm_cache
+from game.llm_usage import llm_usage
+from game.llm_resilience import llm_resilience
+from game.generation import DeadlineExceeded, deadline_exceeded, generation_deadline, generation_profile
+from game.llm_scheduler import Priority, llm_scheduler, llm_scope
+from game.config import (
+    FIXED_AI_DESCRIPTIONS,
+    AMBIGUOUS_BOTS,
+    DISCUSSION_AUTHORITATIVE,
+    PARALLEL_AI_VOTES,
+    BULK_AI_VOTES,
+    SPECULATIVE_DISCUSSION,
+    AI_VOTE_CONCURRENCY,
+    AI_VOTE_TIMEOUT_SECONDS,
+    AI_STEP_DEADLINE_SECONDS,
+)
 
 from typing import Any, Dict, Optional, List
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ensure_schema()
+    install_rate_store()
+    workers = start_workers(advance_session) if AI_WORKER_MODE == "queue" else []
+    yield
+    await stop_workers(workers)
+    await session_locks.close()
+    await close_pool()
+    await close_clients()
+
+app = FastAPI(lifespan=lifespan)
+
+# 스트리밍 시 메시지가 생성될 때마다 호출되는 콜백
+MessageCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+# 스트리밍 시 AI 발화의 토큰 조각마다 호출되는 콜백 (name, delta)
+TokenStreamCallback = Callable[[str, str], Awaitable[None]]
+
+async def _acquire_session_lock(session_id: str) -> SessionLock:
+    try:
+        return await session_locks.acquire(session_id)
+    except SessionBusy:
+        raise HTTPException(status_code=409, detail="session busy")
 
-_session_locks: Dict[str, Lock] = {}
-_session_locks_guard = Lock()
+async def _load_session(session_id: str) -> Tuple[GameSession, Dict[str, Any]]:
+    """캐시에 최신 버전이 있으면 그대로 쓰고, 아니면 DB에서 state를 읽어 복원"""
+    if SESSION_CACHE_ENABLED:
+        entry = session_cache.get(session_id)
+        if entry is not None:
+            try:
+                current_version = await get_session_version(session_id)
+            except KeyError:
+                session_cache.invalidate(session_id)
+                raise HTTPException(status_code=404, detail="session not found")
+            if current_version == entry.version:
+                return entry.game, entry.state
+            session_cache.mark_stale(session_id)
+
+    if SESSION_STATE_SOURCE == "events":
+        try:
+            return await rebuild_session(session_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="session not found")
+        except ReplayError as e:
+            # 재생 정보가 없는 예전 게임 등은 state_json으로
+            logging.info(f"[replay] {session_id}: {e}, falling back to state_json")
 
-def _acquire_session_lock(session_id: str, timeout_seconds: float = 10.0) -> Lock:
-    with _session_locks_guard:
-        lock = _session_locks.get(session_id)
-        if lock is None:
-            lock = Lock()
-            _session_locks[session_id] = lock
-    if not lock.acquire(timeout=timeout_seconds):
-        raise HTTPException(status_code=409, detail="session busy")
-    return lock
+    try:
+        state = await get_session_state(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="session not found")
+
+    game_state = state.get("game")
+    human_name = state.get("participantName")
+    if not game_state or not human_name:
+        raise HTTPException(status_code=400, detail="game not started for this session")
+
+    game = deserialize_game(game_state, GameSession, Player, AIPlayer, GameState, Role)
+    # 이후로는 game 객체가 기준 (state에는 participantName, votes_cast 등 최상위 값만 남김)
+    del state["game"]
+    return game, state
+
+async def _save_session(
+    session_id: str,
+    game: GameSession,
+    state: Dict[str, Any],
+    events: EventBuffer,
+    enqueue_job: bool = False,
+    full: bool = False,
+    complete_job: Optional[int] = None,
+) -> None:
+    """
+    읽었던 버전 기준으로 CAS 저장(write-through)한 뒤 캐시에 반영.
+    기본은 델타 저장(바뀐 game 필드 + 새 transcript 행만), full이면 state_json 전체를 교체.
+    """
+    # 재생 이벤트가 일정 수 쌓이면 같은 트랜잭션에서 스냅샷도 기록
+    snapshot = None
+    if SESSION_SNAPSHOT_EVERY > 0:
+        pending = int(state.get("events_since_snapshot", 0)) + count_replay_events(events.events)
+        if pending >= SESSION_SNAPSHOT_EVERY:
+            snapshot = encode_snapshot(game, state)
+            pending = 0
+        state["events_since_snapshot"] = pending
+
+    top = {k: v for k, v in state.items() if k != "game"}
+    if full:
+        top["game"] = serialize_game(game)
+        game_patch = None
+    else:
+        game_patch = serialize_game(game, game.dirty_fields())
+    try:
+        state["version"] = await save_session_state(
+            session_id,
+            top,
+            events,
+            enqueue_job=enqueue_job,
+            expected_version=int(state.get("version", 0)),
+            game_patch=game_patch,
+            transcript=transcript_rows(game, full=full),
+            snapshot=snapshot,
+            complete_job=complete_job,
+        )
+    except VersionConflict:
+        # 다른 프로세스가 먼저 저장함: 이번 변경은 버리고 클라이언트가 다시 시도
+        session_cache.invalidate(session_id)
+        raise HTTPException(status_code=409, detail="session was updated concurrently, retry")
+    game.mark_saved()
+    if SESSION_CACHE_ENABLED:
+        session_cache.put(session_id, game, state, state["version"])
+    if enqueue_job:
+        notify_job_enqueued()
+
+def _game_result(game: GameSession, votes_cast: Dict[str, str]) -> Dict[str, Any]:
+    liar = game.liar.name if game.liar else None
+    suspect = game.suspect.name if game.suspect else None
+    winner_side = None
+    if liar and suspect:
+        winner_side = "citizens" if liar == suspect else "liar"
+    return {
+        "winnerSide": winner_side,
+        "liar": liar,
+        "suspect": suspect,
+        "keyword": game.keyword,
+        "topic": game.category,
+        "votes": votes_cast,
+    }
+
+# 생성 설정에서 계산한 투표 제한 시간에 더하는 여유 (시도 자체의 시간 초과가 먼저 나도록)
+_VOTE_TIMEOUT_SLACK_SECONDS = 1.0
+
+def _vote_timeout(phase: str) -> Optional[float]:
+    if AI_VOTE_TIMEOUT_SECONDS is not None:
+        return AI_VOTE_TIMEOUT_SECONDS
+    budget = generation_profile(phase).budget()
+    return None if budget is None else budget + _VOTE_TIMEOUT_SLACK_SECONDS
+
+async def _generate_ai_votes(game: GameSession, voters: List[AIPlayer]) -> List[str]:
+    """
+    대기 중인 AI 투표를 동시에 생성한다. 투표는 고정된 설명/토론 기록에만 의존하므로 서로 독립적.
+    시간 초과/오류 시 기존과 같이 무작위 후보로 대체한다. 결과는 voters 순서와 같다.
+    BULK_AI_VOTES면 먼저 LLM 1회로 전원 투표를 받고, 잘못된 답이 나온 봇만 개별 생성한다.
+    """
+    players_list = list(game.players.values())
+    bulk: Dict[str, str] = {}
+    if BULK_AI_VOTES:
+        try:
+            bulk = await asyncio.wait_for(
+                generate_bulk_votes(
+                    voters, players_list, game.descriptions, game.discussions, game.category,
+                    context=game.prompt_context,
+                ),
+                timeout=_vote_timeout("BULK_VOTING"),
+            )
+        except DeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            logging.warning("⚠️ 일괄 투표 시간 초과 -> 봇별 개별 생성")
+    semaphore = asyncio.Semaphore(max(1, AI_VOTE_CONCURRENCY))
+
+    async def one(voter: AIPlayer) -> str:
+        if voter.name in bulk:
+            return bulk[voter.name]
+        keyword = game.keyword if voter.role == Role.CITIZEN else None
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    voter.generate_vote(
+                        players_list,
+                        game.descriptions,
+                        game.discussions,
+                        game.category,
+                        keyword,
+                        context=game.prompt_context,
+                    ),
+                    timeout=_vote_timeout("VOTING"),
+                )
+            except DeadlineExceeded:
+                raise
+            except asyncio.TimeoutError:
+                fallback = voter.fallback_vote(players_list)
+                logging.warning(f"⚠️ [{voter.name}] 투표 시간 초과 (Random) -> [{fallback}]")
+                return fallback
+
+    tasks = [asyncio.create_task(one(v)) for v in voters]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        # 하나가 DeadlineExceeded로 끝나거나 요청이 취소되면 나머지 투표 생성도 멈춘다
+        pending = [t for t in tasks if not t.done()]
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
 class StartReq(BaseModel):
     sessionId: str
@@ -45,16 +270,77 @@ class StepReq(BaseModel):
     sessionId: str
     action: Dict[str, Any]
 
-def _run_ai_until_human(
+class SpeculateReq(BaseModel):
+    sessionId: str
+    text: str
+
+def _discussion_kwargs(game: GameSession, p: AIPlayer, context: PromptContext) -> Dict[str, Any]:
+    """
+    토론 발언 생성 입력값 (입장/타겟 조작 포함). 실제 생성과 추측 생성이 같이 사용한다.
+    context: 토론 기록이 담긴 PromptContext (실제 차례면 game.prompt_context, 추측이면 그 사본)
+    """
+    keyword = game.keyword if p.role == Role.CITIZEN else ""
+    human_suspect = game.human_suspect_name or ""
+    ambiguous_pool = sorted([name for name in AMBIGUOUS_BOTS if name in game.players])
+    framed_target = None
+    if ambiguous_pool:
+        if human_suspect in ambiguous_pool:
+            framed_target = next((name for name in ambiguous_pool if name != human_suspect), None)
+        else:
+            framed_target = ambiguous_pool[0]
+
+    stance = "DISAGREE"
+    target_override = framed_target
+
+    if framed_target and p.name == framed_target:
+        stance = "DEFENSE"
+        if human_suspect and human_suspect != p.name:
+            target_override = human_suspect
+        else:
+            target_override = next((name for name in ambiguous_pool if name != p.name), None)
+            if not target_override:
+                target_override = next(
+                    (name for name in game.players.keys() if name != p.name),
+                    None,
+                )
+
+    return {
+        "category": game.category,
+        "keyword": keyword,
+        "descriptions": game.descriptions,
+        "human_suspect": human_suspect,
+        "stance": stance,
+        "players_list": list(game.players.values()),
+        "context": context,
+        "is_authoritative": DISCUSSION_AUTHORITATIVE,
+        "target_override": target_override,
+    }
+
+async def _run_ai_until_human(
     game: GameSession,
     human_name: str,
-    session_id: str,
+    events: EventBuffer,
     allow_discussion: bool = False,
     votes_cast: Optional[Dict[str, str]] = None,
     max_ai_steps: Optional[int] = None,          # ✅ 추가
+    on_message: Optional[MessageCallback] = None,
+    on_token: Optional[TokenStreamCallback] = None,
 ) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     votes_cast = votes_cast if votes_cast is not None else {}
+
+    async def emit(msg: Dict[str, Any]) -> None:
+        out.append(msg)
+        if on_message is not None:
+            await on_message(msg)
+
+    def token_sink(name: str):
+        if on_token is None:
+            return None
+
+        async def sink(delta: str) -> None:
+            await on_token(name, delta)
+        return sink
     
     if max_ai_steps == 0:
         return out
@@ -64,151 +350,154 @@ def _run_ai_until_human(
     def step_limit_reached() -> bool:
         return (max_ai_steps is not None) and (steps_done >= max_ai_steps)
 
-    while True:
-        if game.game_state == GameState.ENDED:
-            break
+    try:
+        while True:
+            if game.game_state == GameState.ENDED:
+                break
 
-        if game.game_state == GameState.DISCUSSION and not allow_discussion:
-            break
+            # 요청 마감(generation_deadline)이 지났으면 새 AI 턴을 시작하지 않음
+            if deadline_exceeded():
+                logging.warning("⚠️ 요청 시간 예산 소진 -> 남은 AI 턴은 다음 요청에서 진행")
+                break
 
-        # 인간 턴이면 멈춤
-        if game.game_state in (GameState.DESCRIPTION, GameState.DISCUSSION) and game.turn_order and game.current_player.name == human_name:
-            break
+            if game.game_state == GameState.DISCUSSION and not allow_discussion:
+                break
 
-        # DESCRIPTION / DISCUSSION
-        if game.game_state in (GameState.DESCRIPTION, GameState.DISCUSSION):
-            p = game.current_player
-            if not getattr(p, "is_ai", False):
+            # 인간 턴이면 멈춤
+            if game.game_state in (GameState.DESCRIPTION, GameState.DISCUSSION) and game.turn_order and game.current_player.name == human_name:
                 break
 
-        if game.game_state == GameState.DESCRIPTION:
-                keyword = game.keyword if p.role == Role.CITIZEN else ""
-                fixed_content = FIXED_AI_DESCRIPTIONS.get(p.name, "").strip()
-                text = p.generate_description(
-                    game.category,
-                    keyword,
-                    game.descriptions,
-                    fixed_content=fixed_content if fixed_content else None,
-                )
-                game.handle_description(text)
-                auth = DISCUSSION_AUTHORITATIVE
-                group = "experimental" if auth else "control"
-                insert_event(
-                    session_id,
-                    "AI_DESCRIPTION",
-                    {"by": p.name, "text": text, "auth": auth, "group": group},
-                )
-                insert_context_message(session_id, "assistant", p.name, text, "DESCRIPTION")
-                out.append({"sender": "ai", "name": p.name, "content": text})
+            # DESCRIPTION / DISCUSSION
+            if game.game_state in (GameState.DESCRIPTION, GameState.DISCUSSION):
+                p = game.current_player
+                if not getattr(p, "is_ai", False):
+                    break
+
+            if game.game_state == GameState.DESCRIPTION:
+                    keyword = game.keyword if p.role == Role.CITIZEN else ""
+                    fixed_content = FIXED_AI_DESCRIPTIONS.get(p.name, "").strip()
+                    text = await p.generate_description(
+                        game.category,
+                        keyword,
+                        game.descriptions,
+                        fixed_content=fixed_content if fixed_content else None,
+                        on_token=token_sink(p.name),
+                        context=game.prompt_context,
+                    )
+                    game.handle_description(text)
+                    auth = DISCUSSION_AUTHORITATIVE
+                    group = "experimental" if auth else "control"
+                    events.add(
+                        "AI_DESCRIPTION",
+                        {"by": p.name, "text": text, "auth": auth, "group": group},
+                    )
+                    events.add_context_message("assistant", p.name, text, "DESCRIPTION")
+                    await emit({"sender": "ai", "name": p.name, "content": text})
+                    steps_done += 1
+
+                    # ✅ 스텝 제한
+                    if step_limit_reached():
+                        break
+
+                    # ✅ mid-check 전이면 DISCUSSION 넘어가는 순간 끊기
+                    if game.game_state == GameState.DISCUSSION and not allow_discussion:
+                        break
+
+            elif game.game_state == GameState.DISCUSSION:
+                gen_kwargs = _discussion_kwargs(game, p, game.prompt_context)
+                text = None
+                if SPECULATIVE_DISCUSSION:
+                    # 인간이 입력하는 동안 미리 만들어 둔 발언이 있고 입력값이 그대로면 재사용
+                    text = await speculator.take(events.session_id, p, gen_kwargs)
+                if text is None:
+                    text = await p.generate_discussion(**gen_kwargs, on_token=token_sink(p.name))
+                game.handle_discussion(text)
+                events.add("AI_DISCUSSION", {"by": p.name, "text": text})
+                events.add_context_message("assistant", p.name, text, "DISCUSSION")
+                await emit({"sender": "ai", "name": p.name, "content": text})
                 steps_done += 1
 
                 # ✅ 스텝 제한
                 if step_limit_reached():
                     break
 
-                # ✅ mid-check 전이면 DISCUSSION 넘어가는 순간 끊기
-                if game.game_state == GameState.DISCUSSION and not allow_discussion:
-                    break
+            if game.game_state in (GameState.DESCRIPTION, GameState.DISCUSSION):
+                continue
 
-        elif game.game_state == GameState.DISCUSSION:
-            keyword = game.keyword if p.role == Role.CITIZEN else ""
-            human_suspect = game.human_suspect_name or ""
-            ambiguous_pool = sorted([name for name in AMBIGUOUS_BOTS if name in game.players])
-            framed_target = None
-            if ambiguous_pool:
-                if human_suspect in ambiguous_pool:
-                    framed_target = next((name for name in ambiguous_pool if name != human_suspect), None)
-                else:
-                    framed_target = ambiguous_pool[0]
-
-            stance = "DISAGREE"
-            target_override = framed_target
-
-            if framed_target and p.name == framed_target:
-                stance = "DEFENSE"
-                if human_suspect and human_suspect != p.name:
-                    target_override = human_suspect
-                else:
-                    target_override = next((name for name in ambiguous_pool if name != p.name), None)
-                    if not target_override:
-                        target_override = next(
-                            (name for name in game.players.keys() if name != p.name),
-                            None,
-                        )
-
-            text = p.generate_discussion(
-                category=game.category,
-                keyword=keyword,
-                descriptions=game.descriptions,
-                human_suspect=human_suspect,
-                stance=stance,
-                players_list=list(game.players.values()),
-                current_discussion_log=game.discussions,
-                is_authoritative=DISCUSSION_AUTHORITATIVE,
-                target_override=target_override,
-            )
-            game.handle_discussion(text)
-            insert_event(session_id, "AI_DISCUSSION", {"by": p.name, "text": text})
-            insert_context_message(session_id, "assistant", p.name, text, "DISCUSSION")
-            out.append({"sender": "ai", "name": p.name, "content": text})
-            steps_done += 1
+            # VOTING (AI vote는 메시지 안 뿌리지만 step은 1로 카운트)
+            if game.game_state == GameState.VOTING:
+                not_voted = [p for p in game.players.values() if not getattr(p, "has_voted", False)]
+                if not not_voted:
+                    break
 
-            # ✅ 스텝 제한
-            if step_limit_reached():
-                break
+                voter = not_voted[0]
+                if voter.name == human_name:
+                    break
 
-        if game.game_state in (GameState.DESCRIPTION, GameState.DISCUSSION):
-            continue
+                if (PARALLEL_AI_VOTES or BULK_AI_VOTES) and getattr(voter, "is_ai", False):
+                    # 인간 차례 전까지 연속된 AI 투표를 한 번에 생성하고, 원래 순서대로 반영 (배치 1회 = 1 step)
+                    batch = []
+                    for p in not_voted:
+                        if p.name == human_name or not getattr(p, "is_ai", False):
+                            break
+                        batch.append(p)
+
+                    targets = await _generate_ai_votes(game, batch)
+                    for p, target in zip(batch, targets):
+                        ok = game.handle_vote(p, target)
+                        votes_cast[p.name] = target
+                        events.add("AI_VOTE", {"by": p.name, "target": target, "ok": ok})
+                    steps_done += 1
+
+                    if step_limit_reached():
+                        break
+                    continue
+
+                if getattr(voter, "is_ai", False):
+                    keyword = game.keyword if voter.role == Role.CITIZEN else None
+                    target = await voter.generate_vote(
+                        list(game.players.values()),
+                        game.descriptions,
+                        game.discussions,
+                        game.category,
+                        keyword,
+                        context=game.prompt_context,
+                    )
+                    ok = game.handle_vote(voter, target)
+                    votes_cast[voter.name] = target
+                    events.add("AI_VOTE", {"by": voter.name, "target": target, "ok": ok})
+                    steps_done += 1
+
+                    if step_limit_reached():
+                        break
+                    continue
 
-        # VOTING (AI vote는 메시지 안 뿌리지만 step은 1로 카운트)
-        if game.game_state == GameState.VOTING:
-            not_voted = [p for p in game.players.values() if not getattr(p, "has_voted", False)]
-            if not not_voted:
                 break
 
-            voter = not_voted[0]
-            if voter.name == human_name:
+            # FINAL_GUESS
+            if game.game_state == GameState.FINAL_GUESS:
+                liar = game.liar
+                if liar and getattr(liar, "is_ai", False):
+                    guess = await liar.generate_guess(
+                        game.category, game.descriptions, on_token=token_sink(liar.name), context=game.prompt_context,
+                    )
+                    game.handle_final_guess(guess)
+                    events.add("AI_FINAL_GUESS", {"by": liar.name, "guess": guess})
+                    await emit({"sender": "ai", "name": liar.name, "content": f"(final guess) {guess}"})
                 break
 
-            if getattr(voter, "is_ai", False):
-                keyword = game.keyword if voter.role == Role.CITIZEN else None
-                target = voter.generate_vote(
-                    list(game.players.values()),
-                    game.descriptions,
-                    game.discussions,
-                    game.category,
-                    keyword,
-                )
-                ok = game.handle_vote(voter, target)
-                votes_cast[voter.name] = target
-                insert_event(session_id, "AI_VOTE", {"by": voter.name, "target": target, "ok": ok})
-                steps_done += 1
-
-                if step_limit_reached():
-                    break
-                continue
-
-            break
-
-        # FINAL_GUESS
-        if game.game_state == GameState.FINAL_GUESS:
-            liar = game.liar
-            if liar and getattr(liar, "is_ai", False):
-                guess = liar.generate_guess(game.category, game.descriptions)
-                game.handle_final_guess(guess)
-                insert_event(session_id, "AI_FINAL_GUESS", {"by": liar.name, "guess": guess})
-                out.append({"sender": "ai", "name": liar.name, "content": f"(final guess) {guess}"})
             break
-
-        break
+    except DeadlineExceeded:
+        # 생성 중에 마감에 걸린 턴은 game에 반영하지 않는다 (다음 요청에서 그 턴부터 다시)
+        logging.warning("⚠️ 요청 시간 예산 소진 (생성 중단) -> 남은 AI 턴은 다음 요청에서 진행")
 
     return out
 
 
 
 @app.post("/game/start")
-def game_start(req: StartReq):
-    lock = _acquire_session_lock(req.sessionId)
+async def game_start(req: StartReq):
+    lock = await _acquire_session_lock(req.sessionId)
     try:
         ai_count = 4
         if req.aiCount != ai_count:
@@ -220,10 +509,11 @@ def game_start(req: StartReq):
 
         # session 존재 확인
         try:
-            _ = get_session_state(req.sessionId)
+            prev_state = await get_session_state(req.sessionId)
         except KeyError:
             raise HTTPException(status_code=404, detail="session not found (call /api/session/start first)")
 
+        speculator.cancel(req.sessionId)
         game = GameSession()
         game.add_player(req.participantName)
 
@@ -239,42 +529,138 @@ def game_start(req: StartReq):
             game.add_player(name)
             game.players[name] = AIPlayer(name)
 
-        ok = game.start_game(liar_count=1, use_fool=req.useFool)
+        # 같은 참가자에게 이미 나온 제시어는 다시 뽑지 않음
+        used_keywords = list(prev_state.get("used_keywords") or [])
+        ok = game.start_game(liar_count=1, use_fool=req.useFool, exclude_keywords=set(used_keywords))
         if not ok:
             raise HTTPException(status_code=500, detail="failed to start game")
+        if game.keyword in used_keywords:
+            # 제시어를 모두 사용해서 다시 나옴: 새 주기로 목록을 비운다
+            used_keywords = []
 
         # DB 저장
-        serialized = serialize_game(game)
         logging.info(
             "[diag] game_start discussion rounds=%s index=%s",
-            serialized.get("discussion_rounds"),
-            serialized.get("discussion_round_index"),
+            game.discussion_rounds,
+            game.discussion_round_index,
         )
         state = {
             "participantName": req.participantName,
-            "game": serialized,
+            "version": int(prev_state.get("version", 0)),
+            "used_keywords": used_keywords + [game.keyword],
         }
-        save_session_state(req.sessionId, state)
-
-        insert_event(req.sessionId, "GAME_STARTED", {
+        events = EventBuffer(req.sessionId)
+        events.add("GAME_STARTED", {
             "participantName": req.participantName,
             "aiCount": ai_count,
             "useFool": req.useFool,
             "category": game.category,
             "keyword": game.keyword,   # DB에는 저장(관리자용)
-            "liar": game.liar.name if game.liar else None
+            "liar": game.liar.name if game.liar else None,
+            # 이벤트만으로 게임을 재구성할 수 있도록 무작위로 정해진 값도 기록 (backend/replay.py)
+            "players": [{"name": p.name, "is_ai": bool(p.is_ai)} for p in game.players.values()],
+            "turnOrder": [p.name for p in game.turn_order],
+            "fool": game.fool_player.name if game.fool_player else None,
+            "discussionRounds": game.discussion_rounds,
         })
+        # 상태 + 이벤트를 한 트랜잭션으로 저장 (새 게임이므로 state_json 전체 교체)
+        await _save_session(req.sessionId, game, state, events, full=True)
 
         # 참가자에게 보여줄 응답(라이어면 keyword 숨김)
         presented = present_for_player(game, req.participantName, Role)
         presented.update({"ok": True, "from": "python", "sessionId": req.sessionId, "messages": []})
+        if AI_WORKER_MODE == "queue":
+            # 이후 워커가 남기는 AI 메시지는 /game/poll?after=cursor로 받는다
+            presented["cursor"] = await get_last_event_seq(req.sessionId)
         return presented
+    except BaseException:
+        session_cache.invalidate(req.sessionId)
+        raise
     finally:
-        lock.release()
+        await lock.release()
 
 @app.post("/game/step")
-def game_step(req: StepReq):
-    lock = _acquire_session_lock(req.sessionId)
+async def game_step(req: StepReq):
+    return await _step(req)
+
+@app.post("/game/speculate")
+async def game_speculate(req: SpeculateReq):
+    """
+    인간이 토론 발언을 입력하는 중에 (입력이 멈출 때마다) 호출. 그 문장을 보낸다고 보고 다음 AI 발언을 미리 생성한다.
+    캐시에 있는 game만 읽고 락/저장은 하지 않는다 (맞지 않는 추측은 실제 차례에 fingerprint로 걸러진다).
+    """
+    started = False
+    entry = session_cache.get(req.sessionId) if SPECULATIVE_DISCUSSION and SESSION_CACHE_ENABLED else None
+    if entry is not None:
+        game = entry.game
+        human_name = entry.state.get("participantName")
+        if (
+            game.game_state == GameState.DISCUSSION
+            and game.turn_order
+            and game.current_player.name == human_name
+        ):
+            started = speculator.start(req.sessionId, game, human_name, _discussion_kwargs, req.text)
+    return {"ok": True, "started": started}
+
+@app.post("/game/stream")
+async def game_stream(req: StepReq):
+    """
+    SSE 버전의 step. 요청 하나를 열어둔 채로 인간 차례(또는 mid-check/종료)까지 AI를 진행하고,
+    메시지가 생성될 때마다 `message` 이벤트로, 생성 중인 AI 발화의 토큰 조각은 `token` 이벤트로
+    보낸다. 상태 저장은 마지막에 한 번만 하고
+    최종 응답(/game/step과 같은 형태)을 `state` 이벤트로 보낸다.
+    큐 모드면 AI 턴은 워커가 진행하므로 `state`(pending + cursor)만 보낸다 (이후는 /game/poll).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_message(msg: Dict[str, Any]) -> None:
+        await queue.put(("message", msg))
+
+    async def on_token(name: str, delta: str) -> None:
+        await queue.put(("token", {"name": name, "delta": delta}))
+
+    async def run() -> None:
+        try:
+            presented = await _step(req, on_message=on_message, on_token=on_token, stream=True)
+            await queue.put(("state", presented))
+        except HTTPException as e:
+            await queue.put(("error", {"status": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            logging.exception("[stream] step failed")
+            await queue.put(("error", {"status": 500, "detail": str(e)}))
+        finally:
+            await queue.put(None)
+
+    # 클라이언트가 끊겨도 step은 끝까지 진행해 상태를 저장한다
+    task = asyncio.create_task(run())
+
+    async def events_iter():
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            event, data = item
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        await task
+
+    return StreamingResponse(
+        events_iter(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _step(
+    req: StepReq,
+    on_message: Optional[MessageCallback] = None,
+    on_token: Optional[TokenStreamCallback] = None,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    if AI_WORKER_MODE == "queue" and (req.action or {}).get("type") == "noop":
+        # 큐 모드의 noop은 읽기 전용: AI 턴은 워커가 진행하므로 락/저장/이벤트/작업 등록 없이
+        # 커밋된 상태와 진행 여부(pending)만 돌려준다 (메시지는 /game/poll로)
+        return await game_poll(req.sessionId, await get_last_event_seq(req.sessionId))
+
+    lock = await _acquire_session_lock(req.sessionId)
     try:
         debug_logger = logging.getLogger("uvicorn.error")
         debug_logger.warning(
@@ -282,27 +668,17 @@ def game_step(req: StepReq):
             req.sessionId,
             req.action.get("type") if req.action else None,
         )
-        # state 로드
-        try:
-            state = get_session_state(req.sessionId)
-            votes_cast = state.setdefault("votes_cast", {})  # ✅ 추가
-        except KeyError:
-            raise HTTPException(status_code=404, detail="session not found")
-
-        game_state = state.get("game")
+        # state 로드 (hot 세션은 캐시에서)
+        game, state = await _load_session(req.sessionId)
+        votes_cast = state.setdefault("votes_cast", {})  # ✅ 추가
         human_name = state.get("participantName")
-        if not game_state or not human_name:
-            raise HTTPException(status_code=400, detail="game not started for this session")
-
-        game = deserialize_game(game_state, GameSession, Player, AIPlayer, GameState, Role)
         debug_logger.warning(
-            "[DISCUSSION_DEBUG] loaded state phase=%s round=%s/%s turn_index=%s current_player=%s (raw_rounds=%s)",
+            "[DISCUSSION_DEBUG] loaded state phase=%s round=%s/%s turn_index=%s current_player=%s",
             getattr(game.game_state, "name", game.game_state),
             getattr(game, "discussion_round_index", None),
             getattr(game, "discussion_rounds", None),
             getattr(game, "turn_index", None),
             game.current_player.name if game.turn_order else None,
-            game_state.get("discussion_rounds"),
         )
 
         action = req.action or {}
@@ -327,10 +703,12 @@ def game_step(req: StepReq):
             max_ai_steps = None
 
         # ✅ NEW: noop이면 기본 1 step (프론트 pumpAI가 “한 번에 하나씩” 받게)
-        if a_type == "noop" and max_ai_steps is None:
+        # (스트리밍이면 요청 하나에서 끝까지 진행하므로 제한하지 않음)
+        if a_type == "noop" and max_ai_steps is None and not stream:
             max_ai_steps = 1
 
         messages_out: List[Dict[str, Any]] = []
+        events = EventBuffer(req.sessionId)
 
         # 인간 액션 처리
         if a_type == "description":
@@ -340,9 +718,11 @@ def game_step(req: StepReq):
             if game.game_state != GameState.DESCRIPTION or game.current_player.name != human_name:
                 raise HTTPException(status_code=409, detail="not your turn for description")
             game.handle_description(text)
-            insert_event(req.sessionId, "HUMAN_DESCRIPTION", {"by": human_name, "text": text})
-            insert_context_message(req.sessionId, "user", human_name, text, "DESCRIPTION")
+            events.add("HUMAN_DESCRIPTION", {"by": human_name, "text": text})
+            events.add_context_message("user", human_name, text, "DESCRIPTION")
             messages_out.append({"sender": "user", "name": human_name, "content": text})
+            if on_message is not None:
+                await on_message(messages_out[-1])
 
         elif a_type == "discussion":
             text = (action.get("text") or "").strip()
@@ -351,9 +731,11 @@ def game_step(req: StepReq):
             if game.game_state != GameState.DISCUSSION or game.current_player.name != human_name:
                 raise HTTPException(status_code=409, detail="not your turn for discussion")
             game.handle_discussion(text)
-            insert_event(req.sessionId, "HUMAN_DISCUSSION", {"by": human_name, "text": text})
-            insert_context_message(req.sessionId, "user", human_name, text, "DISCUSSION")
+            events.add("HUMAN_DISCUSSION", {"by": human_name, "text": text})
+            events.add_context_message("user", human_name, text, "DISCUSSION")
             messages_out.append({"sender": "user", "name": human_name, "content": text})
+            if on_message is not None:
+                await on_message(messages_out[-1])
 
         elif a_type == "mid_check":      
             # UI 중간점검(토론 들어가기 전) 기록 + 순서 재배열
@@ -365,7 +747,11 @@ def game_step(req: StepReq):
             
             if hasattr(game, "reorder_for_discussion"):
                 game.reorder_for_discussion()
-            insert_event(req.sessionId, "MID_CHECK", {"suspectName": suspect, "confidence": confidence})
+            events.add("MID_CHECK", {
+                "suspectName": suspect,
+                "confidence": confidence,
+                "turnOrder": [p.name for p in game.turn_order],
+            })
 
         elif a_type == "vote":
             target = (action.get("targetName") or "").strip()
@@ -384,7 +770,7 @@ def game_step(req: StepReq):
                 raise HTTPException(status_code=400, detail="invalid vote")
 
             votes_cast[human_name] = target  # ✅ 기록
-            insert_event(req.sessionId, "HUMAN_VOTE", {
+            events.add("HUMAN_VOTE", {
                 "by": human_name,
                 "target": target,
                 "confidence": confidence,
@@ -392,20 +778,32 @@ def game_step(req: StepReq):
             # ✅ "You voted for ..." 메시지 제거
 
         elif a_type == "noop":
-            insert_event(req.sessionId, "NOOP", {})
+            events.add("NOOP", {})
 
         else:
             raise HTTPException(status_code=400, detail="unknown action.type")
 
         allow_discussion = bool(state.get("mid_check_done", False))
-        ai_msgs = _run_ai_until_human(
-            game,
-            human_name,
-            req.sessionId,
-            allow_discussion,
-            votes_cast=votes_cast,
-            max_ai_steps=max_ai_steps,
-        )
+        # 큐 모드에서는 AI 턴을 요청 안에서 돌리지 않음 (스트리밍도 워커와 같은 세션을 두고 경쟁하지 않도록)
+        queue_ai = AI_WORKER_MODE == "queue"
+        ai_msgs = []
+        ai_deferred = False
+        if not queue_ai:
+            # 요청 시간 예산: 넘으면 남은 AI 턴은 다음 요청(noop)에서 이어서
+            # 인간이 기다리는 턴이라 rate limit 대기열에서 추측 생성보다 먼저 허용된다
+            with generation_deadline(AI_STEP_DEADLINE_SECONDS), llm_scope(req.sessionId, Priority.INTERACTIVE):
+                ai_msgs = await _run_ai_until_human(
+                    game,
+                    human_name,
+                    events,
+                    allow_discussion,
+                    votes_cast=votes_cast,
+                    max_ai_steps=max_ai_steps,
+                    on_message=on_message,
+                    on_token=on_token,
+                )
+                # 마감에 걸려 멈췄으면 클라이언트가 바로 다음 요청으로 이어가도록 알린다
+                ai_deferred = deadline_exceeded()
         debug_logger.warning(
             "[DISCUSSION_DEBUG] after ai phase=%s round=%s/%s turn_index=%s current_player=%s",
             getattr(game.game_state, "name", game.game_state),
@@ -420,9 +818,8 @@ def game_step(req: StepReq):
 
         # ✅ DISCUSSION에 들어왔는데 mid-check 안했으면: ui.need로 프론트에 알리기
         if game.game_state == GameState.DISCUSSION and not state.get("mid_check_done", False):
-            state["game"] = serialize_game(game)
             state["votes_cast"] = votes_cast
-            save_session_state(req.sessionId, state)
+            await _save_session(req.sessionId, game, state, events)
 
             presented = present_for_player(game, human_name, Role)
             presented.update({
@@ -435,46 +832,136 @@ def game_step(req: StepReq):
             return presented
 
         # 저장
-        serialized = serialize_game(game)
         logging.info(
             "[diag] saving discussion rounds=%s index=%s",
-            serialized.get("discussion_rounds"),
-            serialized.get("discussion_round_index"),
+            game.discussion_rounds,
+            game.discussion_round_index,
         )
-        state["game"] = serialized
         state["votes_cast"] = votes_cast
-        save_session_state(req.sessionId, state)
 
         presented = present_for_player(game, human_name, Role)
         presented.update({"ok": True, "from": "python", "sessionId": req.sessionId, "messages": all_msgs})
+        if ai_deferred:
+            presented["aiDeferred"] = True
 
-        # ✅ ENDED면 result 포함 + GAME_ENDED 이벤트도 return 전에 찍기
+        # ✅ ENDED면 result 포함 + GAME_ENDED 이벤트도 저장 전에 버퍼에 넣기
         if game.game_state == GameState.ENDED:
-            liar = game.liar.name if game.liar else None
-            suspect = game.suspect.name if game.suspect else None
-            winner_side = None
-            if liar and suspect:
-                winner_side = "citizens" if liar == suspect else "liar"
-
-            presented["result"] = {
-                "winnerSide": winner_side,
-                "liar": liar,
-                "suspect": suspect,
-                "keyword": game.keyword,
-                "topic": game.category,
-                "votes": votes_cast,
-            }
+            result = _game_result(game, votes_cast)
+            presented["result"] = result
             presented["descriptions"] = dict(getattr(game, "descriptions", {}) or {})
+            events.add("GAME_ENDED", dict(result))
 
-            insert_event(req.sessionId, "GAME_ENDED", {
-                "winnerSide": winner_side,
-                "liar": liar,
-                "suspect": suspect,
-                "keyword": game.keyword,
-                "topic": game.category,
-                "votes": votes_cast,
-            })
+        # 큐 모드면 AI 턴은 워커가 진행 (클라이언트는 /game/poll로 확인)
+        enqueue_job = queue_ai and game.game_state != GameState.ENDED
+        if enqueue_job:
+            presented["pending"] = True
+
+        # 상태 + 이번 step의 이벤트를 한 트랜잭션으로 저장
+        await _save_session(req.sessionId, game, state, events, enqueue_job=enqueue_job)
+        if enqueue_job:
+            # 워커가 남길 AI 메시지는 이 시점 이후 이벤트 (/game/poll의 after)
+            presented["cursor"] = await get_last_event_seq(req.sessionId)
 
         return presented
+    except BaseException:
+        # 메모리상의 game이 저장 안 된 채로 변경됐을 수 있으므로 캐시에서 제거
+        session_cache.invalidate(req.sessionId)
+        raise
     finally:
-        lock.release()
+        await lock.release()
+
+
+async def advance_session(session_id: str, job_id: int) -> None:
+    """
+    워커용: 인간 차례(또는 mid-check/종료)까지 AI 턴을 진행하고 저장한다.
+    /game/step과 같은 세션 락을 사용한다.
+    작업(job_id)은 락을 놓기 전에 끝낸다 (결과 저장과 같은 트랜잭션). 락이 풀린 뒤에도 running이면
+    인간의 다음 step이 등록하는 작업이 '대기/실행 중 작업 1개' 제약에 걸려 버려진다.
+    """
+    lock = await _acquire_session_lock(session_id)
+    try:
+        game, state = await _load_session(session_id)
+        human_name = state.get("participantName")
+        votes_cast = state.setdefault("votes_cast", {})
+        events = EventBuffer(session_id)
+
+        with llm_scope(session_id, Priority.INTERACTIVE):
+            await _run_ai_until_human(
+                game,
+                human_name,
+                events,
+                bool(state.get("mid_check_done", False)),
+                votes_cast=votes_cast,
+            )
+        if not len(events):
+            # 진행할 AI 턴이 없었음
+            await finish_ai_job(job_id)
+            return
+
+        if game.game_state == GameState.ENDED:
+            events.add("GAME_ENDED", _game_result(game, votes_cast))
+        state["votes_cast"] = votes_cast
+        await _save_session(session_id, game, state, events, complete_job=job_id)
+    except BaseException:
+        session_cache.invalidate(session_id)
+        raise
+    finally:
+        await lock.release()
+
+# 폴링 응답에 메시지로 돌려줄 AI 이벤트
+_POLL_EVENT_TYPES = ["AI_DESCRIPTION", "AI_DISCUSSION", "AI_FINAL_GUESS"]
+
+@app.get("/game/poll")
+async def game_poll(sessionId: str, after: Optional[int] = None):
+    """
+    큐 모드에서 클라이언트가 AI 진행 상황을 확인하는 용도.
+    after(이전 응답의 cursor) 이후의 AI 메시지와 마지막으로 저장된 상태를 돌려준다.
+    """
+    try:
+        state = await get_session_state(sessionId)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="session not found")
+    human_name = state.get("participantName")
+    if not state.get("game") or not human_name:
+        raise HTTPException(status_code=400, detail="game not started for this session")
+    # 워커가 진행 중인 캐시 객체 대신, 커밋된 상태를 기준으로 보여준다
+    game = deserialize_game(state["game"], GameSession, Player, AIPlayer, GameState, Role)
+
+    rows = await get_events_after(sessionId, after, _POLL_EVENT_TYPES)
+    messages = []
+    for row in rows:
+        payload = row["payload"] or {}
+        content = payload.get("text")
+        if row["type"] == "AI_FINAL_GUESS":
+            content = f"(final guess) {payload.get('guess')}"
+        messages.append({"sender": "ai", "name": payload.get("by"), "content": content})
+
+    job_status = await get_ai_job_status(sessionId)
+    presented = present_for_player(game, human_name, Role)
+    presented.update({
+        "ok": True,
+        "from": "python",
+        "sessionId": sessionId,
+        "messages": messages,
+        "cursor": rows[-1]["seq"] if rows else after,
+        "pending": job_status in ("queued", "running"),
+    })
+    if game.game_state == GameState.DISCUSSION and not state.get("mid_check_done", False):
+        presented["ui"] = {"need": "mid-check"}
+    if game.game_state == GameState.ENDED:
+        presented["result"] = _game_result(game, state.get("votes_cast", {}))
+        presented["descriptions"] = dict(game.descriptions or {})
+    return presented
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "db": get_pool_stats(),
+        "session_cache": session_cache.stats(),
+        "session_locks": session_locks.stats(),
+        "speculation": speculator.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_usage": llm_usage.stats(),
+        "llm_resilience": llm_resilience.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+    }
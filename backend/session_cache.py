@@ -0,0 +1,81 @@
+# backend/session_cache.py
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# 캐시 설정 (환경변수로 조정 가능)
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "1") != "0"
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "256"))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "900"))  # 마지막 사용 후 유지 시간(초)
+
+@dataclass
+class CachedSession:
+    game: Any                 # 살아있는 GameSession 객체
+    state: Dict[str, Any]     # sessions.state_json (participantName, votes_cast, ...)
+    version: int              # 저장 시점의 state 버전
+    touched_at: float = field(default_factory=time.monotonic)
+
+class SessionCache:
+    """
+    session_id -> 살아있는 GameSession 의 LRU/TTL 캐시.
+    저장(write-through)이 성공한 뒤에만 put 하고, step 도중 예외가 나면 invalidate 한다.
+    """
+    def __init__(self, max_entries: int = SESSION_CACHE_MAX_ENTRIES, ttl_seconds: float = SESSION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedSession]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, session_id: str) -> Optional[CachedSession]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.monotonic() - entry.touched_at > self.ttl_seconds:
+            del self._entries[session_id]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        entry.touched_at = time.monotonic()
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return entry
+
+    def put(self, session_id: str, game: Any, state: Dict[str, Any], version: int) -> None:
+        self._entries[session_id] = CachedSession(game=game, state=state, version=version)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, session_id: str) -> None:
+        self._entries.pop(session_id, None)
+
+    def mark_stale(self, session_id: str) -> None:
+        """DB 버전과 맞지 않는 엔트리를 발견했을 때"""
+        if self._entries.pop(session_id, None) is not None:
+            self.stale += 1
+            # get()에서 hit로 센 것을 miss로 정정
+            self.hits -= 1
+            self.misses += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": SESSION_CACHE_ENABLED,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+session_cache = SessionCache()
@@ -0,0 +1,203 @@
+# backend/session_lock.py
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from backend.db import open_connection
+
+# 락 설정 (환경변수로 조정 가능)
+SESSION_LOCK_BACKEND = os.getenv("SESSION_LOCK_BACKEND", "local")  # local | advisory
+SESSION_LOCK_TIMEOUT = float(os.getenv("SESSION_LOCK_TIMEOUT", "10"))  # 락 대기 최대 시간(초)
+SESSION_LOCK_MAX_LOCAL = int(os.getenv("SESSION_LOCK_MAX_LOCAL", "1024"))  # 프로세스 내 락 캐시 크기
+SESSION_LOCK_POLL_INTERVAL = float(os.getenv("SESSION_LOCK_POLL_INTERVAL", "0.05"))  # advisory 락 재시도 간격(초)
+
+# 대기 시간 히스토그램 구간 (ms, 마지막은 +inf)
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+class SessionBusy(Exception):
+    """제한 시간 안에 세션 락을 얻지 못함"""
+
+def advisory_key(session_id: str) -> int:
+    """session_id -> pg_advisory_lock 용 signed 64-bit 키"""
+    digest = hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+class _LocalEntry:
+    __slots__ = ("lock", "refs")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.refs = 0  # 들고 있거나 기다리는 중인 요청 수
+
+class SessionLockProvider:
+    """
+    세션 단위 상호 배제.
+    - 프로세스 안에서는 asyncio.Lock (쓰는 중이 아닌 락만 LRU로 정리해서 크기를 제한)
+    - advisory 모드면 그 위에 advisory 락을 추가로 잡아 여러 프로세스/인스턴스 간에도 배제한다.
+      (step이 LLM 호출을 포함해 여러 트랜잭션에 걸치므로 xact 락 대신 세션 레벨 락을 쓴다.
+       락은 풀과 별개인 프로세스당 전용 커넥션 하나에 모아 둔다: 풀 커넥션을 락마다 점유하면
+       동시 세션 수가 풀 크기에 닿는 순간 모든 step이 락을 든 채 저장할 커넥션을 기다리며 멈춘다.
+       한 커넥션을 나눠 쓰므로 기다리지 않는 pg_try_advisory_lock을 짧은 간격으로 다시 시도한다.
+       프로세스가 죽으면 커넥션과 함께 락도 풀린다.)
+    """
+    def __init__(
+        self,
+        backend: str = SESSION_LOCK_BACKEND,
+        timeout_seconds: float = SESSION_LOCK_TIMEOUT,
+        max_local: int = SESSION_LOCK_MAX_LOCAL,
+    ):
+        self.backend = backend
+        self.timeout_seconds = timeout_seconds
+        self.max_local = max_local
+        self._local: "OrderedDict[str, _LocalEntry]" = OrderedDict()
+        self._conn: Any = None
+        self._conn_guard = asyncio.Lock()
+        self.acquired = 0
+        self.timeouts = 0
+        self.evictions = 0
+        self._wait_counts: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+
+    def _checkout(self, session_id: str) -> _LocalEntry:
+        """세션 엔트리를 꺼내면서 refs를 올린다 (정리 전에 올려야 방금 만든 엔트리가 지워지지 않음)"""
+        entry = self._local.get(session_id)
+        if entry is None:
+            entry = _LocalEntry()
+            self._local[session_id] = entry
+        else:
+            self._local.move_to_end(session_id)
+        entry.refs += 1
+        self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        # 누가 쓰고 있는 락은 지우면 안 되므로 오래된 것부터 refs == 0 인 것만 정리
+        if len(self._local) <= self.max_local:
+            return
+        for sid in list(self._local):
+            if len(self._local) <= self.max_local:
+                break
+            if self._local[sid].refs == 0:
+                del self._local[sid]
+                self.evictions += 1
+
+    def _observe_wait(self, started: float) -> None:
+        waited_ms = (time.monotonic() - started) * 1000
+        self._wait_total_ms += waited_ms
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if waited_ms <= bound:
+                self._wait_counts[i] += 1
+                return
+        self._wait_counts[-1] += 1
+
+    async def acquire(self, session_id: str, timeout_seconds: Optional[float] = None) -> "SessionLock":
+        timeout = self.timeout_seconds if timeout_seconds is None else timeout_seconds
+        started = time.monotonic()
+        entry = self._checkout(session_id)
+        try:
+            await asyncio.wait_for(entry.lock.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            entry.refs -= 1
+            self.timeouts += 1
+            raise SessionBusy(session_id)
+        except BaseException:
+            entry.refs -= 1
+            raise
+
+        held = SessionLock(self, session_id, entry)
+        if self.backend == "advisory":
+            remaining = max(timeout - (time.monotonic() - started), 0.001)
+            try:
+                held.conn = await self._acquire_advisory(session_id, remaining)
+            except BaseException:
+                await held.release()
+                raise
+
+        self.acquired += 1
+        self._observe_wait(started)
+        return held
+
+    async def _lock_conn(self) -> Any:
+        """advisory 락 전용 커넥션 (autocommit: 락을 든 채로 트랜잭션이 열려 있지 않도록). 끊겼으면 새로 연다."""
+        conn = self._conn
+        if conn is not None and not conn.closed:
+            return conn
+        async with self._conn_guard:
+            if self._conn is None or self._conn.closed:
+                self._conn = await open_connection(autocommit=True)
+            return self._conn
+
+    async def _acquire_advisory(self, session_id: str, timeout: float) -> Any:
+        """락을 잡은 커넥션을 돌려준다. timeout 안에 못 잡으면 SessionBusy"""
+        key = advisory_key(session_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            conn = await self._lock_conn()
+            cur = await conn.execute("select pg_try_advisory_lock(%s) as locked", (key,))
+            row = await cur.fetchone()
+            if row["locked"]:
+                return conn
+            left = deadline - time.monotonic()
+            if left <= 0:
+                self.timeouts += 1
+                raise SessionBusy(session_id)
+            await asyncio.sleep(min(SESSION_LOCK_POLL_INTERVAL, left))
+
+    async def _release_advisory(self, session_id: str, conn: Any) -> None:
+        # 그 사이 커넥션이 끊겼으면 락도 이미 풀렸다
+        if conn is not self._conn or conn.closed:
+            return
+        try:
+            await conn.execute("select pg_advisory_unlock(%s)", (advisory_key(session_id),))
+        except Exception as e:
+            logging.warning(f"[session_lock] advisory 락 해제 실패 ({session_id}): {e}")
+
+    async def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.closed:
+            await conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        observed = sum(self._wait_counts)
+        buckets = {f"le_{b}ms": n for b, n in zip(WAIT_BUCKETS_MS, self._wait_counts)}
+        buckets["le_inf"] = self._wait_counts[-1]
+        return {
+            "backend": self.backend,
+            "local_size": len(self._local),
+            "max_local": self.max_local,
+            "held": sum(1 for e in self._local.values() if e.lock.locked()),
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "evictions": self.evictions,
+            "avg_wait_ms": (self._wait_total_ms / observed) if observed else 0.0,
+            "wait_histogram": buckets,
+        }
+
+class SessionLock:
+    """acquire()가 돌려주는 핸들. finally에서 await release()"""
+    __slots__ = ("_provider", "_session_id", "_entry", "conn", "_released")
+
+    def __init__(self, provider: SessionLockProvider, session_id: str, entry: _LocalEntry):
+        self._provider = provider
+        self._session_id = session_id
+        self._entry = entry
+        self.conn: Any = None
+        self._released = False
+
+    async def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        try:
+            if self.conn is not None:
+                await self._provider._release_advisory(self._session_id, self.conn)
+        finally:
+            self._entry.lock.release()
+            self._entry.refs -= 1
+
+# 프로세스 전역 인스턴스
+session_locks = SessionLockProvider()
@@ -0,0 +1,159 @@
+# backend/speculation.py
+import asyncio
+import hashlib
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from game.config import SPECULATION_DEPTH
+from game.llm_scheduler import Priority, llm_scope
+
+def discussion_fingerprint(p, gen_kwargs: Dict[str, Any]) -> str:
+    """
+    토론 발언 생성 입력 중 결과에 영향을 주는 값들의 해시.
+    토론 기록은 프롬프트에 실제로 들어가는 윈도우(요약 + 최근 원문 + 앵커)를 그대로 반영한다.
+    (앵커만 보면 인간의 평범한 발언이 무시된 채 미리 만든 발언이 재사용된다)
+    """
+    context = gen_kwargs["context"]
+    history = context.discussion_window("DISCUSSION") if context.has_discussion else ""
+    key = [
+        p.name,
+        gen_kwargs["category"],
+        gen_kwargs["keyword"],
+        gen_kwargs["stance"],
+        gen_kwargs["target_override"],
+        gen_kwargs["human_suspect"],
+        gen_kwargs["is_authoritative"],
+        sorted(gen_kwargs["descriptions"].items()),
+        context.anchor,
+        hashlib.sha1(history.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha1(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+@dataclass
+class _SpeculativeTurn:
+    player_name: str
+    fingerprint: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    text: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+@dataclass
+class _SpeculationJob:
+    turns: Deque[_SpeculativeTurn]
+    human_line: str
+    runner: Optional[asyncio.Task] = None
+
+class DiscussionSpeculator:
+    """
+    인간이 토론 발언을 입력하는 동안, 입력 중인 문장(human_line)을 보낸다고 가정하고 그 뒤에 올 AI 발언을 미리 생성해 둔다.
+    실제 차례가 오면 입력값 fingerprint(프롬프트에 들어가는 토론 기록 포함)를 비교해
+    같으면 재사용(hit), 다르면(인간이 다른 문장을 보냄 등) 나머지를 모두 버린다(miss).
+    """
+    def __init__(self, depth: int = SPECULATION_DEPTH):
+        self.depth = depth
+        self._jobs: Dict[str, _SpeculationJob] = {}
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def start(self, session_id: str, game, human_name: str, kwargs_fn: Callable, human_line: str) -> bool:
+        """human_line(입력 중인 문장)이 인간의 발언이 된다고 보고 추측 생성 시작. 같은 문장으로 이미 진행 중이면 그대로 둔다."""
+        human_line = human_line.strip()
+        if not human_line:
+            return False
+        job = self._jobs.get(session_id)
+        if job is not None and job.human_line == human_line:
+            return False
+        self.cancel(session_id)
+
+        # 같은 라운드에서 인간 바로 다음에 이어지는 AI들
+        upcoming: List[Any] = []
+        for p in game.turn_order[game.turn_index + 1:]:
+            if len(upcoming) >= self.depth or p.name == human_name or not getattr(p, "is_ai", False):
+                break
+            upcoming.append(p)
+        if not upcoming:
+            return False
+
+        # game 기록은 건드리지 않고, 사본에 인간 발언(GameSession.handle_discussion과 같은 형식)을 붙여 이어 간다
+        context = game.prompt_context.fork()
+        context.add_discussion(f"{human_name}: {human_line}")
+
+        job = _SpeculationJob(turns=deque(_SpeculativeTurn(p.name) for p in upcoming), human_line=human_line)
+        job.runner = asyncio.create_task(self._run(session_id, game, context, upcoming, list(job.turns), kwargs_fn))
+        self._jobs[session_id] = job
+        self.started += len(upcoming)
+        return True
+
+    async def _run(self, session_id: str, game, context, upcoming: List[Any], turns: List[_SpeculativeTurn], kwargs_fn: Callable) -> None:
+        try:
+            # rate limit 여유가 없으면 인간이 기다리는 턴에 밀린다
+            with llm_scope(session_id, Priority.SPECULATIVE):
+                for p, turn in zip(upcoming, turns):
+                    gen_kwargs = kwargs_fn(game, p, context)
+                    turn.fingerprint.set_result(discussion_fingerprint(p, gen_kwargs))
+                    text = await p.generate_discussion(**gen_kwargs)
+                    turn.text.set_result(text)
+                    context.add_discussion(f"{p.name}: {text}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.warning(f"[Speculation] 추측 생성 실패: {e}")
+        finally:
+            # 끝나지 못한 턴은 None으로 채워 take()가 miss로 처리하게 한다
+            for turn in turns:
+                for fut in (turn.fingerprint, turn.text):
+                    if not fut.done():
+                        fut.set_result(None)
+
+    async def take(self, session_id: str, p, gen_kwargs: Dict[str, Any]) -> Optional[str]:
+        """p의 차례에 쓸 수 있는 추측 발언을 반환. 없거나 입력이 바뀌었으면 None."""
+        job = self._jobs.get(session_id)
+        if job is None:
+            return None
+        if not job.turns or job.turns[0].player_name != p.name:
+            self.misses += 1
+            self.cancel(session_id)
+            return None
+
+        turn = job.turns.popleft()
+        fingerprint = await turn.fingerprint
+        if fingerprint is None or fingerprint != discussion_fingerprint(p, gen_kwargs):
+            self.misses += 1
+            self.cancel(session_id)
+            return None
+
+        text = await turn.text
+        if text is None:
+            self.misses += 1
+            self.cancel(session_id)
+            return None
+
+        self.hits += 1
+        logging.info(f"[Speculation] {p.name} 미리 생성된 발언 사용")
+        if not job.turns:
+            self._jobs.pop(session_id, None)
+        return text
+
+    def cancel(self, session_id: str) -> None:
+        job = self._jobs.pop(session_id, None)
+        if job is None:
+            return
+        self.discarded += len(job.turns)
+        if job.runner and not job.runner.done():
+            job.runner.cancel()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "active_sessions": len(self._jobs),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+speculator = DiscussionSpeculator()
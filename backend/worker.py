@@ -0,0 +1,97 @@
+# backend/worker.py
+"""
+AI 턴 작업 워커 (AI_WORKER_MODE=queue).
+
+/game/step은 인간 액션만 처리하고 ai_jobs에 작업을 등록한 뒤 바로 응답한다.
+워커는 ai_jobs에서 작업을 하나씩 가져와(SKIP LOCKED) 인간 차례가 올 때까지 AI 턴을 진행하고 저장한다.
+작업은 DB에 남아 있으므로 재시작 후에도 이어서 처리된다.
+
+API 프로세스와 따로 띄우려면:
+    python -m backend.worker
+"""
+import os
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from backend.db import claim_ai_job, finish_ai_job, touch_ai_job
+
+AI_WORKER_MODE = os.getenv("AI_WORKER_MODE", "inline")            # inline | queue
+AI_WORKERS = int(os.getenv("AI_WORKERS", "2"))                    # API 프로세스 안에서 돌릴 워커 수 (queue 모드)
+AI_WORKER_POLL_INTERVAL = float(os.getenv("AI_WORKER_POLL_INTERVAL", "0.5"))
+AI_JOB_LEASE_SECONDS = float(os.getenv("AI_JOB_LEASE_SECONDS", "120"))  # 이 시간 동안 갱신 없는 running 작업은 회수
+AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+
+# (session_id, job_id) -> 성공하면 핸들러가 작업을 done으로 표시한다 (세션 락을 놓기 전에)
+JobHandler = Callable[[str, int], Awaitable[None]]
+
+# 같은 프로세스에서 작업이 등록되면 폴링을 기다리지 않고 바로 깨운다
+_wakeup = asyncio.Event()
+
+def notify_job_enqueued() -> None:
+    _wakeup.set()
+
+async def _heartbeat(job_id: int) -> None:
+    """작업이 도는 동안 lease 갱신 (AI_JOB_LEASE_SECONDS보다 오래 걸려도 다른 워커가 회수하지 않도록)"""
+    while True:
+        await asyncio.sleep(AI_JOB_LEASE_SECONDS / 3)
+        try:
+            await touch_ai_job(job_id)
+        except Exception as e:
+            logging.warning(f"[worker] 작업 {job_id} lease 갱신 실패: {e}")
+
+async def _worker_loop(worker_id: int, handler: JobHandler) -> None:
+    while True:
+        try:
+            job = await claim_ai_job(AI_JOB_LEASE_SECONDS)
+        except Exception as e:
+            logging.error(f"[worker {worker_id}] 작업 조회 실패: {e}")
+            job = None
+
+        if job is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=AI_WORKER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        heartbeat = asyncio.create_task(_heartbeat(job["id"]))
+        try:
+            await handler(job["session_id"], job["id"])
+        except asyncio.CancelledError:
+            # 종료 중이면 다른 워커가 lease 만료 후 다시 가져간다
+            raise
+        except Exception as e:
+            logging.exception(f"[worker {worker_id}] 작업 {job['id']} 실패 (시도 {job['attempts']})")
+            await finish_ai_job(job["id"], error=str(e) or type(e).__name__, max_attempts=AI_JOB_MAX_ATTEMPTS)
+        finally:
+            heartbeat.cancel()
+
+def start_workers(handler: JobHandler, count: int = AI_WORKERS) -> List[asyncio.Task]:
+    return [asyncio.create_task(_worker_loop(i, handler)) for i in range(count)]
+
+async def stop_workers(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def main(count: Optional[int] = None) -> None:
+    from backend.db import close_pool, ensure_schema
+    from backend.llm_rate import install_rate_store
+    from backend.server import advance_session
+    from backend.session_lock import session_locks
+
+    logging.basicConfig(level=logging.INFO)
+    await ensure_schema()
+    install_rate_store()
+    tasks = start_workers(advance_session, count or AI_WORKERS)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await stop_workers(tasks)
+        await session_locks.close()
+        await close_pool()
+
+if __name__ == "__main__":
+    asyncio.run(main())
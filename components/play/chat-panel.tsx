@@ -19,11 +19,12 @@ interface Message {
 interface ChatPanelProps {
   messages: Message[]
   onSend: (text: string) => void
+  onDraftChange?: (text: string) => void // 입력 중인 문장 (추측 생성용)
   disabled?: boolean
   statusText?: string // 있으면 typing 보여주기로 사용
 }
 
-export function ChatPanel({ messages, onSend, disabled, statusText }: ChatPanelProps) {
+export function ChatPanel({ messages, onSend, onDraftChange, disabled, statusText }: ChatPanelProps) {
   const [message, setMessage] = useState("")
 
   const formattedMessages = useMemo(
@@ -74,7 +75,10 @@ export function ChatPanel({ messages, onSend, disabled, statusText }: ChatPanelP
           <Input
             value={message}
             disabled={!!disabled}
-            onChange={(e) => setMessage(e.target.value)}
+            onChange={(e) => {
+              setMessage(e.target.value)
+              onDraftChange?.(e.target.value)
+            }}
             onKeyDown={(e) => {
               if (disabled) return
               if (e.key === "Enter" && !e.shiftKey) {
@@ -2,63 +2,325 @@ import os
 import logging
 import random
 import json
-import re
-from openai import OpenAI
+import time
+import asyncio
+from typing import Awaitable, Callable, Optional
 from dotenv import load_dotenv
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from .player import Player
 from .constants import Role
-from game.prompts import strategies, cot_templates, discussions, vote
+from .llm_client import get_client
+from .llm_cache import llm_cache, make_key
+from .llm_usage import llm_usage
+from .generation import DeadlineExceeded, GenerationProfile, attempt_timeout, generation_profile, remaining_time
+from .llm_resilience import CircuitOpen, llm_resilience
+from .llm_scheduler import llm_scheduler
+from .prompt_context import PromptContext, sanitize_text, is_anchor_candidate
+from game.prompts import strategies, cot_templates, discussions, vote, fallbacks
+from game.prompts.layout import layered_messages
 
 load_dotenv()
 
+# 토큰 스트리밍 콜백: 생성되는 조각(delta)을 받는다
+TokenCallback = Callable[[str], Awaitable[None]]
+
+# GenerationProfile.retries로 다시 시도할 오류 (그 외 4xx 등은 바로 실패)
+_RETRYABLE_ERRORS = (asyncio.TimeoutError, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+def _retry_after(e: Exception) -> float | None:
+    """429 응답의 Retry-After (초). 없으면 None"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def _match_vote_target(content: str, candidates: list) -> str | None:
+    """모델 응답에서 투표 대상 이름을 찾아낸다. 후보와 맞지 않으면 None."""
+    target_name = content
+
+    # 1. 파이프(|) 제거
+    if "|" in target_name:
+        target_name = target_name.split("|")[0].strip()
+
+    # 2. 문장부호 제거
+    target_name = target_name.replace("'", "").replace('"', "").replace(".", "")
+
+    # 3. 후보군 매칭 (정확히 일치하는 게 없으면 문장 포함 여부 확인)
+    if target_name in candidates:
+        return target_name
+    # AI가 "Bot_1입니다" 라고 했을 경우를 대비해 후보 이름이 포함되어 있는지 검사
+    for cand in candidates:
+        if cand in target_name:
+            return cand
+    return None
+
 class AIPlayer(Player):
-    def __init__(self, name: str, model="gpt-4o-mini"):
+    # LLM 클라이언트는 인스턴스에 두지 않고 llm_client 레지스트리에서 빌려 쓴다
+    __slots__ = ("model", "base_url")
+
+    def __init__(self, name: str, model="gpt-4o-mini", base_url: str = None):
         super().__init__(name)
         self.is_ai = True # AI인 경우
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.model = model
+        self.base_url = base_url
+
+    @property
+    def client(self):
+        """프로세스 전역에서 공유하는 클라이언트를 빌려 쓴다 (AIPlayer마다 만들지 않음)"""
+        return get_client(self.base_url)
 
     def _sanitize_text(self, text: str) -> str:
         """
         텍스트에서 인코딩 오류를 유발할 수 있는 특수문자(surrogates)를 제거합니다.
         """
-        return text.encode('utf-8', 'ignore').decode('utf-8')
+        return sanitize_text(text)
 
     def _select_discussion_anchor(self, discussion_log: list) -> str:
-        noise = {"?", "hi", "hello", "test"}
-        keyword_re = re.compile(r"\b(vote|voting|liar|suspect)\b|\bBot_\d+\b", re.IGNORECASE)
-        digit_re = re.compile(r"\d")
-
+        # 게임 진행 중에는 PromptContext.anchor가 증분으로 유지한다 (이건 기록만 있을 때용)
         for raw in reversed(discussion_log or []):
-            text = self._sanitize_text(raw).strip()
-            if not text:
-                continue
-            if text.lower() in noise:
-                continue
-            if keyword_re.search(text) or digit_re.search(text):
+            text = sanitize_text(raw).strip()
+            if is_anchor_candidate(text):
                 return text
         return ""
 
-    def _call_llm(self, system_prompt: str, user_prompt: str, temp: float = 0.7) -> str:
-        """LLM 호출을 담당하는 헬퍼 함수"""
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temp
+    async def _chat(self, messages: list, temperature: float, cache: bool = None, on_token: TokenCallback = None, phase: str = None, **extra) -> str:
+        """
+        chat.completions 호출 + 응답 캐시.
+        cache=None이면 온도로 결정(낮은 온도만 캐시), True/False로 강제할 수 있다.
+        on_token이 있으면 스트리밍으로 받아 조각마다 콜백하고, 완성된 문장을 반환한다.
+        phase: 생성 설정(GENERATION_PROFILES: 모델/max_tokens/stop/시간 제한/재시도)과 사용량 집계 구분
+        시간 초과면 asyncio.TimeoutError, 요청 마감에 걸려 끊겼으면 DeadlineExceeded가 올라간다.
+        """
+        profile = generation_profile(phase)
+        model = profile.model or self.model
+        options = {**profile.request_options(), **extra}
+
+        key = None
+        if llm_cache.should_cache(temperature, cache):
+            key = make_key(model, messages, temperature, options)
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                if on_token is not None:
+                    await on_token(cached)
+                return cached
+
+        started = time.perf_counter()
+        content, usage, ttft = await self._generate(model, messages, temperature, profile, options, on_token, phase)
+        llm_usage.record(phase, model, usage, time.perf_counter() - started, ttft)
+        total_tokens = getattr(usage, "total_tokens", 0) or 0
+
+        if key is not None:
+            await llm_cache.put(key, content, total_tokens)
+        return content
+
+    async def _generate(
+        self,
+        model: str,
+        messages: list,
+        temperature: float,
+        profile: GenerationProfile,
+        options: dict,
+        on_token: TokenCallback,
+        phase: str,
+    ) -> tuple:
+        """
+        profile의 시간 제한/재시도/헤지와 모델 차단기, rate limit 스케줄러를 적용한 API 호출 -> (문장, usage, 첫 토큰까지 걸린 초)
+        차단기가 열려 있으면 CircuitOpen, 시간 안에 스케줄러 허용을 못 받으면 asyncio.TimeoutError (호출자는 대체 문장으로)
+        요청 마감 때문에 줄어든 제한 시간이 다 되면 DeadlineExceeded (호출자는 대체하지 말고 그 턴을 미룬다)
+        """
+        # 재시도는 profile이 정하므로 SDK 자체 재시도는 끈다
+        client = self.client.with_options(max_retries=0)
+        breaker = llm_resilience.breaker(model)
+        cost = llm_scheduler.estimate_cost(messages, options.get("max_tokens"))
+
+        # 이번 시도에서 아직 정산하지 않은 예약 (primary / hedge). 먼저 꺼내는 쪽이 한 번만 정산한다
+        reservations: dict = {}
+
+        def close_reservation(key: str, result: Optional[tuple] = None) -> None:
+            # 응답을 받았으면 실제 사용량으로, 실패/취소/헤지에서 진 요청은 반환
+            reserved = reservations.pop(key, None)
+            if reserved is None:
+                return
+            if result is None:
+                llm_scheduler.release(model, reserved)
+            else:
+                llm_scheduler.settle(model, reserved, getattr(result[1], "total_tokens", None))
+
+        def metered(key: str, run: Callable[[], Awaitable[tuple]]) -> Callable[[], Awaitable[tuple]]:
+            async def wrapped() -> tuple:
+                result = None
+                try:
+                    result = await run()
+                    return result
+                finally:
+                    close_reservation(key, result)
+            return wrapped
+
+        async def admit_hedge() -> bool:
+            reserved = await llm_scheduler.try_acquire(model, cost)
+            if reserved is None:
+                return False
+            reservations["hedge"] = reserved
+            return True
+
+        async def call() -> tuple:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                **options,
             )
-            return response.choices[0].message.content.strip()
+            content = (response.choices[0].message.content or "").strip()
+            return content, getattr(response, "usage", None), None
+
+        attempt = 0
+        while True:
+            timeout = attempt_timeout(profile)
+            # 요청 마감 때문에 줄어든 시간이면 초과해도 provider 장애로 세지 않음
+            trimmed = timeout is not None and (profile.timeout is None or timeout < profile.timeout)
+            # 이 시도의 제한 시간이 곧 요청 마감이면, 시간 초과는 마감에 걸려 끊긴 것
+            by_deadline = trimmed
+            breaker.check()
+            try:
+                # 시도마다 요청 1건으로 허용받는다 (줄 선 시간은 이번 시도 제한 시간에서 뺀다)
+                queued = time.perf_counter()
+                reserved = await llm_scheduler.acquire(model, cost, timeout)
+            except asyncio.TimeoutError as e:
+                breaker.release_probe()
+                if by_deadline:
+                    raise DeadlineExceeded("request deadline exceeded while waiting for rate limit") from e
+                raise
+            except BaseException:
+                breaker.release_probe()
+                raise
+            waited = time.perf_counter() - queued
+            if timeout is not None and waited > 0.01:
+                timeout = max(0.001, timeout - waited)
+                trimmed = True
+            emitted = False
+
+            async def sink(delta: str) -> None:
+                nonlocal emitted
+                emitted = True
+                await on_token(delta)
+
+            started = time.perf_counter()
+            reservations["primary"] = reserved
+            try:
+                if on_token is not None:
+                    # 스트리밍은 조각이 바로 화면에 나가므로 헤지하지 않음
+                    stream = metered(
+                        "primary",
+                        lambda: self._chat_stream(client, model, messages, temperature, sink, **options),
+                    )
+                    result = await asyncio.wait_for(stream(), timeout)
+                elif profile.hedge:
+                    delay = llm_resilience.hedge_delay(model, phase, profile.timeout)
+                    result = await asyncio.wait_for(
+                        llm_resilience.hedged(metered("primary", call), delay, admit_hedge, metered("hedge", call)),
+                        timeout,
+                    )
+                else:
+                    result = await asyncio.wait_for(metered("primary", call)(), timeout)
+            except _RETRYABLE_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError) and by_deadline:
+                    breaker.release_probe()
+                    raise DeadlineExceeded("request deadline exceeded") from e
+                if isinstance(e, asyncio.TimeoutError) and trimmed:
+                    breaker.release_probe()
+                else:
+                    breaker.record_failure()
+                if isinstance(e, RateLimitError):
+                    llm_scheduler.throttle(model, _retry_after(e))
+                # 이미 화면에 나간 조각이 있으면 다시 만들 수 없음
+                if attempt >= profile.retries or emitted:
+                    raise
+                backoff = profile.retry_backoff * (2 ** attempt)
+                left = remaining_time()
+                if left is not None and left <= backoff:
+                    raise
+                attempt += 1
+                logging.warning(f"[{self.name}] {phase} 생성 재시도 {attempt}/{profile.retries}: {type(e).__name__} {e}")
+                await asyncio.sleep(backoff)
+                continue
+            except BaseException:
+                # 잘못된 요청(4xx) / 취소 등은 provider 상태와 무관
+                breaker.release_probe()
+                raise
+            finally:
+                # 시작도 못 하고 취소된 요청(헤지 등)의 예약이 남아 있으면 반환
+                for key in list(reservations):
+                    close_reservation(key)
+            breaker.record_success()
+            if on_token is None:
+                llm_resilience.observe(model, phase, time.perf_counter() - started)
+            return result
+
+    async def _chat_stream(self, client, model: str, messages: list, temperature: float, on_token: TokenCallback, **extra) -> tuple:
+        """스트리밍 호출. 조각을 콜백으로 넘기고 (정제된 전체 문장, usage, 첫 토큰까지 걸린 초)를 반환"""
+        started = time.perf_counter()
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            **extra,
+        )
+        parts = []
+        usage = None
+        ttft = None
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                delta = self._sanitize_text(delta)
+                parts.append(delta)
+                await on_token(delta)
+        return self._sanitize_text("".join(parts)).strip(), usage, ttft
+
+    async def _call_llm(self, system_prompt: str, user_prompt: str, temp: float = 0.7, cache: bool = None, on_token: TokenCallback = None, phase: str = None, fallback: str = "") -> str:
+        """LLM 호출을 담당하는 헬퍼 함수 (실패하면 fallback)"""
+        return await self._call_messages(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temp,
+            cache=cache,
+            on_token=on_token,
+            phase=phase,
+            fallback=fallback,
+        )
+
+    async def _call_messages(self, messages: list, temp: float = 0.7, cache: bool = None, on_token: TokenCallback = None, phase: str = None, fallback: str = "") -> str:
+        """
+        _call_llm과 같지만 messages를 그대로 (layout.layered_messages로 만든 것 등).
+        차단기 open / 시간 초과 / 오류면 fallback(미리 준비한 문장)을 돌려준다 (degraded mode).
+        요청 마감(DeadlineExceeded)은 대체하지 않고 그대로 올린다 (호출자가 그 턴을 다음 요청으로 미룸).
+        """
+        try:
+            return await self._chat(messages, temp, cache=cache, on_token=on_token, phase=phase)
+        except DeadlineExceeded:
+            raise
+        except CircuitOpen as e:
+            logging.warning(f"[AI Degraded] {self.name} {phase}: {e} -> 대체 문장 사용")
         except Exception as e:
-            logging.error(f"[AI Error] {e}")
-            return "Error"
+            logging.error(f"[AI Error] {self.name} {phase}: {type(e).__name__} {e} -> 대체 문장 사용")
+        llm_resilience.record_fallback(phase)
+        return fallback
 
     # 아이디어 풀 생성 - 게임 시작 시 1회 호출
-    def generate_keyword_pool(self, category: str, keyword: str) -> list:
+    async def generate_keyword_pool(self, category: str, keyword: str) -> list:
         sys_p, user_p = cot_templates.get_global_brainstorming_prompt(category, keyword)
-        response = self._call_llm(sys_p, user_p, temp=0.9)
+        # 같은 제시어면 결과를 재사용 (온도가 높아도 캐시)
+        response = await self._call_llm(sys_p, user_p, temp=0.9, cache=True, phase="BRAINSTORM")
         
         try:
             text = response.replace("```json", "").replace("```", "").strip()
@@ -68,13 +330,14 @@ class AIPlayer(Player):
             return ["특징", "추억", "사용법", "느낌"] # 실패 시 기본값
 
     # 설명 생성
-    def generate_description(self, category: str, keyword: str, history: dict, assigned_keyword: str = None, fixed_content: str = None) -> str:
+    async def generate_description(self, category: str, keyword: str, history: dict, assigned_keyword: str = None, fixed_content: str = None, on_token: TokenCallback = None, context: PromptContext = None) -> str:
         
-        # 데이터 정제
+        # 데이터 정제 (context가 있으면 이미 정제된 설명 목록 사용)
         category = self._sanitize_text(category)
         keyword = self._sanitize_text(keyword) if keyword else ""
-        clean_history = {k: self._sanitize_text(v) for k, v in history.items()}
-        history_text = "\n".join([f"- {n}: {d}" for n, d in clean_history.items()])
+        if context is None:
+            context = PromptContext.from_history(history, None)
+        history_text = context.description_context
         logging.info(f"""
         [할당 정보 확인]
         category : [{category}],
@@ -94,30 +357,37 @@ class AIPlayer(Player):
             
             sys_p, user_p = cot_templates.get_citizen_description(
                 category, keyword, assigned_keyword)
-            final_output = self._call_llm(sys_p, user_p, temp=0.8)
+            final_output = await self._call_llm(
+                sys_p, user_p, temp=0.8, on_token=on_token, phase="DESCRIPTION", fallback=fallbacks.description_line(),
+            )
             logging.info(f"🤖 [{self.name}] (시민) 설명: ({final_output})...")
             
         # 라이어
         else:
             sys_p, user_p = cot_templates.get_liar_step2(category, history_text)
-            final_output = self._call_llm(sys_p, user_p, temp=0.8)
+            final_output = await self._call_llm(
+                sys_p, user_p, temp=0.8, on_token=on_token, phase="DESCRIPTION", fallback=fallbacks.description_line(),
+            )
             logging.info(f"🤖 [{self.name}] (라이어) 설명: ({final_output})...")
 
         return final_output
 
 
     # 토론 생성
-    def generate_discussion(self, category: str, keyword: str, descriptions: dict, 
+    async def generate_discussion(self, category: str, keyword: str, descriptions: dict, 
                           human_suspect: str, stance: str, players_list: list,
-                          current_discussion_log: list,
+                          current_discussion_log: list = None,
                           is_authoritative: bool = True,
-                          target_override: str = None) -> str:
+                          target_override: str = None,
+                          on_token: TokenCallback = None,
+                          context: PromptContext = None) -> str:
         """
         토론 단계에서 다른 사람들의 설명을 분석하여 의심하거나 변론하는 멘트를 생성합니다.
         
         [조작된 토론]
         stance: 'AGREE' 또는 'DISAGREE'
         human_suspect: 사람이 지목한 용의자
+        context: 세션의 PromptContext (없으면 descriptions / current_discussion_log로 새로 만듦)
         """
         category = self._sanitize_text(category)
         keyword = self._sanitize_text(keyword) if keyword else ""
@@ -128,22 +398,20 @@ class AIPlayer(Player):
         logging.info(f"강도, is_authoritative: {is_authoritative}")
         
 
-        # 1. 데이터 정제
-        desc_context = "\n".join([
-            f"- {self._sanitize_text(name)}: {self._sanitize_text(desc)}" 
-            for name, desc in descriptions.items()
-        ])
+        # 1. 데이터 정제 (추가분만 정제해 둔 문자열 사용)
+        if context is None:
+            context = PromptContext.from_history(descriptions, current_discussion_log)
+        desc_context = context.description_context
         logging.info(f"이전 설명 desc_context : {desc_context}")
           
-        if current_discussion_log:
-            # 리스트에 있는 로그들을 문자열로 합칩니다.
-            disc_history = "\n".join([self._sanitize_text(log) for log in current_discussion_log])
+        if context.has_discussion:
+            disc_history = context.discussion_window("DISCUSSION")
         else:
             disc_history = "(당신이 토론의 첫 발언자입니다.)"
 
         logging.info(f"이전 토론 내역 disc_history : {disc_history}")
 
-        anchor = self._select_discussion_anchor(current_discussion_log)
+        anchor = context.anchor
         if anchor:
             logging.info(f"[Anchor] 선택된 발언: {anchor}")
         else:
@@ -176,8 +444,8 @@ class AIPlayer(Player):
         if clean_human_suspect == self.name and stance != "DEFENSE":
             stance = "DEFENSE"
 
-        # 4. 프롬프트 생성
-        prompt = discussions.get_discussion_prompt(
+        # 4. 프롬프트 생성 (고정 안내 -> 공통 기록 -> 봇별 지시 순서, prompt caching용)
+        messages = discussions.get_discussion_messages(
             category,
             keyword,
             my_name=self.name,
@@ -191,10 +459,17 @@ class AIPlayer(Player):
             is_authoritative=is_authoritative
         )
         
-        return self._call_llm("Discussion participant", prompt, temp=0.8)
+        return await self._call_messages(
+            messages, temp=0.8, on_token=on_token, phase="DISCUSSION",
+            fallback=fallbacks.discussion_line(target_to_accuse),
+        )
 
         
-    def generate_vote(self, players_list: list, description_history: dict, discussion_history: list, category: str, keyword: str = None) -> str:
+    def fallback_vote(self, players_list: list) -> str:
+        """투표 생성 실패 시 사용할 무작위 후보 (자기 자신 제외)"""
+        return random.choice([p.name for p in players_list if p.name != self.name])
+
+    async def generate_vote(self, players_list: list, description_history: dict, discussion_history: list, category: str, keyword: str = None, context: PromptContext = None) -> str:
         """
         [설명]과 [토론] 내용을 모두 종합하여 투표 대상을 결정합니다.
         (game/prompts/vote.py 활용)
@@ -203,14 +478,13 @@ class AIPlayer(Player):
         candidates = [p.name for p in players_list if p.name != self.name]
         
         # 2. 기록 정리 (인코딩 에러 방지)
-        clean_desc = {k: self._sanitize_text(v) for k, v in description_history.items()}
-        desc_text = "\n".join([f"- {name}: {desc}" for name, desc in clean_desc.items()])
-        
-        clean_disc = [self._sanitize_text(log) for log in discussion_history]
-        disc_text = "\n".join(clean_disc)
+        if context is None:
+            context = PromptContext.from_history(description_history, discussion_history)
+        desc_text = context.description_context
+        disc_text = context.discussion_window("VOTING")
 
         # 3. 프롬프트 호출
-        prompt = vote.get_voting_prompt(
+        messages = vote.get_voting_messages(
             my_name=self.name,
             role='CITIZEN' if self.role == Role.CITIZEN else 'LIAR',
             category=category,
@@ -223,34 +497,10 @@ class AIPlayer(Player):
 
         try:
             # 투표는 정확해야 하므로 온도를 낮춤 (0.1)
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1 
-            )
-            content = response.choices[0].message.content.strip()
+            content = await self._chat(messages, 0.1, phase="VOTING")
             
             # --- [강화된 파싱 로직] ---
-            target_name = content
-            
-            # 1. 파이프(|) 제거
-            if "|" in target_name:
-                target_name = target_name.split("|")[0].strip()
-            
-            # 2. 문장부호 제거
-            target_name = target_name.replace("'", "").replace('"', "").replace(".", "")
-            
-            # 3. 후보군 매칭 (정확히 일치하는 게 없으면 문장 포함 여부 확인)
-            final_target = None
-            
-            if target_name in candidates:
-                final_target = target_name
-            else:
-                # AI가 "Bot_1입니다" 라고 했을 경우를 대비해 후보 이름이 포함되어 있는지 검사
-                for cand in candidates:
-                    if cand in target_name:
-                        final_target = cand
-                        break
+            final_target = _match_vote_target(content, candidates)
             
             # 4. 결과 처리
             if final_target:
@@ -263,30 +513,87 @@ class AIPlayer(Player):
                 logging.warning(f"⚠️ [{self.name}] 투표 파싱 실패 (Random): '{content}' -> [{fallback}]")
                 return fallback
                 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            logging.error(f"Vote Error: {e}")
+            logging.error(f"Vote Error: {type(e).__name__} {e}")
+            llm_resilience.record_fallback("VOTING")
             return random.choice(candidates)
 
-    def generate_guess(self, category: str, history: dict) -> str:
-        # ... (기존 generate_guess 내용에 _sanitize_text 적용만 하면 됨)
-        # 편의상 생략했으나 위와 동일한 패턴으로 적용
-        history_text = "\n".join([f"- {name}: {self._sanitize_text(desc)}" for name, desc in history.items()])
+    async def generate_guess(self, category: str, history: dict, on_token: TokenCallback = None, context: PromptContext = None) -> str:
+        if context is None:
+            context = PromptContext.from_history(history, None)
+        history_text = context.description_context
         
-        system_prompt = f"""
-        당신은 라이어입니다. 주제는 '{category}'입니다.
+        system_prompt = """
+        당신은 라이어입니다.
         사람들의 설명을 듣고 제시어를 추측하세요. 단어 하나만 출력하세요.
         """
-        user_prompt = f"[설명 기록]\n{history_text}"
+        user_prompt = f"주제는 '{category}'입니다."
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3
+            return await self._chat(
+                layered_messages(system_prompt, f"[설명 기록]\n{history_text}", user_prompt),
+                0.3,
+                on_token=on_token,
+                phase="FINAL_GUESS",
             )
-            return response.choices[0].message.content.strip()
-        except Exception:
-            return "모르겠습니다."
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logging.error(f"Guess Error: {type(e).__name__} {e}")
+            llm_resilience.record_fallback("FINAL_GUESS")
+            return fallbacks.FINAL_GUESS_LINE
+
+
+async def generate_bulk_votes(voters: list, players_list: list, description_history: dict, discussion_history: list, category: str, context: PromptContext = None) -> dict[str, str]:
+    """
+    여러 AI의 투표를 LLM 1회 호출(JSON 출력)로 한꺼번에 생성합니다.
+    공통 기록(설명/토론)은 프롬프트에 한 번만 넣습니다.
+    후보에 없는 대상이나 누락된 봇은 결과에서 빠지며, 호출자가 봇별로 대체 처리합니다.
+    """
+    if not voters:
+        return {}
+    lead = voters[0]
+
+    if context is None:
+        context = PromptContext.from_history(description_history, discussion_history)
+    desc_text = context.description_context
+    disc_text = context.discussion_window("VOTING")
+    all_names = [p.name for p in players_list]
+    messages = vote.get_bulk_voting_messages(
+        voter_names=[v.name for v in voters],
+        candidates=all_names,
+        category=category,
+        desc_text=desc_text,
+        disc_text=disc_text,
+    )
+
+    try:
+        content = await lead._chat(
+            messages,
+            0.1,
+            phase="BULK_VOTING",
+            response_format={"type": "json_object"},
+        )
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError("bulk vote response is not a JSON object")
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"Bulk Vote Error: {type(e).__name__} {e}")
+        llm_resilience.record_fallback("BULK_VOTING")
+        return {}
+
+    votes = {}
+    for v in voters:
+        raw = data.get(v.name)
+        candidates = [n for n in all_names if n != v.name]
+        target = _match_vote_target(str(raw).strip(), candidates) if raw else None
+        if target:
+            logging.info(f"🤖 [{v.name}] 일괄 투표 성공: '{raw}' -> [{target}]")
+            votes[v.name] = target
+        else:
+            logging.warning(f"⚠️ [{v.name}] 일괄 투표 파싱 실패: '{raw}'")
+    return votes
@@ -55,8 +55,58 @@ FIXED_AI_DESCRIPTIONS = {
     "Bot_4": "This animal comes in so many different colors and patterns. It seems like everyone has their own favorite.",
 }
 
+# 제시어 사전 (None = data/words.json). ".tsv"면 mmap 압축 형식 (utils/word_loader.export_compact로 생성)
+WORD_BANK_PATH = None
+
 # Ambiguous bots (liar will be chosen from this group).
 AMBIGUOUS_BOTS = {"Bot_2", "Bot_4"}
 
 # Discussion style control (True = authoritative, False = non-authoritative).
-DISCUSSION_AUTHORITATIVE = False
\ No newline at end of file
+DISCUSSION_AUTHORITATIVE = False
+
+# AI 투표 병렬 생성 (True = 대기 중인 AI 투표를 동시에 생성 후 순서대로 반영)
+PARALLEL_AI_VOTES = True
+AI_VOTE_CONCURRENCY = 4         # 동시에 진행할 투표 생성 수
+# 투표 1건 제한 시간 (초과 시 무작위 후보). None이면 VOTING / BULK_VOTING 생성 설정에서 계산
+# (시도 제한 시간 × (재시도 + 1) + 재시도 대기). 그보다 짧으면 재시도가 끝나기 전에 끊긴다.
+AI_VOTE_TIMEOUT_SECONDS = None
+
+# 요청 1회(/game/step, /game/stream)에서 AI 턴 진행에 쓸 수 있는 시간 (초, None = 제한 없음)
+# 다 쓰면 남은 AI 턴은 다음 요청(noop)에서 이어서 진행하고, 진행 중인 LLM 호출의 제한 시간도 이 안으로 줄어든다.
+AI_STEP_DEADLINE_SECONDS = 45.0
+
+# 일괄 투표 (True = LLM 1회로 모든 AI 투표를 JSON으로 받고, 잘못된 답만 봇별로 다시 생성)
+BULK_AI_VOTES = False
+
+# 토론 발언 추측 생성 (True = 인간이 입력하는 동안 입력 중인 문장(/game/speculate)을 기준으로 다음 AI 발언을 미리 생성)
+# 실제로 보낸 문장이 다르면(프롬프트의 토론 기록이 달라지면) 버리고 새로 생성한다.
+SPECULATIVE_DISCUSSION = False
+SPECULATION_DEPTH = 2  # 인간 다음으로 미리 만들어 둘 AI 발언 수
+
+# 프롬프트 기록 예산 (단계별, GameState 이름 기준)
+# 토론 기록은 최근 발언 최대 N개(넘으면 N/2개만 남기고 접음)만 원문으로 넣고 그 이전은 요약(발언자별 발언 수 / 언급한 플레이어)으로 접는다.
+# 예산(추정 토큰)은 설명 목록 + 토론 기록 부분에 적용되며, 넘으면 원문 발언을 더 요약으로 넘긴다.
+# 표에 없는 단계는 전체 기록을 그대로 넣는다.
+PROMPT_WINDOW_TURNS = {"DISCUSSION": 8, "VOTING": 12}
+PROMPT_TOKEN_BUDGETS = {"DISCUSSION": 900, "VOTING": 1200}
+
+# 단계별 LLM 생성 설정 (game/generation.py)
+#   model: None이면 AIPlayer.model / max_tokens, stop: 요청에 그대로 전달
+#   timeout: 시도 1회 제한 시간(초) / retries: 시간 초과·연결 오류·429·5xx 시 재시도 횟수 / retry_backoff: 첫 대기(초, 2배씩 증가)
+#   hedge: 응답이 p95보다 늦으면 같은 요청을 한 번 더 보내 먼저 온 쪽을 씀 (스트리밍 호출은 제외)
+# 투표/추측은 한 단어라 짧게 끊는다. 일괄 투표는 JSON이라 따로 둔다.
+GENERATION_PROFILES = {
+    "DESCRIPTION": {"max_tokens": 150, "timeout": 20.0, "retries": 1, "hedge": True},
+    "DISCUSSION": {"max_tokens": 100, "timeout": 15.0, "retries": 1, "hedge": True},
+    "VOTING": {"max_tokens": 16, "timeout": 10.0, "stop": ["\n"], "retries": 1, "hedge": True},
+    "BULK_VOTING": {"max_tokens": 120, "timeout": 15.0, "retries": 1, "hedge": True},
+    "FINAL_GUESS": {"max_tokens": 16, "timeout": 10.0, "stop": ["\n"], "retries": 1, "hedge": True},
+    "BRAINSTORM": {"max_tokens": 800, "timeout": 30.0, "retries": 1},
+}
+
+# OpenAI 호출 rate limit (game/llm_scheduler.py): 모델별 분당 요청 수(rpm) / 토큰 수(tpm)
+# 표에 없는 모델은 "default"를 쓰고, None이면 그 항목은 제한하지 않는다. 조직 한도보다 조금 낮게 잡는다.
+# 여유가 없으면 인간 차례 AI 턴 > 토론 추측 생성 > 그 외 순으로, 같은 순위 안에서는 세션끼리 번갈아 허용한다.
+LLM_RATE_LIMITS = {
+    "default": {"rpm": 450, "tpm": 180_000},
+}
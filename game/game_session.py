@@ -3,21 +3,37 @@ import logging
 from .constants import GameState, Role
 from .player import Player
 from .ai_player import AIPlayer
-from utils.word_loader import WordLoader
-from .config import AMBIGUOUS_BOTS
+from .prompt_context import PromptContext
+from utils.word_loader import DATA_FILE_PATH, WordLoader, get_word_loader
+from .config import AMBIGUOUS_BOTS, WORD_BANK_PATH
 
 class GameSession:
     """
     라이어 게임 한 판의 전체 상태와 로직을 관리하는 '엔진' 클래스
     (화면 출력 print() 없음)
     """
+    __slots__ = (
+        "_dirty", "_saved_descriptions", "_saved_discussions", "_turn_ids",
+        "_prompt_ctx",
+        "players", "game_state", "category", "keyword",
+        "liar", "suspect", "winner", "turn_index", "descriptions",
+        "discussions", "discussion_rounds", "discussion_round_index",
+        "human_suspect_name", "current_round", "fool_player",
+    )
 
     def __init__(self):
+        # 변경 추적: 마지막 저장 이후 재할당/변경된 필드 + 저장된 transcript 길이
+        self._dirty: set[str] = set()
+        self._saved_descriptions: int = 0
+        self._saved_discussions: int = 0
+        # 프롬프트 재료 캐시 (저장하지 않음, 처음 쓸 때 생성)
+        self._prompt_ctx: PromptContext | None = None
+
         self.players: dict[str, Player] = {}
-        self.turn_order: list[Player] = []
+        # 턴 순서는 players(삽입 순서)에서의 번호로 보관 -> turn_order / turn_order_ids
+        self._turn_ids: list[int] = []
         self.game_state: GameState = GameState.READY
 
-        self.word_loader = WordLoader()
         self.category: str | None = None
         self.keyword: str | None = None
         
@@ -38,6 +54,66 @@ class GameSession:
         self.current_round: int = 1 # [신규] 현재 라운드 추적
         self.fool_player: Player | None = None # [New] 바보 플레이어 저장
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            self._dirty.add(name)
+
+    # --- 변경 추적 (델타 저장용) ---
+    def mark_dirty(self, *fields: str) -> None:
+        """제자리 변경(플레이어 상태 등)처럼 재할당으로 안 잡히는 변경을 표시"""
+        self._dirty.update(fields)
+
+    def dirty_fields(self) -> set[str]:
+        return set(self._dirty)
+
+    def new_descriptions(self) -> list[tuple[str, str]]:
+        """마지막 저장 이후 추가된 설명 (descriptions가 재할당됐으면 전체)"""
+        items = list(self.descriptions.items())
+        return items if "descriptions" in self._dirty else items[self._saved_descriptions:]
+
+    def new_discussions(self) -> list[str]:
+        """마지막 저장 이후 추가된 토론 발언 (discussions가 재할당됐으면 전체)"""
+        return list(self.discussions) if "discussions" in self._dirty else self.discussions[self._saved_discussions:]
+
+    def mark_saved(self) -> None:
+        self._dirty.clear()
+        self._saved_descriptions = len(self.descriptions)
+        self._saved_discussions = len(self.discussions)
+
+    # --- 턴 순서 (번호 기반) ---
+    @property
+    def turn_order(self) -> list[Player]:
+        roster = list(self.players.values())
+        return [roster[i] for i in self._turn_ids]
+
+    @turn_order.setter
+    def turn_order(self, order: list[Player]) -> None:
+        ids = {name: i for i, name in enumerate(self.players)}
+        self._turn_ids = [ids[p.name] for p in order]
+
+    @property
+    def turn_order_ids(self) -> list[int]:
+        """turn_order를 players 순서 기준 번호로 (복사본)"""
+        return list(self._turn_ids)
+
+    @turn_order_ids.setter
+    def turn_order_ids(self, ids: list[int]) -> None:
+        self._turn_ids = list(ids)
+        self.mark_dirty("turn_order")
+
+    @property
+    def prompt_context(self) -> PromptContext:
+        """현재 descriptions / discussions에 맞춘 프롬프트 재료 (추가분만 정제해 반영)"""
+        if self._prompt_ctx is None:
+            self._prompt_ctx = PromptContext()
+        return self._prompt_ctx.sync(self.descriptions, self.discussions)
+
+    @property
+    def word_loader(self) -> WordLoader:
+        # 단어 사전은 프로세스 전역에서 한 번만 로드 (deserialize 시에는 건드리지 않음)
+        return get_word_loader(WORD_BANK_PATH or DATA_FILE_PATH)
+
     def _rotate_to_first_ai(self, order: list[Player]) -> list[Player]:
         for i, p in enumerate(order):
             if getattr(p, "is_ai", False):
@@ -53,17 +129,18 @@ class GameSession:
             
         player = Player(name)
         self.players[name] = player
+        self.mark_dirty("players")
         logging.info(f"[참가] 플레이어 '{name}' 참가")
         return True
 
-    def start_game(self, liar_count: int = 1, use_fool: bool = False) -> bool:
+    def start_game(self, liar_count: int = 1, use_fool: bool = False, exclude_keywords: set[str] | None = None) -> bool:
         if self.game_state != GameState.READY:
             return False
         if len(self.players) < 3:
             return False
 
         # 단어 선정
-        self.category, self.keyword = self.word_loader.get_random_topic_and_keyword()
+        self.category, self.keyword = self.word_loader.get_random_topic_and_keyword(exclude=exclude_keywords)
         if not self.category:
             return False
             
@@ -108,6 +185,7 @@ class GameSession:
                 self.fool_player = random.choice(citizen_ais)
                 self.fool_player.is_fool = True
                 logging.info(f"[설정] 🤡 바보 모드: {self.fool_player.name}가 라이어 흉내를 냅니다.")
+        self.mark_dirty("players")
                 
         # 5. 상태 변경
         self.game_state = GameState.DESCRIPTION
@@ -144,7 +222,8 @@ class GameSession:
     # --- 2. 게임 진행 단계 ---
     @property
     def current_player(self) -> Player:
-        return self.turn_order[self.turn_index]
+        name = list(self.players)[self._turn_ids[self.turn_index]]
+        return self.players[name]
 
     def handle_description(self, description: str):
         if self.game_state != GameState.DESCRIPTION:
@@ -153,12 +232,13 @@ class GameSession:
         player = self.current_player
         self.descriptions[player.name] = description
         player.has_described = True
+        self.mark_dirty("players")
         
         logging.info(f"[설명] {player.name}: {description}")
 
         self.turn_index += 1
         
-        if self.turn_index >= len(self.turn_order):
+        if self.turn_index >= len(self._turn_ids):
             logging.info("설명 종료. 토론 단계 진입.")
             self.game_state = GameState.DISCUSSION
             self.turn_index = 0
@@ -176,7 +256,7 @@ class GameSession:
 
         self.turn_index += 1
         
-        if self.turn_index >= len(self.turn_order):
+        if self.turn_index >= len(self._turn_ids):
             if self.discussion_round_index < self.discussion_rounds:
                 self.discussion_round_index += 1
                 self.turn_index = 0
@@ -196,6 +276,7 @@ class GameSession:
             
         target.votes_received += 1
         voter.has_voted = True
+        self.mark_dirty("players")
 
         logging.info(f"[투표] {voter.name} -> {target_name}")
         
@@ -0,0 +1,92 @@
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from .config import GENERATION_PROFILES
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """단계별 LLM 호출 설정 (config.GENERATION_PROFILES)"""
+    model: Optional[str] = None           # None이면 AIPlayer.model
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None       # 시도 1회 제한 (초)
+    stop: Optional[Tuple[str, ...]] = None
+    retries: int = 0
+    retry_backoff: float = 0.5
+    hedge: bool = False                   # 느린 응답에 중복 요청 (llm_resilience.hedged)
+
+    def request_options(self) -> dict:
+        """chat.completions.create에 넘길 값"""
+        options = {}
+        if self.max_tokens is not None:
+            options["max_tokens"] = self.max_tokens
+        if self.stop:
+            options["stop"] = list(self.stop)
+        return options
+
+    def budget(self) -> Optional[float]:
+        """재시도와 재시도 대기까지 포함해 호출 1건이 쓸 수 있는 최대 시간 (timeout이 없으면 None)"""
+        if self.timeout is None:
+            return None
+        backoff = sum(self.retry_backoff * (2 ** i) for i in range(self.retries))
+        return self.timeout * (self.retries + 1) + backoff
+
+_DEFAULT_PROFILE = GenerationProfile()
+_profiles: Dict[str, GenerationProfile] = {}
+
+def generation_profile(phase: Optional[str]) -> GenerationProfile:
+    """phase 설정 (없으면 제한 없는 기본값)"""
+    if phase is None or phase not in GENERATION_PROFILES:
+        return _DEFAULT_PROFILE
+    profile = _profiles.get(phase)
+    if profile is None:
+        cfg = dict(GENERATION_PROFILES[phase])
+        if cfg.get("stop") is not None:
+            cfg["stop"] = tuple(cfg["stop"])
+        profile = _profiles[phase] = GenerationProfile(**cfg)
+    return profile
+
+# --- 요청 단위 마감 시각 ---
+# contextvar라 그 안에서 만든 task(gather 등)에도 이어진다
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """요청에 주어진 시간을 다 씀"""
+
+_deadline: ContextVar[Optional[float]] = ContextVar("generation_deadline", default=None)
+
+@contextmanager
+def generation_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """이 블록 안의 LLM 호출은 지금부터 seconds 안에 끝나야 한다 (바깥 마감이 더 이르면 그쪽)"""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time() -> Optional[float]:
+    """마감까지 남은 초 (마감 없으면 None)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def deadline_exceeded() -> bool:
+    left = remaining_time()
+    return left is not None and left <= 0
+
+def attempt_timeout(profile: GenerationProfile) -> Optional[float]:
+    """이번 시도에 쓸 제한 시간 = min(profile.timeout, 남은 시간). 이미 지났으면 DeadlineExceeded"""
+    left = remaining_time()
+    if left is None:
+        return profile.timeout
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return left if profile.timeout is None else min(profile.timeout, left)
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 캐시 설정 (환경변수로 조정 가능)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))   # 메모리 LRU 크기
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))                # 항목 유지 시간(초)
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.5"))  # 이보다 높은 온도는 기본적으로 캐시 안 함
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")                              # 설정 시 sqlite 디스크 캐시 사용
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+def make_key(model: str, messages: list, temperature: float, extra: Optional[dict] = None) -> str:
+    """(model, messages, temperature, seed 등 요청 옵션)의 해시"""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "extra": extra or {},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class _DiskTier:
+    """sqlite 기반 2차 캐시 (프로세스 재시작/재현 실행 간 공유)"""
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "create table if not exists llm_cache (key text primary key, content text, tokens integer, created_at real)"
+        )
+        self._db.execute("create index if not exists llm_cache_created on llm_cache (created_at)")
+        self._db.commit()
+        self._lock = asyncio.Lock()
+
+    def _get(self, key: str) -> Optional[Tuple[str, int]]:
+        row = self._db.execute(
+            "select content, tokens from llm_cache where key = ? and created_at >= ?",
+            (key, time.time() - self.ttl_seconds),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _put(self, key: str, content: str, tokens: int) -> None:
+        self._db.execute(
+            "insert or replace into llm_cache (key, content, tokens, created_at) values (?, ?, ?, ?)",
+            (key, content, tokens, time.time()),
+        )
+        # 오래된 항목 / 최대 개수 초과분 정리
+        self._db.execute("delete from llm_cache where created_at < ?", (time.time() - self.ttl_seconds,))
+        self._db.execute(
+            "delete from llm_cache where key in ("
+            " select key from llm_cache order by created_at desc limit -1 offset ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[str, int]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, content: str, tokens: int) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._put, key, content, tokens)
+
+class LLMCache:
+    """
+    LLM 응답 캐시. 메모리 LRU(1차) + 선택적 sqlite(2차).
+    높은 온도의 창작 발화는 기본적으로 우회하고, 호출마다 cache=True/False로 강제할 수 있다.
+    """
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL,
+        max_temperature: float = LLM_CACHE_MAX_TEMPERATURE,
+        disk_path: Optional[str] = LLM_CACHE_PATH,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self._memory: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._disk = _DiskTier(disk_path, ttl_seconds, LLM_CACHE_DISK_MAX_ENTRIES) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.saved_tokens = 0
+
+    def should_cache(self, temperature: float, cache: Optional[bool] = None) -> bool:
+        if not LLM_CACHE_ENABLED:
+            return False
+        use = cache if cache is not None else temperature <= self.max_temperature
+        if not use:
+            self.bypassed += 1
+        return use
+
+    def _remember(self, key: str, content: str, tokens: int) -> None:
+        self._memory[key] = (content, tokens, time.monotonic())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None and time.monotonic() - entry[2] > self.ttl_seconds:
+            del self._memory[key]
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.saved_tokens += entry[1]
+            return entry[0]
+
+        if self._disk is not None:
+            found = await self._disk.get(key)
+            if found is not None:
+                content, tokens = found
+                self._remember(key, content, tokens)
+                self.hits += 1
+                self.disk_hits += 1
+                self.saved_tokens += tokens
+                return content
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, content: str, tokens: int = 0) -> None:
+        self._remember(key, content, tokens)
+        if self._disk is not None:
+            await self._disk.put(key, content, tokens)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "size": len(self._memory),
+            "disk": self._disk is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+        }
+
+llm_cache = LLMCache()
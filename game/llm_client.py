@@ -0,0 +1,45 @@
+import os
+import importlib.util
+from typing import Dict, Optional, Tuple
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# HTTP 커넥션 풀 설정 (환경변수로 조정 가능)
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+# h2 패키지가 설치돼 있을 때만 HTTP/2 사용
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+
+_clients: Dict[Tuple[Optional[str], Optional[str]], AsyncOpenAI] = {}
+
+def get_client(base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    엔드포인트별로 프로세스 전역 AsyncOpenAI 클라이언트를 하나씩 공유한다 (첫 사용 시 생성).
+    AIPlayer마다 클라이언트를 만들지 않으므로 keep-alive 커넥션이 재사용된다.
+    """
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    api_key = os.getenv("OPENAI_API_KEY")
+    key = (base_url, api_key)
+    client = _clients.get(key)
+    if client is None:
+        http_client = DefaultAsyncHttpxClient(
+            http2=LLM_HTTP2,
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+        _clients[key] = client
+    return client
+
+async def close_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.close()
@@ -0,0 +1,204 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 지연 꼬리 / 장애 대응 설정 (환경변수로 조정 가능)
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))       # 중복 요청을 보내기까지 최소 대기(초)
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))     # p95를 믿기 전까지 필요한 표본 수
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))          # p95 계산에 쓰는 최근 호출 수
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))        # 연속 실패 몇 번이면 차단
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "5"))      # 첫 차단 시간(초), 다시 열릴 때마다 2배
+LLM_BREAKER_MAX_COOLDOWN = float(os.getenv("LLM_BREAKER_MAX_COOLDOWN", "120"))
+
+class CircuitOpen(RuntimeError):
+    """모델이 차단(open) 상태라 호출하지 않음 -> 호출자는 대체 문장(degraded mode)으로"""
+
+class _LatencyTracker:
+    """(모델, 단계)별 최근 성공 호출 지연 -> p95"""
+    __slots__ = ("samples", "_p95", "_stale")
+
+    def __init__(self):
+        self.samples: Deque[float] = deque(maxlen=LLM_LATENCY_WINDOW)
+        self._p95: Optional[float] = None
+        self._stale = 0
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self._stale += 1
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        # 매 호출 정렬하지 않고 표본이 10개 쌓일 때마다 갱신
+        if self._p95 is None or self._stale >= 10:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[int(0.95 * (len(ordered) - 1))]
+            self._stale = 0
+        return self._p95
+
+class CircuitBreaker:
+    """
+    모델별 차단기.
+    closed: 정상 / open: cooldown 동안 호출 안 함 / half_open: 시험 호출 1건만 허용
+    시험 호출이 실패하면 cooldown을 2배로 늘려 다시 open, 성공하면 closed로 돌아가고 cooldown 초기화.
+    """
+    def __init__(self, model: str):
+        self.model = model
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = LLM_BREAKER_COOLDOWN
+        self.opened_at = 0.0
+        self.open_count = 0
+        self._probing = False
+
+    def check(self) -> None:
+        """호출 전에 부른다. 막혀 있으면 CircuitOpen"""
+        if self.state == "closed":
+            return
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpen(f"{self.model} circuit open")
+            self.state = "half_open"
+            self._probing = False
+        if self._probing:
+            raise CircuitOpen(f"{self.model} circuit half-open (probe in flight)")
+        self._probing = True
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logging.info(f"[LLM] {self.model} 차단 해제")
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = LLM_BREAKER_COOLDOWN
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open":
+            self.cooldown = min(self.cooldown * 2, LLM_BREAKER_MAX_COOLDOWN)
+            self._open()
+        elif self.state == "closed" and self.failures >= LLM_BREAKER_FAILURES:
+            self._open()
+
+    def release_probe(self) -> None:
+        """시험 호출이 성공/실패 판정 없이 끝났을 때 (취소, 요청 마감 등)"""
+        self._probing = False
+
+    def _open(self) -> None:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.open_count += 1
+        self._probing = False
+        logging.warning(f"⚠️ [LLM] {self.model} 차단 ({self.cooldown:g}s, 연속 실패 {self.failures})")
+
+    def stats(self) -> dict:
+        retry_in = 0.0
+        if self.state == "open":
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "cooldown_seconds": self.cooldown,
+            "retry_in_seconds": retry_in,
+            "opened": self.open_count,
+        }
+
+class LLMResilience:
+    """hedged 요청 / 모델별 차단기 / 대체 문장 사용 집계. /metrics의 llm_resilience로 노출된다."""
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[Tuple[str, str], _LatencyTracker] = {}
+        self.hedge_calls = 0        # 헤지 대상 호출 수
+        self.hedges = 0             # 실제로 중복 요청을 보낸 수
+        self.hedge_wins = 0         # 중복 요청이 먼저 끝난 수
+        self.fallbacks: Dict[str, int] = {}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        b = self._breakers.get(model)
+        if b is None:
+            b = self._breakers[model] = CircuitBreaker(model)
+        return b
+
+    def observe(self, model: str, phase: Optional[str], seconds: float) -> None:
+        key = (model, phase or "OTHER")
+        t = self._latency.get(key)
+        if t is None:
+            t = self._latency[key] = _LatencyTracker()
+        t.observe(seconds)
+
+    def hedge_delay(self, model: str, phase: Optional[str], timeout: Optional[float]) -> Optional[float]:
+        """중복 요청을 보낼 시점 (p95 기반). 표본이 부족하면 제한 시간의 절반, 그것도 없으면 헤지 안 함"""
+        t = self._latency.get((model, phase or "OTHER"))
+        p95 = t.p95() if t is not None else None
+        if p95 is None:
+            return None if timeout is None else max(LLM_HEDGE_MIN_DELAY, timeout / 2)
+        return max(LLM_HEDGE_MIN_DELAY, p95)
+
+    async def hedged(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        delay: Optional[float],
+        admit: Optional[Callable[[], Awaitable[bool]]] = None,
+        hedge_call: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        call()을 시작하고 delay 안에 안 끝나면 한 번 더 보내서 먼저 성공한 결과를 쓴다.
+        admit이 있으면 중복 요청 전에 물어보고 False면 보내지 않는다 (rate limit 여유가 없을 때).
+        hedge_call이 있으면 중복 요청은 그것으로 보낸다 (없으면 call).
+        둘 다 실패하면 마지막 오류를 올린다. 남은 요청은 취소.
+        """
+        self.hedge_calls += 1
+        first = asyncio.ensure_future(call())
+        tasks = [first]
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if not done and (admit is None or await admit()):
+                tasks.append(asyncio.ensure_future((hedge_call or call)()))
+                self.hedges += 1
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def record_fallback(self, phase: Optional[str]) -> None:
+        key = phase or "OTHER"
+        self.fallbacks[key] = self.fallbacks.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "hedge": {
+                "calls": self.hedge_calls,
+                "fired": self.hedges,
+                "wins": self.hedge_wins,
+                "rate": (self.hedges / self.hedge_calls) if self.hedge_calls else 0.0,
+                "win_rate": (self.hedge_wins / self.hedges) if self.hedges else 0.0,
+            },
+            "p95_ms": {
+                f"{model}/{phase}": round(p95 * 1000, 1)
+                for (model, phase), t in self._latency.items()
+                if (p95 := t.p95()) is not None
+            },
+            "breakers": {model: b.stats() for model, b in self._breakers.items()},
+            "fallbacks": dict(self.fallbacks),
+        }
+
+llm_resilience = LLMResilience()
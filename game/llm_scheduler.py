@@ -0,0 +1,396 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Deque, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from .config import LLM_RATE_LIMITS
+from .prompt_context import estimate_tokens
+
+# 스케줄러 설정 (환경변수로 조정 가능)
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "1") != "0"
+LLM_RATE_BURST_SECONDS = float(os.getenv("LLM_RATE_BURST_SECONDS", "10"))    # 버킷 크기 = 이 초 동안 채워지는 양
+LLM_COMPLETION_RESERVE = int(os.getenv("LLM_COMPLETION_RESERVE", "256"))     # max_tokens 없는 호출의 응답 토큰 예약
+LLM_RATE_LIMIT_PAUSE = float(os.getenv("LLM_RATE_LIMIT_PAUSE", "2"))         # 429에 Retry-After가 없을 때 멈출 시간(초)
+
+# 대기 시간 히스토그램 구간 (ms, 마지막은 +inf)
+WAIT_BUCKETS_MS = (1, 10, 50, 100, 500, 1000, 5000, 15000)
+
+class Priority(IntEnum):
+    """낮을수록 먼저. 같은 우선순위 안에서는 세션끼리 번갈아 허용한다."""
+    INTERACTIVE = 0   # 인간이 기다리는 AI 턴 (/game/step, /game/stream, 큐 모드 워커)
+    SPECULATIVE = 1   # 인간이 입력하는 동안 미리 만드는 토론 발언
+    BATCH = 2         # 범위 없이 호출된 나머지 (키워드 풀 등)
+
+# 현재 LLM 호출의 (세션, 우선순위). contextvar라 gather 등으로 만든 task에도 이어진다
+_scope: ContextVar[Tuple[Optional[str], Priority]] = ContextVar("llm_scope", default=(None, Priority.BATCH))
+
+@contextmanager
+def llm_scope(session_id: Optional[str], priority: Priority) -> Iterator[None]:
+    """이 블록 안의 LLM 호출은 session_id의 priority 요청으로 줄 선다"""
+    token = _scope.set((session_id, priority))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+@dataclass(frozen=True)
+class RateLimit:
+    """모델별 분당 한도 (None = 제한 없음). 버킷은 초당 rpm/60씩 차고 LLM_RATE_BURST_SECONDS 만큼까지 쌓인다."""
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+
+    @property
+    def request_rate(self) -> float:
+        return (self.rpm or 0) / 60.0
+
+    @property
+    def request_capacity(self) -> float:
+        return max(1.0, self.request_rate * LLM_RATE_BURST_SECONDS) if self.rpm else 0.0
+
+    @property
+    def token_rate(self) -> float:
+        return (self.tpm or 0) / 60.0
+
+    @property
+    def token_capacity(self) -> float:
+        return max(1.0, self.token_rate * LLM_RATE_BURST_SECONDS) if self.tpm else 0.0
+
+class SharedRateStore(Protocol):
+    """여러 프로세스가 같이 쓰는 버킷 (backend/llm_rate.py). 없으면 프로세스 안 버킷만 쓴다."""
+
+    async def take(self, model: str, limit: RateLimit, tokens: int) -> float:
+        """요청 1건 + tokens를 차감하고 0을, 모자라면 차감 없이 기다려야 할 초를 돌려준다"""
+
+    async def adjust(self, model: str, limit: RateLimit, requests: float, tokens: float) -> None:
+        """추가 차감 (음수면 반환)"""
+
+class _TokenBucket:
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        # 정산(adjust)으로 음수가 될 수 있다 = 다음 허용이 그만큼 늦어짐
+        self.level = min(self.capacity, self.level - amount)
+
+class _Waiter:
+    __slots__ = ("session_id", "priority", "tokens", "future", "enqueued")
+
+    def __init__(self, session_id: Optional[str], priority: Priority, tokens: int):
+        self.session_id = session_id
+        self.priority = priority
+        self.tokens = tokens
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.monotonic()
+
+class _ModelQueue:
+    """
+    모델 하나의 버킷 + 대기열.
+    우선순위별로 세션 -> 대기 요청(deque)을 두고, 맨 앞 세션의 요청을 허용할 때마다 그 세션을 뒤로 보낸다 (라운드 로빈).
+    """
+    def __init__(self, model: str, limit: RateLimit):
+        self.model = model
+        self.limit = limit
+        self.requests = _TokenBucket(limit.request_rate, limit.request_capacity) if limit.rpm else None
+        self.tokens = _TokenBucket(limit.token_rate, limit.token_capacity) if limit.tpm else None
+        self.classes: List["OrderedDict[Optional[str], Deque[_Waiter]]"] = [OrderedDict() for _ in Priority]
+        self.depth = 0
+        self.max_depth = 0
+        self.paused_until = 0.0
+        self.pump: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.throttled = 0
+        self.admitted = [0] * len(Priority)
+        self.wait_total_ms = [0.0] * len(Priority)
+        self.wait_counts = [[0] * (len(WAIT_BUCKETS_MS) + 1) for _ in Priority]
+
+    def clamp(self, tokens: int) -> int:
+        # 버킷보다 큰 요청은 버킷이 가득 찼을 때 허용
+        if self.tokens is not None:
+            return int(min(tokens, self.tokens.capacity))
+        return tokens
+
+    # --- 대기열 ---
+    def push(self, waiter: _Waiter) -> None:
+        sessions = self.classes[waiter.priority]
+        queue = sessions.get(waiter.session_id)
+        if queue is None:
+            queue = sessions[waiter.session_id] = deque()
+        queue.append(waiter)
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        self.wake()
+
+    def peek(self) -> Optional[_Waiter]:
+        """다음에 허용할 요청 (취소된 대기는 치운다)"""
+        for sessions in self.classes:
+            while sessions:
+                session_id, queue = next(iter(sessions.items()))
+                while queue and queue[0].future.done():
+                    queue.popleft()
+                    self.depth -= 1
+                if queue:
+                    return queue[0]
+                del sessions[session_id]
+        return None
+
+    def pop(self, waiter: _Waiter) -> None:
+        sessions = self.classes[waiter.priority]
+        queue = sessions[waiter.session_id]
+        queue.popleft()
+        self.depth -= 1
+        if queue:
+            sessions.move_to_end(waiter.session_id)
+        else:
+            del sessions[waiter.session_id]
+
+    def wake(self) -> None:
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    # --- 프로세스 안 버킷 ---
+    def local_wait(self, tokens: int) -> float:
+        now = time.monotonic()
+        wait = self.paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return max(0.0, wait)
+
+    def local_adjust(self, requests: float, tokens: float) -> None:
+        if self.requests is not None:
+            self.requests.take(requests)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+    # --- 지표 ---
+    def observe(self, priority: Priority, waited: float) -> None:
+        waited_ms = waited * 1000
+        self.admitted[priority] += 1
+        self.wait_total_ms[priority] += waited_ms
+        counts = self.wait_counts[priority]
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if waited_ms <= bound:
+                counts[i] += 1
+                return
+        counts[-1] += 1
+
+    def stats(self) -> dict:
+        queued = {}
+        wait = {}
+        for priority in Priority:
+            name = priority.name.lower()
+            sessions = self.classes[priority]
+            queued[name] = sum(1 for q in sessions.values() for w in q if not w.future.done())
+            counts = self.wait_counts[priority]
+            buckets = {f"le_{b}ms": n for b, n in zip(WAIT_BUCKETS_MS, counts)}
+            buckets["le_inf"] = counts[-1]
+            admitted = self.admitted[priority]
+            wait[name] = {
+                "admitted": admitted,
+                "avg_wait_ms": (self.wait_total_ms[priority] / admitted) if admitted else 0.0,
+                "wait_histogram": buckets,
+            }
+        now = time.monotonic()
+        return {
+            "rpm": self.limit.rpm,
+            "tpm": self.limit.tpm,
+            "queue_depth": sum(queued.values()),
+            "queue_depth_by_priority": queued,
+            "queued_sessions": sum(len(sessions) for sessions in self.classes),
+            "max_queue_depth": self.max_depth,
+            "requests_available": None if self.requests is None else round(self.requests.level, 1),
+            "tokens_available": None if self.tokens is None else round(self.tokens.level),
+            "throttled": self.throttled,
+            "paused_seconds": max(0.0, self.paused_until - now),
+            "by_priority": wait,
+        }
+
+class LLMScheduler:
+    """
+    모델별 token bucket(분당 요청 수 / 토큰 수)으로 LLM 호출 허용 시점을 정한다.
+    여유가 없으면 우선순위(Priority) -> 세션 라운드 로빈 순으로 줄을 세우고, 모델마다 pump task 하나가 순서대로 허용한다.
+    set_shared_store()로 Postgres 버킷을 붙이면 여러 프로세스가 같은 한도를 나눠 쓴다. /metrics의 llm_scheduler로 노출된다.
+    """
+    def __init__(self, limits: Dict[str, dict] = LLM_RATE_LIMITS, enabled: bool = LLM_SCHEDULER_ENABLED):
+        self.enabled = enabled
+        self._limits = limits
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._store: Optional[SharedRateStore] = None
+        self._background: set = set()
+        self.store_errors = 0
+        self.hedges_denied = 0
+
+    def set_shared_store(self, store: Optional[SharedRateStore]) -> None:
+        self._store = store
+
+    def _queue(self, model: str) -> Optional[_ModelQueue]:
+        if not self.enabled:
+            return None
+        q = self._queues.get(model)
+        if q is None:
+            cfg = self._limits.get(model, self._limits.get("default"))
+            if not cfg or not (cfg.get("rpm") or cfg.get("tpm")):
+                return None
+            q = self._queues[model] = _ModelQueue(model, RateLimit(cfg.get("rpm"), cfg.get("tpm")))
+        return q
+
+    @staticmethod
+    def estimate_cost(messages: list, max_tokens: Optional[int]) -> int:
+        """요청에 예약할 토큰 (프롬프트 추정 + 응답 한도). 응답 후 settle로 실제 사용량과 맞춘다."""
+        prompt = sum(estimate_tokens(m.get("content") or "") for m in messages)
+        return prompt + (max_tokens or LLM_COMPLETION_RESERVE)
+
+    # --- 허용 ---
+    async def acquire(self, model: str, tokens: int, timeout: Optional[float] = None) -> int:
+        """
+        model 호출 1건이 허용될 때까지 기다린다 (현재 llm_scope의 세션 / 우선순위 기준).
+        예약한 토큰 수를 돌려준다 (한도가 없는 모델이면 0). timeout 안에 허용되지 않으면 asyncio.TimeoutError.
+        """
+        q = self._queue(model)
+        if q is None:
+            return 0
+        tokens = q.clamp(tokens)
+        session_id, priority = _scope.get()
+
+        # 줄 선 요청이 없고 지금 여유가 있으면 바로 (프로세스 안 버킷만 쓸 때)
+        if self._store is None and q.depth == 0 and q.local_wait(tokens) == 0:
+            q.local_adjust(1, tokens)
+            q.observe(priority, 0.0)
+            return tokens
+
+        waiter = _Waiter(session_id, priority, tokens)
+        q.push(waiter)
+        if q.pump is None or q.pump.done():
+            q.wakeup = asyncio.Event()
+            q.pump = asyncio.create_task(self._pump(q))
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 허용된 직후 취소됨 -> 예약 반환
+                self.release(model, tokens)
+            q.wake()
+            raise
+        return tokens
+
+    async def try_acquire(self, model: str, tokens: int) -> Optional[int]:
+        """
+        기다리지 않고 지금 여유가 있을 때만 허용 (헤지용 중복 요청: 줄 선 요청이 있으면 보내지 않음).
+        허용되면 예약한 토큰 수(acquire와 같이 settle / release로 정산), 아니면 None.
+        """
+        q = self._queue(model)
+        if q is None:
+            return 0
+        tokens = q.clamp(tokens)
+        if q.depth == 0 and await self._take(q, tokens) == 0:
+            return tokens
+        self.hedges_denied += 1
+        return None
+
+    async def _take(self, q: _ModelQueue, tokens: int) -> float:
+        """차감하고 0, 모자라면 기다릴 초"""
+        pause = q.paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+        if self._store is not None:
+            try:
+                return await self._store.take(q.model, q.limit, tokens)
+            except Exception as e:
+                # 공유 버킷을 못 쓰면 프로세스 안 버킷으로 (LLM 호출을 DB 장애에 묶지 않음)
+                self.store_errors += 1
+                logging.warning(f"[LLM] 공유 rate limit 버킷 사용 실패, 로컬 버킷 사용: {e}")
+        wait = q.local_wait(tokens)
+        if wait == 0:
+            q.local_adjust(1, tokens)
+        return wait
+
+    async def _pump(self, q: _ModelQueue) -> None:
+        while True:
+            waiter = q.peek()
+            if waiter is None:
+                return
+            wait = await self._take(q, waiter.tokens)
+            if wait == 0:
+                if waiter.future.done():
+                    # 차감하는 동안 취소됨
+                    self.release(q.model, waiter.tokens)
+                    continue
+                q.pop(waiter)
+                q.observe(waiter.priority, time.monotonic() - waiter.enqueued)
+                waiter.future.set_result(None)
+                continue
+            # 새 요청(더 높은 우선순위)이나 취소가 오면 다시 본다
+            q.wakeup.clear()
+            try:
+                await asyncio.wait_for(q.wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    # --- 정산 ---
+    def _adjust(self, model: str, requests: float, tokens: float) -> None:
+        q = self._queue(model)
+        if q is None:
+            return
+        if self._store is None:
+            q.local_adjust(requests, tokens)
+            q.wake()
+            return
+        task = asyncio.ensure_future(self._store_adjust(q, requests, tokens))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _store_adjust(self, q: _ModelQueue, requests: float, tokens: float) -> None:
+        try:
+            await self._store.adjust(q.model, q.limit, requests, tokens)
+        except Exception as e:
+            self.store_errors += 1
+            logging.warning(f"[LLM] 공유 rate limit 정산 실패: {e}")
+        q.wake()
+
+    def settle(self, model: str, reserved: int, used: Optional[int]) -> None:
+        """응답의 실제 토큰 수로 예약을 맞춘다 (used가 없으면 예약 그대로)"""
+        if reserved and used is not None and used != reserved:
+            self._adjust(model, 0, used - reserved)
+
+    def release(self, model: str, reserved: int) -> None:
+        """허용받았지만 보내지 않은 요청을 반환"""
+        self._adjust(model, -1, -reserved)
+
+    def throttle(self, model: str, seconds: Optional[float] = None) -> None:
+        """429를 받으면 그 모델 허용을 잠시 멈춘다 (Retry-After 우선)"""
+        q = self._queue(model)
+        if q is None:
+            return
+        pause = seconds if seconds is not None and seconds > 0 else LLM_RATE_LIMIT_PAUSE
+        q.paused_until = max(q.paused_until, time.monotonic() + pause)
+        q.throttled += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "shared": self._store is not None,
+            "store_errors": self.store_errors,
+            "hedges_denied": self.hedges_denied,
+            "models": {model: q.stats() for model, q in self._queues.items()},
+        }
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,74 @@
+import logging
+from typing import Any, Dict, Optional
+
+class _PhaseUsage:
+    __slots__ = ("calls", "prompt_tokens", "cached_tokens", "completion_tokens", "latency", "ttft", "ttft_calls")
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0          # prompt_tokens 중 provider 캐시에서 온 것 (과금/지연 감소분)
+        self.completion_tokens = 0
+        self.latency = 0.0              # 호출 전체 시간 합 (초)
+        self.ttft = 0.0                 # 스트리밍 호출의 첫 토큰까지 시간 합 (초)
+        self.ttft_calls = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_ratio": (self.cached_tokens / self.prompt_tokens) if self.prompt_tokens else 0.0,
+            "avg_latency_ms": (self.latency / self.calls * 1000) if self.calls else 0.0,
+            "avg_ttft_ms": (self.ttft / self.ttft_calls * 1000) if self.ttft_calls else 0.0,
+        }
+
+def usage_tokens(usage: Any) -> tuple[int, int, int]:
+    """API usage 객체 -> (prompt_tokens, cached_tokens, completion_tokens). 없는 필드는 0"""
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    return (
+        getattr(usage, "prompt_tokens", 0) or 0,
+        cached,
+        getattr(usage, "completion_tokens", 0) or 0,
+    )
+
+class LLMUsage:
+    """
+    실제 API 호출(캐시 hit 제외)의 토큰 사용량 / provider prompt cache 적중 / 지연을 단계별로 집계.
+    /metrics의 llm_usage로 노출된다.
+    """
+    def __init__(self):
+        self._phases: Dict[str, _PhaseUsage] = {}
+
+    def record(self, phase: Optional[str], model: str, usage: Any, latency: float, ttft: Optional[float] = None) -> None:
+        prompt, cached, completion = usage_tokens(usage)
+        entry = self._phases.get(phase or "OTHER")
+        if entry is None:
+            entry = self._phases[phase or "OTHER"] = _PhaseUsage()
+        entry.calls += 1
+        entry.prompt_tokens += prompt
+        entry.cached_tokens += cached
+        entry.completion_tokens += completion
+        entry.latency += latency
+        if ttft is not None:
+            entry.ttft += ttft
+            entry.ttft_calls += 1
+        logging.debug(
+            f"[LLM usage] {phase} {model}: prompt={prompt} cached={cached} completion={completion} "
+            f"latency={latency * 1000:.0f}ms" + (f" ttft={ttft * 1000:.0f}ms" if ttft is not None else "")
+        )
+
+    def stats(self) -> dict:
+        total = _PhaseUsage()
+        for entry in self._phases.values():
+            for f in _PhaseUsage.__slots__:
+                setattr(total, f, getattr(total, f) + getattr(entry, f))
+        out = total.as_dict()
+        out["by_phase"] = {phase: entry.as_dict() for phase, entry in self._phases.items()}
+        return out
+
+llm_usage = LLMUsage()
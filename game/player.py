@@ -3,11 +3,18 @@ from .constants import Role
 class Player:
     """
     게임 참가자 한 명의 정보를 저장하는 클래스
+    (__slots__: 선언된 필드만 가질 수 있음. 저장/복원도 STATE_FIELDS 기준)
     """
+    __slots__ = ("name", "role", "is_ai", "is_fool", "has_described", "has_voted", "votes_received")
+
+    # 직렬화 대상 필드 (backend/serialize.py)
+    STATE_FIELDS = ("name", "is_ai", "role", "has_described", "has_voted", "votes_received", "is_fool")
+
     def __init__(self, name:str):
         self.name: str = name # 플레이어 이름
         self.role: Role | None = None # 플레이어 역할
         self.is_ai: bool = False # 기본값은 사람(False)
+        self.is_fool: bool = False # 바보 모드에서 라이어 흉내를 내는 시민인지
 
         # 게임 라운드마다 초기화되어야 하는 상태 값
         self.has_described: bool = False # 이번 라운드에 설명을 했는지
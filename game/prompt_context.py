@@ -0,0 +1,260 @@
+import re
+from itertools import islice
+
+from .config import PROMPT_WINDOW_TURNS, PROMPT_TOKEN_BUDGETS
+
+# 앵커(토론에서 마지막으로 의미 있는 발언) 판정용 - 호출마다 컴파일하지 않도록 모듈에 둔다
+_ANCHOR_NOISE = frozenset({"?", "hi", "hello", "test"})
+_ANCHOR_KEYWORD_RE = re.compile(r"\b(vote|voting|liar|suspect)\b|\bBot_\d+\b", re.IGNORECASE)
+_DIGIT_RE = re.compile(r"\d")
+
+def sanitize_text(text: str) -> str:
+    """텍스트에서 인코딩 오류를 유발할 수 있는 특수문자(surrogates)를 제거합니다."""
+    return text.encode('utf-8', 'ignore').decode('utf-8')
+
+def is_anchor_candidate(text: str) -> bool:
+    """정제 + strip된 토론 발언이 앵커가 될 수 있는지"""
+    if not text or text.lower() in _ANCHOR_NOISE:
+        return False
+    return bool(_ANCHOR_KEYWORD_RE.search(text) or _DIGIT_RE.search(text))
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (UTF-8 4바이트당 1토큰, 예산 비교용)"""
+    return (len(text.encode("utf-8")) + 3) // 4
+
+class _RollingSummary:
+    """윈도우 밖으로 밀려난 토론 발언의 누적 요약 (발언자별 발언 수 / 언급한 플레이어)"""
+    __slots__ = ("upto", "turns", "mentions", "_text")
+
+    def __init__(self):
+        self.upto = 0                                  # 요약에 접힌 발언 수 (앞에서부터)
+        self.turns: dict[str, int] = {}
+        self.mentions: dict[str, dict[str, int]] = {}
+        self._text: str | None = ""
+
+    def fold(self, records: list, upto: int) -> None:
+        """records[self.upto:upto]를 요약에 더한다 (앞으로만 진행)"""
+        if upto <= self.upto:
+            return
+        for speaker, mentioned in records[self.upto:upto]:
+            self.turns[speaker] = self.turns.get(speaker, 0) + 1
+            counts = self.mentions.setdefault(speaker, {})
+            for name in mentioned:
+                counts[name] = counts.get(name, 0) + 1
+        self.upto = upto
+        self._text = None
+
+    def copy(self) -> "_RollingSummary":
+        s = _RollingSummary()
+        s.upto = self.upto
+        s.turns = dict(self.turns)
+        s.mentions = {k: dict(v) for k, v in self.mentions.items()}
+        s._text = self._text
+        return s
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            lines = [f"(earlier {self.upto} messages, summarized)"]
+            for speaker, n in self.turns.items():
+                counts = self.mentions.get(speaker)
+                about = ", ".join(f"{name} x{c}" for name, c in counts.items()) if counts else "no one"
+                lines.append(f"- {speaker or '?'} ({n} msgs): mentioned {about}")
+            self._text = "\n".join(lines)
+        return self._text
+
+class PromptContext:
+    """
+    세션별 프롬프트 재료 (설명 목록 / 토론 기록 / 앵커 / 단계별 요약 윈도우).
+    새로 추가된 설명/발언만 한 번씩 정제해 붙이므로 AI 턴마다 전체 기록을 다시 정제하지 않는다.
+    GameSession.prompt_context가 게임의 descriptions / discussions와 동기화해서 돌려준다.
+    """
+    __slots__ = (
+        "_desc_src", "_disc_src", "_desc_lines", "_disc_lines",
+        "_anchor", "_desc_text", "_disc_text",
+        "_names", "_desc_tokens", "_disc_tokens", "_disc_records",
+        "_anchor_index", "_summaries", "_windows",
+    )
+
+    def __init__(self):
+        self._desc_src: dict | None = None     # 동기화 중인 game.descriptions / game.discussions
+        self._disc_src: list | None = None
+        self._desc_lines: list[str] = []       # "- 이름: 설명" (정제됨)
+        self._disc_lines: list[str] = []       # 정제된 토론 발언
+        self._anchor: str = ""
+        self._desc_text: str | None = None     # join 결과 캐시 (추가 시 무효화)
+        self._disc_text: str | None = None
+
+        # 윈도우/요약용 (발언마다 추가 시 한 번 계산)
+        self._names: dict[str, None] = {}      # 알려진 플레이어 이름 (순서 유지)
+        self._desc_tokens: int = 0
+        self._disc_tokens: list[int] = []
+        self._disc_records: list[tuple[str, tuple[str, ...]]] = []   # (발언자, 언급한 이름들)
+        self._anchor_index: int = -1
+        self._summaries: dict[str, _RollingSummary] = {}
+        self._windows: dict[str, tuple[int, int, str]] = {}          # phase -> (설명 수, 발언 수, 결과)
+
+    # --- 추가 ---
+    def add_description(self, name: str, text: str) -> None:
+        name = sanitize_text(name)
+        line = f"- {name}: {sanitize_text(text)}"
+        self._desc_lines.append(line)
+        self._desc_tokens += estimate_tokens(line)
+        self._desc_text = None
+        self._names[name] = None
+
+    def add_discussion(self, line: str) -> None:
+        clean = sanitize_text(line)
+        self._disc_lines.append(clean)
+        self._disc_tokens.append(estimate_tokens(clean))
+        self._disc_text = None
+
+        speaker, sep, message = clean.partition(": ")
+        if not sep:
+            speaker, message = "", clean
+        elif speaker:
+            self._names[speaker] = None
+        mentioned = tuple(n for n in self._names if n != speaker and n in message)
+        self._disc_records.append((speaker, mentioned))
+
+        stripped = clean.strip()
+        if is_anchor_candidate(stripped):
+            self._anchor = stripped
+            self._anchor_index = len(self._disc_lines) - 1
+
+    def _reset_descriptions(self) -> None:
+        self._desc_lines = []
+        self._desc_text = None
+        self._desc_tokens = 0
+        self._windows.clear()
+
+    def _reset_discussions(self) -> None:
+        self._disc_lines = []
+        self._disc_text = None
+        self._disc_tokens = []
+        self._disc_records = []
+        self._anchor = ""
+        self._anchor_index = -1
+        self._summaries.clear()
+        self._windows.clear()
+
+    def sync(self, descriptions: dict, discussions: list) -> "PromptContext":
+        """
+        game 기록과 맞춘다. 같은 객체에 뒤로 추가된 것만 반영하고,
+        재할당(새 게임/복원)되거나 줄어들었으면 처음부터 다시 만든다.
+        """
+        n_desc = len(self._desc_lines)
+        if descriptions is not self._desc_src or len(descriptions) < n_desc:
+            self._desc_src = descriptions
+            self._reset_descriptions()
+            n_desc = 0
+        for name, text in islice(descriptions.items(), n_desc, None):
+            self.add_description(name, text)
+
+        n_disc = len(self._disc_lines)
+        if discussions is not self._disc_src or len(discussions) < n_disc:
+            self._disc_src = discussions
+            self._reset_discussions()
+            n_disc = 0
+        for line in discussions[n_disc:]:
+            self.add_discussion(line)
+        return self
+
+    def fork(self) -> "PromptContext":
+        """game과 분리된 사본 (미리 생성하는 발언을 game에 반영하지 않고 이어 붙일 때)"""
+        ctx = PromptContext()
+        ctx._desc_lines = list(self._desc_lines)
+        ctx._disc_lines = list(self._disc_lines)
+        ctx._anchor = self._anchor
+        ctx._desc_text = self._desc_text
+        ctx._disc_text = self._disc_text
+        ctx._names = dict(self._names)
+        ctx._desc_tokens = self._desc_tokens
+        ctx._disc_tokens = list(self._disc_tokens)
+        ctx._disc_records = list(self._disc_records)
+        ctx._anchor_index = self._anchor_index
+        ctx._summaries = {k: v.copy() for k, v in self._summaries.items()}
+        ctx._windows = dict(self._windows)
+        return ctx
+
+    @classmethod
+    def from_history(cls, descriptions: dict | None, discussions: list | None) -> "PromptContext":
+        """일회용 (game 없이 기록만 주어진 호출용)"""
+        ctx = cls()
+        for name, text in (descriptions or {}).items():
+            ctx.add_description(name, text)
+        for line in discussions or []:
+            ctx.add_discussion(line)
+        return ctx
+
+    # --- 프롬프트용 문자열 ---
+    @property
+    def description_context(self) -> str:
+        if self._desc_text is None:
+            self._desc_text = "\n".join(self._desc_lines)
+        return self._desc_text
+
+    @property
+    def discussion_history(self) -> str:
+        """전체 토론 기록 (원문)"""
+        if self._disc_text is None:
+            self._disc_text = "\n".join(self._disc_lines)
+        return self._disc_text
+
+    def discussion_window(self, phase: str) -> str:
+        """
+        phase 예산에 맞춘 토론 기록 (PROMPT_WINDOW_TURNS / PROMPT_TOKEN_BUDGETS).
+        최근 발언(윈도우 절반~전체)은 원문, 그 이전은 롤링 요약 + (윈도우 밖이면) 앵커 발언.
+        요약은 단계별로 앞으로만 접히고(한번 요약된 발언은 원문으로 돌아오지 않음),
+        결과는 기록이 바뀔 때까지 캐시된다.
+        """
+        window = PROMPT_WINDOW_TURNS.get(phase)
+        budget = PROMPT_TOKEN_BUDGETS.get(phase)
+        if window is None and budget is None:
+            return self.discussion_history
+
+        n = len(self._disc_lines)
+        n_desc = len(self._desc_lines)
+        cached = self._windows.get(phase)
+        if cached is not None and cached[0] == n_desc and cached[1] == n:
+            return cached[2]
+
+        summary = self._summaries.get(phase)
+        if summary is None:
+            summary = self._summaries[phase] = _RollingSummary()
+        cutoff = summary.upto
+        if window is not None and n - cutoff > window:
+            # 한 줄씩이 아니라 윈도우 절반씩 접는다: 요약이 몇 턴 동안 그대로라
+            # 프롬프트 앞부분(설명 + 요약 + 원문)이 유지되어 provider prompt cache가 맞는다
+            cutoff = n - max(1, window // 2)
+        summary.fold(self._disc_records, cutoff)
+
+        if budget is not None:
+            # 예산을 넘으면 가장 오래된 원문 발언부터 요약으로 (마지막 한 줄은 남김)
+            recent = sum(self._disc_tokens[cutoff:])
+            while cutoff < n - 1:
+                anchor = estimate_tokens(self._anchor) if 0 <= self._anchor_index < cutoff else 0
+                used = self._desc_tokens + (estimate_tokens(summary.text) if cutoff else 0) + anchor + recent
+                if used <= budget:
+                    break
+                recent -= self._disc_tokens[cutoff]
+                cutoff += 1
+                summary.fold(self._disc_records, cutoff)
+
+        parts = []
+        if cutoff:
+            parts.append(summary.text)
+        if 0 <= self._anchor_index < cutoff:
+            parts.append(f"(key earlier message) {self._anchor}")
+        parts.extend(self._disc_lines[cutoff:])
+        text = "\n".join(parts)
+        self._windows[phase] = (n_desc, n, text)
+        return text
+
+    @property
+    def has_discussion(self) -> bool:
+        return bool(self._disc_lines)
+
+    @property
+    def anchor(self) -> str:
+        return self._anchor
@@ -36,20 +36,11 @@ assigned_keyword: str,
 #history_text: str
 ) -> tuple[str, str]:
 
-    """[시민] 할당받은 키워드로 문장 만들기"""
+    """[시민] 할당받은 키워드로 문장 만들기 (고정 지침/예시는 system, 봇별 소재는 user 끝)"""
     system = f"""
     {GAME_CONTEXT}
     당신은 라이어 게임의 [시민]입니다. 주어진 소재를 활용해 라이어를 속여야 합니다.
     당신의 목표는 제시어를 아예 다른 걸로 속이는 게 아니라, "이 제시어"와 관련된 경험을 말해서 공감대를 형성하는 것입니다.
-    """
-    user = f"""
-    [당신에게 할당된 소재]
-    제시어: '{keyword}'
-    카테고리: '{category}'
-    제시어 관련 설명 참고 자료: {assigned_keyword}
-
-    [미션]
-    할당된 소재('{assigned_keyword}')를 제시어 설명에 활용하세요.
     
     [주의]
     1. 제시어 직접 언급 금지.
@@ -63,6 +54,15 @@ assigned_keyword: str,
       -> "이 과일은 아침에 먹으면 좋다는데, 깎아 먹기가 귀찮아서 잘 안 먹게 돼." (O - 식습관 묘사)
     - 제시어: 호랑이 (연상: 곶감, 산)
       -> "산에서 이 친구 마주치면 도망가도 소용없을 거야." (O - 대처 상황 묘사)
+    """
+    user = f"""
+    [당신에게 할당된 소재]
+    제시어: '{keyword}'
+    카테고리: '{category}'
+    제시어 관련 설명 참고 자료: {assigned_keyword}
+
+    [미션]
+    할당된 소재('{assigned_keyword}')를 제시어 설명에 활용하세요.
 
     [출력]
     """
@@ -70,21 +70,12 @@ assigned_keyword: str,
 
 
 def get_liar_step2(category: str, history_text: str) -> str:
-    """[라이어 2단계: 전략 수립]"""
+    """[라이어 2단계: 전략 수립] (고정 전략/예시는 system, 카테고리와 대화 맥락은 user)"""
     
     system = f"""
     {GAME_CONTEXT}
     당신은 라이어 게임의 [라이어]입니다. 제시어는 시민들만 알고 있습니다. 당신은 제시어를 모르는 것을 절대로 들키면 안 됩니다.
     시민들의 대화 흐름에 자연스럽게 묻어가는 '거짓말'을 해야 합니다. [예시]의 말하기 방식을 하나 참고해 '한 문장'으로 답변해주세요.
-    """
-
-    user = f"""
-    
-    [카테고리]
-    {category}
-
-    [대화 맥락]
-    {history_text}
     
     [대화 전략]
     - 반드시 [예시]를 보고 한 전략1,2의 '한 문장'을 참고해 자연스러운 발화를 해주세요. (제일 중요!)
@@ -102,6 +93,15 @@ def get_liar_step2(category: str, history_text: str) -> str:
     -> 맞아, 나도 이 동물이 OO한 특징이 있다고 생각해.
     -> 맞아, 그 동물은 oo한 경우가 있지
     """
+
+    user = f"""
+    
+    [카테고리]
+    {category}
+
+    [대화 맥락]
+    {history_text}
+    """
     
     return system, user
 
@@ -1,5 +1,7 @@
 import random
 
+from .layout import layered_messages
+
 GAME_CONTEXT = """
 [Liar Game Context]
 - You are playing the Liar Game.
@@ -7,7 +9,72 @@ GAME_CONTEXT = """
 - The Liar must blend in by sounding plausible and steering suspicion toward others.
 """
 
-def get_discussion_prompt(
+# 말투 지침 중 고정 부분 (system에 넣어 캐시되게 함). 무작위 말투/예시는 봇별 지시로.
+AUTHORITATIVE_STYLE = """
+        [Style: High message strength]
+
+        [Required instructions]
+        1. You are logical and decisive.
+        2. Critique the suspected player's description using specific reasoning from [Reference 1].
+        3. Avoid repeating prior statements from [Reference 2]; add a fresh angle.
+        4. Speak in casual conversational English, about 1 sentence.
+        5. Do not prefix your name; respond directly as dialogue.
+        """
+
+AUTHORITATIVE_TRAITS = [
+    "- **Assertive tone**: Use confident, definitive statements.",
+    "- **Logical critique**: Point out inconsistencies or overly generic descriptions.",
+    "- **Expertise display**: Sound experienced and analytical about the game.",
+    "- **Directive stance**: Suggest who to vote for."
+]
+
+TIMID_STYLE = """
+        [Style: Low authority]
+
+        [Required Instructions]
+        1. You have a timid and indecisive personality. Only make emotional statements without logic. (This is the most important!)
+        2. **CRITICAL**: Read [Reference 2] (previous messages) carefully. If others used phrases like "kinda feel", "a bit off", "doesn't sit right", "you know?", "trying too hard" - YOU MUST USE COMPLETELY DIFFERENT EXPRESSIONS.
+        3. Vary your sentence structure dramatically.
+        4. Always speak in casual conversational English, around 1 sentence.
+        5. Don't start with your name - jump straight into dialogue.
+        6. **Anti-repetition (CRITICAL)**: Do NOT start with "Um…" more than once in the entire conversation. Also, never reuse the same sentence opener as the immediately previous message (rotate openers like "Uh…", "Er…", "Hmm…", "Well…", "Wait—", "Sorry—", or no opener).
+        7. CRITICAL (Length): Reply in ONE sentence and ≤ 15 words.
+        8. CRITICAL (No elaboration): No extra details. Do not add a second sentence.
+        """
+
+TIMID_TRAITS = [
+    "- **Hedging**: Use uncertain phrasing (e.g., 'maybe', 'probably', 'I guess').",
+    "- **Hesitant fillers**: Occasionally start with fillers like 'um..', 'uh..', 'hmm..'.",
+    "- **Self-doubt disclaimers**: Add caveats like 'I might be wrong' or 'not 100% sure'.",
+    "- **Mid-sentence corrections**: Revise yourself mid-line (e.g., 'I mean—', 'no, wait—').",
+    "- **Text stutter**: Break words or repeat the first syllable (e.g., 'I-I…', 'th-this…', 'w-wait…').",
+    "- **Trailing off**: End with ellipses to sound unsure (e.g., '...').",
+    "- **Repetition for reassurance**: Repeat a key word/phrase once (e.g., 'maybe, maybe').",
+    "- **Defer to others**: Lean on others’ opinions (e.g., 'I’m not sure, but since you said X, maybe it’s Y...')."
+]
+
+def get_discussion_preamble(is_authoritative: bool) -> str:
+    """system (봇/세션과 무관한 고정 부분)"""
+    return f"""
+    {GAME_CONTEXT}
+    You are a discussion participant.
+    Read [Reference 1] and [Reference 2], then follow [Your behavior] and the style guide.
+
+    [Style guide]
+    {AUTHORITATIVE_STYLE if is_authoritative else TIMID_STYLE}
+    """
+
+def get_discussion_shared(description_context: str, discussion_history: str) -> str:
+    """세션 공통 기록 (같은 시점의 봇들끼리 동일)"""
+    return f"""
+    [Reference 1: Player descriptions (important)]
+    {description_context}
+    
+    [Reference 2: Current discussion history]
+    {discussion_history}
+    """
+
+def get_discussion_messages(
     category: str,
     keyword: str,
     my_name: str,
@@ -19,7 +86,7 @@ def get_discussion_prompt(
     discussion_history: str, 
     discussion_anchor: str,
     is_authoritative: bool,
- ) -> str:
+ ) -> list[dict]:
 
     # behavior = "[기본 지침] 상황을 지켜보며 자연스럽게 대화에 참여하세요."
     behavior = "[Base instruction] Join the conversation naturally while observing the situation."
@@ -43,58 +110,19 @@ def get_discussion_prompt(
         with being a citizen. Instead, suspect [{target_to_accuse}] or [{human_suspect}].
         """
 
-    # 2. 화법 스타일 (랜덤 선택)
+    # 2. 화법 스타일 (고정 지침은 preamble, 여기엔 무작위 말투만)
     if is_authoritative:
-        traits = [
-            "- **Assertive tone**: Use confident, definitive statements.",
-            "- **Logical critique**: Point out inconsistencies or overly generic descriptions.",
-            "- **Expertise display**: Sound experienced and analytical about the game.",
-            "- **Directive stance**: Suggest who to vote for."
-        ]
-        selected_traits = random.sample(traits, k=2)
-        
+        selected_traits = random.sample(AUTHORITATIVE_TRAITS, k=2)
         style_guide = f"""
-        [Style: High message strength]
-
         [Acting points]
         {chr(10).join(selected_traits)}
-
-        [Required instructions]
-        1. You are logical and decisive.
-        2. Critique the suspected player's description using specific reasoning from [Reference 1].
-        3. Avoid repeating prior statements from [Reference 2]; add a fresh angle.
-        4. Speak in casual conversational English, about 1 sentence.
-        5. Do not prefix your name; respond directly as dialogue.
         """
     else:
-        traits = [
-            "- **Hedging**: Use uncertain phrasing (e.g., 'maybe', 'probably', 'I guess').",
-            "- **Hesitant fillers**: Occasionally start with fillers like 'um..', 'uh..', 'hmm..'.",
-            "- **Self-doubt disclaimers**: Add caveats like 'I might be wrong' or 'not 100% sure'.",
-            "- **Mid-sentence corrections**: Revise yourself mid-line (e.g., 'I mean—', 'no, wait—').",
-            "- **Text stutter**: Break words or repeat the first syllable (e.g., 'I-I…', 'th-this…', 'w-wait…').",
-            "- **Trailing off**: End with ellipses to sound unsure (e.g., '...').",
-            "- **Repetition for reassurance**: Repeat a key word/phrase once (e.g., 'maybe, maybe').",
-            "- **Defer to others**: Lean on others’ opinions (e.g., 'I’m not sure, but since you said X, maybe it’s Y...')."
-        ]
-        selected_traits = random.sample(traits, k=2)
-        
+        selected_traits = random.sample(TIMID_TRAITS, k=2)
         style_guide = f"""
-        [Style: Low authority]
-        
         [Acting points]
         {chr(10).join(selected_traits)}
 
-        [Required Instructions]
-        1. You have a timid and indecisive personality. Only make emotional statements without logic. (This is the most important!)
-        2. **CRITICAL**: Read [Reference 2] (previous messages) carefully. If others used phrases like "kinda feel", "a bit off", "doesn't sit right", "you know?", "trying too hard" - YOU MUST USE COMPLETELY DIFFERENT EXPRESSIONS.
-        3. Vary your sentence structure dramatically.
-        4. Always speak in casual conversational English, around 1 sentence.
-        5. Don't start with your name - jump straight into dialogue.
-        6. **Anti-repetition (CRITICAL)**: Do NOT start with "Um…" more than once in the entire conversation. Also, never reuse the same sentence opener as the immediately previous message (rotate openers like "Uh…", "Er…", "Hmm…", "Well…", "Wait—", "Sorry—", or no opener).
-        7. CRITICAL (Length): Reply in ONE sentence and ≤ 15 words.
-        8. CRITICAL (No elaboration): No extra details. Do not add a second sentence.
-
         [Diverse Examples - Use these as inspiration, NOT templates]
         - "Uh.. I might be wrong.., but {target_to_accuse} is making me nervous.."
         - "S-sorry—I'm confused.. Um.. did {target_to_accuse} explain that part at all..?"
@@ -106,20 +134,18 @@ def get_discussion_prompt(
         - "If everyone else is worried too, then… hmm.. maybe {target_to_accuse} needs another look…?"
         """
 
-    # 공통 프롬프트 구성
-    return f"""
-    {GAME_CONTEXT}
+    # 봇별 지시 (맨 뒤)
+    instructions = f"""
     Your name is '{my_name}', and your current role is '{role}'.
     
-    [Reference 1: Player descriptions (important)]
-    {description_context}
-    
-    [Reference 2: Current discussion history]
-    {discussion_history}
-    
     [Your behavior]
     {behavior}
     
-    [Style guide]
+    [Style guide: your acting points]
     {style_guide}
-    """
\ No newline at end of file
+    """
+    return layered_messages(
+        get_discussion_preamble(is_authoritative),
+        get_discussion_shared(description_context, discussion_history),
+        instructions,
+    )
@@ -0,0 +1,34 @@
+"""
+LLM을 쓸 수 없을 때(차단기 open, 시간 초과, 오류) 게임에 대신 내보낼 문장 (degraded mode).
+"Error" 같은 문자열이 채팅에 올라가지 않도록, 단계별로 어느 역할이 말해도 어색하지 않은 문장만 둔다.
+"""
+import random
+
+# 설명 단계 (설명 프롬프트와 같은 한국어, 제시어를 가리키는 대명사만 사용)
+DESCRIPTION_LINES = [
+    "이건 주변에서 생각보다 자주 볼 수 있는 것 같아.",
+    "이건 사람마다 호불호가 좀 갈리는 편이지.",
+    "이건 처음 봤을 때보다 알수록 더 정이 가더라.",
+    "이건 계절에 따라 느낌이 좀 달라지는 것 같아.",
+]
+
+# 토론 단계 (토론 프롬프트와 같은 영어, 한 문장)
+DISCUSSION_LINES_WITH_TARGET = [
+    "Hmm.. I'm still not sure about {target}, that description felt a bit vague.",
+    "Wait, {target}'s answer didn't really sound specific to me.",
+    "I keep coming back to {target}.. something there felt off.",
+]
+DISCUSSION_LINES = [
+    "Hmm.. I need a moment, nothing has really stood out to me yet.",
+    "I'm not sure yet, let's hear a bit more before deciding.",
+]
+
+FINAL_GUESS_LINE = "모르겠습니다."
+
+def description_line() -> str:
+    return random.choice(DESCRIPTION_LINES)
+
+def discussion_line(target: str = "") -> str:
+    if target:
+        return random.choice(DISCUSSION_LINES_WITH_TARGET).format(target=target)
+    return random.choice(DISCUSSION_LINES)
@@ -0,0 +1,16 @@
+"""
+프롬프트 배치 (provider 쪽 prompt caching 용).
+
+캐시는 messages 앞부분이 바이트 단위로 같을 때만 맞으므로 항상 이 순서로 쌓는다.
+    1. system : 고정 안내 (게임 설명 / 규칙 / 예시) - 봇, 세션과 무관
+    2. user   : 세션 공통 기록 (설명 목록 / 토론 기록) - 같은 시점의 봇들끼리 동일
+    3. user   : 봇별 지시 (이름, 역할, 입장, 무작위 말투 등)
+봇마다 달라지는 값은 3번에만 넣어야 앞의 1~2번이 캐시된다.
+"""
+
+def layered_messages(preamble: str, shared: str, instructions: str) -> list[dict]:
+    messages = [{"role": "system", "content": preamble}]
+    if shared:
+        messages.append({"role": "user", "content": shared})
+    messages.append({"role": "user", "content": instructions})
+    return messages
@@ -1,4 +1,49 @@
-def get_voting_prompt(
+from .layout import layered_messages
+
+# 봇과 무관한 고정 부분 (system)
+VOTING_PREAMBLE = """
+    당신은 라이어 게임 플레이어입니다.
+    지금은 투표 시간입니다. 기록을 분석하여 투표할 대상을 정하세요.
+
+    [행동 지침: 언행일치]
+    1. [2. 토론 기록]에서 **당신이 했던 발언**을 찾아보세요.
+    2. 당신이 토론 때 **공격했거나 의심했던 대상**을 찾아내세요.
+    3. 만약 특정인을 공격했다면 -> **그 사람을 투표하세요.**
+    4. 만약 누군가에게 동조했다면 -> **그 사람이 의심하는 대상을 투표하세요.**
+    5. (만약 당신이 토론에서 아무 말도 안 했다면, [1. 설명 기록]을 보고 가장 수상한 사람을 찍으세요.)
+
+    [출력 형식]
+    사족 없이 투표할 대상의 **이름만** 정확하게 적으세요.
+    (예시: Bot_2)
+    """
+
+BULK_VOTING_PREAMBLE = """
+    당신은 라이어 게임의 진행자입니다.
+    지금은 투표 시간입니다. 기록을 보고 각 플레이어가 누구에게 투표할지 정하세요.
+
+    [행동 지침: 언행일치 - 각 플레이어마다 따로 적용]
+    1. [2. 토론 기록]에서 **그 플레이어가 했던 발언**을 찾아보세요.
+    2. 그 플레이어가 토론 때 **공격했거나 의심했던 대상**을 찾아내세요.
+    3. 만약 특정인을 공격했다면 -> **그 사람에게 투표합니다.**
+    4. 만약 누군가에게 동조했다면 -> **그 사람이 의심하는 대상에게 투표합니다.**
+    5. (토론에서 아무 말도 안 했다면, [1. 설명 기록]을 보고 가장 수상한 사람을 고릅니다.)
+    6. 자기 자신에게는 투표할 수 없습니다.
+
+    [출력 형식]
+    사족 없이 JSON 객체만 출력하세요. 값은 후보 이름과 정확히 같아야 합니다.
+    """
+
+def get_voting_shared(desc_text: str, disc_text: str) -> str:
+    """세션 공통 기록 (같은 시점의 투표자들끼리 동일)"""
+    return f"""
+    [1. 설명 기록 (Description Log)]
+    {desc_text}
+
+    [2. 토론 기록 (Discussion Log)]
+    {disc_text}
+    """
+
+def get_voting_messages(
     my_name: str,
     role: str,
     category: str,
@@ -7,31 +52,44 @@ def get_voting_prompt(
     desc_text: str,
     disc_text: str,
     # my_last_speech: str
-) -> str:
-    
+) -> list[dict]:
+
     candidates_str = ", ".join(candidates)
-    
-    return f"""
-    당신은 라이어 게임 플레이어 '{my_name}'입니다. 
-    지금은 투표 시간입니다. 아래 기록을 분석하여 투표할 대상을 정하세요.
-    
-    [1. 설명 기록 (Description Log)]
-    {desc_text}
-    
-    [2. 토론 기록 (Discussion Log)]
-    {disc_text}
-    
-    [행동 지침: 언행일치]
-    1. 위 [2. 토론 기록]에서 **당신({my_name})이 했던 발언**을 찾아보세요.
-    2. 당신이 토론 때 **공격했거나 의심했던 대상**을 찾아내세요.
-    3. 만약 특정인을 공격했다면 -> **그 사람을 투표하세요.**
-    4. 만약 누군가에게 동조했다면 -> **그 사람이 의심하는 대상을 투표하세요.**
-    5. (만약 당신이 토론에서 아무 말도 안 했다면, [1. 설명 기록]을 보고 가장 수상한 사람을 찍으세요.)
-    
+
+    instructions = f"""
+    당신의 이름은 '{my_name}'입니다. [2. 토론 기록]에서 '{my_name}'의 발언이 당신의 발언입니다.
+
     [투표 후보]
     {candidates_str}
-    
-    [출력 형식]
-    사족 없이 투표할 대상의 **이름만** 정확하게 적으세요.
-    (예시: Bot_2)
-    """
\ No newline at end of file
+    """
+    return layered_messages(VOTING_PREAMBLE, get_voting_shared(desc_text, disc_text), instructions)
+
+def get_bulk_voting_messages(
+    voter_names: list,
+    candidates: list,
+    category: str,
+    desc_text: str,
+    disc_text: str,
+) -> list[dict]:
+    """
+    여러 AI의 투표를 한 번에 받기 위한 프롬프트.
+    공통 기록은 한 번만 넣고, 역할(라이어 여부)은 서로에게 새지 않도록 넣지 않는다.
+    """
+    voters_str = ", ".join(voter_names)
+    candidates_str = ", ".join(candidates)
+    example = ", ".join([f'"{name}": "<대상 이름>"' for name in voter_names])
+
+    shared = f"""
+    [주제]
+    {category}
+    {get_voting_shared(desc_text, disc_text)}"""
+    instructions = f"""
+    투표할 플레이어: {voters_str}
+
+    [투표 후보]
+    {candidates_str}
+
+    [출력 형태]
+    {{{example}}}
+    """
+    return layered_messages(BULK_VOTING_PREAMBLE, shared, instructions)
@@ -0,0 +1,88 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+import backend.db as db
+
+from game.ai_player import AIPlayer
+from game.constants import GameState
+from game.game_session import GameSession
+
+HUMAN = "Human"
+BOTS = ["Bot_1", "Bot_2", "Bot_3", "Bot_4"]
+
+def make_game(human: str = HUMAN) -> GameSession:
+    """인간 1명 + AI 4명으로 시작한 게임 (설명 단계)"""
+    game = GameSession()
+    game.add_player(human)
+    for name in BOTS:
+        game.add_player(name)
+        game.players[name] = AIPlayer(name)
+    assert game.start_game(liar_count=1, use_fool=True)
+    return game
+
+def make_discussion_game(order: list[str]) -> GameSession:
+    """설명을 모두 마치고 order 순서로 토론을 시작한 게임"""
+    game = make_game()
+    while game.game_state == GameState.DESCRIPTION:
+        game.handle_description(f"{game.current_player.name}의 설명 1번")
+    game.turn_order = [game.players[name] for name in order]
+    game.mark_saved()
+    return game
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+class FakeConn:
+    """
+    backend/db.py가 실행하는 SQL을 기록하는 연결 대역 (DB 없이).
+    version: sessions update가 돌려줄 새 버전 (None이면 CAS 실패), exists: 세션 행이 있는지,
+    inserted: events insert의 returning 행
+    """
+    def __init__(self, version=2, exists=True, inserted=()):
+        self.version = version
+        self.exists = exists
+        self.inserted = list(inserted)
+        self.executed = []
+
+    async def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+        if "update sessions" in sql:
+            return FakeCursor([] if self.version is None else [{"state_version": self.version}])
+        if "select 1 from sessions" in sql:
+            return FakeCursor([{"?column?": 1}] if self.exists else [])
+        if "insert into events" in sql:
+            return FakeCursor(self.inserted)
+        return FakeCursor([])
+
+    def ran(self, fragment: str) -> bool:
+        return any(fragment in sql for sql, _ in self.executed)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+def use_fake_db(monkeypatch, conn: FakeConn) -> FakeConn:
+    async def get_pool():
+        return FakePool(conn)
+    monkeypatch.setattr(db, "get_pool", get_pool)
+    return conn
+
+@pytest.fixture
+def discussion_game():
+    return make_discussion_game
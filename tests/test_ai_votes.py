@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+import backend.server as server
+from game.ai_player import AIPlayer
+from game.generation import DeadlineExceeded, generation_profile
+
+from .conftest import BOTS, make_game
+
+def test_deadline_cancels_sibling_votes(monkeypatch):
+    game = make_game()
+    voters = [game.players[name] for name in BOTS]
+    cancelled = []
+
+    async def generate_vote(self, *args, **kwargs):
+        if self.name == BOTS[0]:
+            await asyncio.sleep(0.01)
+            raise DeadlineExceeded("request deadline exceeded")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(self.name)
+            raise
+        return BOTS[0]
+    monkeypatch.setattr(AIPlayer, "generate_vote", generate_vote)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(server._generate_ai_votes(game, voters))
+    # 나머지 투표는 끝날 때까지 돌지 않고 바로 취소된다
+    assert sorted(cancelled) == BOTS[1:]
+
+def test_vote_timeout_covers_retries(monkeypatch):
+    monkeypatch.setattr(server, "AI_VOTE_TIMEOUT_SECONDS", None)
+    for phase in ("VOTING", "BULK_VOTING"):
+        profile = generation_profile(phase)
+        assert server._vote_timeout(phase) > profile.timeout * (profile.retries + 1)
+
+    monkeypatch.setattr(server, "AI_VOTE_TIMEOUT_SECONDS", 3.0)
+    assert server._vote_timeout("VOTING") == 3.0
@@ -0,0 +1,81 @@
+import pytest
+
+from backend.codec import CodecError, decode_session, decode_transcript, encode_session
+from backend.serialize import serialize_game, transcript_rows
+from game.constants import GameState
+
+from .conftest import BOTS, make_discussion_game, make_game
+
+EXTRA = {"participantName": "Kim: Jr", "votes_cast": {"Bot_1": "Bot_2"}}
+
+def _game():
+    """이름에 ": "가 들어간 인간 참가자와 토론 기록이 있는 게임"""
+    game = make_game(human="Kim: Jr")
+    while game.game_state == GameState.DESCRIPTION:
+        game.handle_description(f"{game.current_player.name}의 설명")
+    for i in range(3):
+        game.handle_discussion(f"발언 {i}: 콜론 포함")
+    # 플레이어가 아닌 이름의 설명도 그대로 보존
+    game.descriptions["Left: Player"] = "나간 참가자의 설명"
+    return game
+
+def test_round_trip():
+    game = _game()
+
+    decoded, extra = decode_session(encode_session(game, EXTRA))
+
+    assert extra == EXTRA
+    assert serialize_game(decoded, include_transcript=True) == serialize_game(game, include_transcript=True)
+    assert decoded.discussions[0].startswith(game.turn_order[0].name + ": ")
+
+def test_decode_transcript_only():
+    game = _game()
+
+    assert decode_transcript(encode_session(game)) == (game.descriptions, game.discussions)
+
+def test_without_transcript_is_read_only():
+    game = _game()
+    data = encode_session(game, EXTRA)
+
+    decoded, extra = decode_session(data, transcript=False)
+
+    assert extra == EXTRA
+    assert decoded.game_state == game.game_state
+    assert [p.name for p in decoded.turn_order] == [p.name for p in game.turn_order]
+    assert len(decoded.descriptions) == 0 and len(decoded.discussions) == 0
+    with pytest.raises(CodecError):
+        encode_session(decoded)
+    with pytest.raises(ValueError):
+        transcript_rows(decoded, full=True)
+    with pytest.raises((TypeError, AttributeError)):
+        decoded.handle_discussion("저장하면 안 되는 발언")
+
+@pytest.mark.parametrize("mangle", [
+    lambda data: b"XYZ" + data[3:],                       # magic
+    lambda data: data[:3] + bytes([99]) + data[4:],       # version
+    lambda data: data[:-1],                               # 잘림
+    lambda data: data[:40],
+    lambda data: data[:4],                                # 헤더만
+    lambda data: data + b"\x00",                          # 남는 바이트
+])
+def test_corrupt_data(mangle):
+    data = encode_session(make_discussion_game(BOTS[:2] + ["Human"] + BOTS[2:]))
+    with pytest.raises(CodecError):
+        decode_session(mangle(data))
+
+def test_truncated_transcript():
+    data = encode_session(_game())
+    with pytest.raises(CodecError):
+        decode_transcript(data[:-5])
+
+def test_limits_raise_instead_of_wrapping():
+    game = make_game()
+    for i in range(260):
+        game.players[f"P{i}"] = game.players[BOTS[0]].__class__(f"P{i}")
+    with pytest.raises(CodecError):
+        encode_session(game)
+
+    game = make_game()
+    game.players[BOTS[0]].votes_received = 70_000
+    with pytest.raises(CodecError):
+        encode_session(game)
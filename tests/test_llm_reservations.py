@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import game.ai_player as ai_player
+from game.ai_player import AIPlayer
+from game.generation import DeadlineExceeded, GenerationProfile, generation_deadline
+
+class FakeScheduler:
+    """예약/정산만 기록하는 llm_scheduler 대역 (예약은 항상 100 토큰)"""
+    def __init__(self):
+        self.acquired = 0
+        self.settled = []
+        self.released = 0
+
+    @staticmethod
+    def estimate_cost(messages, max_tokens):
+        return 100
+
+    async def acquire(self, model, tokens, timeout=None):
+        self.acquired += 1
+        return tokens
+
+    async def try_acquire(self, model, tokens):
+        self.acquired += 1
+        return tokens
+
+    def settle(self, model, reserved, used):
+        self.settled.append(used)
+
+    def release(self, model, reserved):
+        self.released += 1
+
+    def throttle(self, model, seconds=None):
+        pass
+
+    @property
+    def open(self):
+        return self.acquired - len(self.settled) - self.released
+
+def _response(text, tokens):
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=tokens))
+
+class FakeClient:
+    """create 호출마다 replies의 다음 항목을 실행 (예외면 올리고, 코루틴 함수면 await)"""
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def create(self, **kwargs):
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        return await reply()
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    fake = FakeScheduler()
+    monkeypatch.setattr(ai_player, "llm_scheduler", fake)
+    return fake
+
+def _generate(monkeypatch, replies, profile, model):
+    monkeypatch.setattr(ai_player, "get_client", lambda base_url=None: FakeClient(replies))
+    bot = AIPlayer("Bot_1", model=model)
+    return bot._generate(model, [], 0.0, profile, {}, None, "TEST")
+
+def _reply(text, tokens, delay=0.0):
+    async def reply():
+        await asyncio.sleep(delay)
+        return _response(text, tokens)
+    return reply
+
+def test_failed_attempt_is_refunded(monkeypatch, scheduler):
+    profile = GenerationProfile(retries=1, retry_backoff=0.0)
+    replies = [asyncio.TimeoutError(), _reply("두 번째", 42)]
+
+    content, usage, _ = asyncio.run(_generate(monkeypatch, replies, profile, "test-retry"))
+
+    assert content == "두 번째"
+    assert scheduler.released == 1
+    assert scheduler.settled == [42]
+    assert scheduler.open == 0
+
+def test_hedge_loser_is_refunded(monkeypatch, scheduler):
+    monkeypatch.setattr(ai_player.llm_resilience, "hedge_delay", lambda *args: 0.01)
+    profile = GenerationProfile(timeout=2.0, hedge=True)
+    replies = [_reply("느린 원 요청", 10, delay=1.0), _reply("헤지", 7)]
+
+    content, _, _ = asyncio.run(_generate(monkeypatch, replies, profile, "test-hedge"))
+
+    assert content == "헤지"
+    # 헤지는 실제 사용량으로, 취소된 원 요청은 반환
+    assert scheduler.settled == [7]
+    assert scheduler.released == 1
+    assert scheduler.open == 0
+
+def test_attempt_cut_by_deadline_is_refunded(monkeypatch, scheduler):
+    profile = GenerationProfile(timeout=5.0, retries=2)
+    replies = [_reply("늦음", 10, delay=1.0)]
+
+    async def run():
+        with generation_deadline(0.05):
+            return await _generate(monkeypatch, replies, profile, "test-deadline")
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+    assert scheduler.settled == []
+    assert scheduler.open == 0
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import backend.db as db
+import backend.replay as replay
+from game.constants import GameState
+
+from .conftest import HUMAN, FakeConn, make_game, use_fake_db
+
+def _started(game) -> dict:
+    """backend/server.py game_start가 기록하는 GAME_STARTED payload"""
+    return {
+        "participantName": HUMAN,
+        "category": game.category,
+        "keyword": game.keyword,
+        "liar": game.liar.name,
+        "players": [{"name": p.name, "is_ai": bool(p.is_ai)} for p in game.players.values()],
+        "turnOrder": [p.name for p in game.turn_order],
+        "fool": game.fool_player.name if game.fool_player else None,
+        "discussionRounds": game.discussion_rounds,
+    }
+
+def _play_descriptions(game) -> list:
+    """설명 단계를 끝까지 진행하고 그동안의 재생 이벤트 행"""
+    rows = [{"type": "GAME_STARTED", "payload": _started(game)}]
+    while game.game_state == GameState.DESCRIPTION:
+        by = game.current_player.name
+        text = f"{by}의 설명"
+        game.handle_description(text)
+        type_ = "HUMAN_DESCRIPTION" if by == HUMAN else "AI_DESCRIPTION"
+        rows.append({"type": type_, "payload": {"by": by, "text": text}})
+    return rows
+
+def _rebuild(monkeypatch, snapshot, rows, version=5):
+    async def source(session_id, at, types):
+        assert types == replay.REPLAY_EVENT_TYPES
+        return snapshot, rows, version
+    monkeypatch.setattr(replay, "get_replay_source", source)
+    return asyncio.run(replay.rebuild_session("s1"))
+
+def _assert_same(rebuilt, game):
+    assert rebuilt.game_state == game.game_state
+    assert rebuilt.descriptions == game.descriptions
+    assert rebuilt.discussions == game.discussions
+    assert [p.name for p in rebuilt.turn_order] == [p.name for p in game.turn_order]
+    assert rebuilt.liar.name == game.liar.name
+
+def test_rebuild_from_events(monkeypatch):
+    game = make_game()
+    rows = _play_descriptions(game)
+
+    rebuilt, state = _rebuild(monkeypatch, None, rows)
+
+    _assert_same(rebuilt, game)
+    assert state["participantName"] == HUMAN
+    assert state["version"] == 5
+    assert state["events_since_snapshot"] == len(rows)
+
+def test_rebuild_from_snapshot_and_later_events(monkeypatch):
+    rows = _play_descriptions(make_game())
+    # 처음 세 이벤트까지 반영한 스냅샷 + 나머지 이벤트
+    partial, state = None, {}
+    for row in rows[:3]:
+        partial, state = replay.apply_event(partial, state, row["type"], row["payload"])
+    snapshot = {"state_bin": replay.encode_snapshot(partial, state), "state": None}
+
+    rebuilt, state = _rebuild(monkeypatch, snapshot, rows[3:])
+
+    full, _ = _rebuild(monkeypatch, None, rows)
+    _assert_same(rebuilt, full)
+    assert state["events_since_snapshot"] == len(rows) - 3
+
+def test_out_of_turn_event_is_rejected(monkeypatch):
+    game = make_game()
+    rows = _play_descriptions(game)
+    rows[1], rows[2] = rows[2], rows[1]
+
+    with pytest.raises(replay.ReplayError):
+        _rebuild(monkeypatch, None, rows)
+
+def _save_with_snapshot(monkeypatch, inserted, events):
+    conn = use_fake_db(monkeypatch, FakeConn(inserted=inserted))
+
+    buffer = db.EventBuffer("s1")
+    for type_, payload in events:
+        buffer.add(type_, payload)
+    asyncio.run(db.save_session_state("s1", {}, buffer, snapshot=b"snap"))
+    return [(sql, params) for sql, params in conn.executed if "session_snapshots" in sql]
+
+def test_snapshot_boundary_is_last_event_of_the_save(monkeypatch):
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    inserted = [
+        {"seq": 41, "ts": t0 + timedelta(microseconds=1)},
+        {"seq": 42, "ts": t0 + timedelta(microseconds=2)},
+    ]
+
+    [(sql, params)] = _save_with_snapshot(
+        monkeypatch, inserted, [("AI_DESCRIPTION", {"by": "Bot_1"}), ("CONTEXT_MESSAGE", {})]
+    )
+
+    # 다른 경로로 들어온 이벤트의 max(ts)가 아니라 이번 저장에서 쓴 마지막 이벤트까지
+    assert "max(" not in sql
+    assert params[1:3] == (inserted[1]["ts"], 42)
+
+def test_snapshot_needs_events_in_the_same_save(monkeypatch):
+    assert _save_with_snapshot(monkeypatch, [], []) == []
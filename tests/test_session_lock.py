@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+import backend.session_lock as session_lock
+from backend.session_lock import SessionBusy, SessionLockProvider
+
+class FakeAdvisoryServer:
+    """pg_try_advisory_lock / pg_advisory_unlock만 흉내 내는 서버 (커넥션별 보유 키)"""
+    def __init__(self):
+        self.holders = {}
+        self.opened = 0
+
+    async def connect(self, autocommit=False):
+        assert autocommit
+        self.opened += 1
+        return FakeConn(self)
+
+class FakeCursor:
+    def __init__(self, row):
+        self._row = row
+
+    async def fetchone(self):
+        return self._row
+
+class FakeConn:
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+
+    async def execute(self, sql, params):
+        key = params[0]
+        if "pg_try_advisory_lock" in sql:
+            holder = self.server.holders.get(key)
+            if holder is None or holder is self:
+                self.server.holders[key] = self
+                return FakeCursor({"locked": True})
+            return FakeCursor({"locked": False})
+        if "pg_advisory_unlock" in sql:
+            if self.server.holders.get(key) is self:
+                del self.server.holders[key]
+            return FakeCursor({"pg_advisory_unlock": True})
+        raise AssertionError(sql)
+
+    async def close(self):
+        self.closed = True
+        self.server.holders = {k: c for k, c in self.server.holders.items() if c is not self}
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeAdvisoryServer()
+    monkeypatch.setattr(session_lock, "open_connection", server.connect)
+    monkeypatch.setattr(session_lock, "SESSION_LOCK_POLL_INTERVAL", 0.01)
+    return server
+
+def test_advisory_lock_excludes_other_processes(server):
+    # 두 프로세스 = 두 provider (각자 전용 커넥션)
+    a = SessionLockProvider(backend="advisory", timeout_seconds=0.1)
+    b = SessionLockProvider(backend="advisory", timeout_seconds=0.1)
+
+    async def run():
+        held = await a.acquire("s1")
+        with pytest.raises(SessionBusy):
+            await b.acquire("s1")
+        # 다른 세션은 그대로
+        other = await b.acquire("s2")
+        await other.release()
+
+        # 풀리면 기다리던 쪽이 잡는다
+        waiter = asyncio.create_task(b.acquire("s1", timeout_seconds=1.0))
+        await asyncio.sleep(0.03)
+        await held.release()
+        await (await waiter).release()
+
+    asyncio.run(run())
+    assert server.holders == {}
+    assert b.timeouts == 1
+
+def test_many_sessions_share_one_connection(server):
+    provider = SessionLockProvider(backend="advisory", timeout_seconds=0.1)
+
+    async def run():
+        locks = [await provider.acquire(f"s{i}") for i in range(50)]
+        assert len(server.holders) == 50
+        for lock in locks:
+            await lock.release()
+
+    asyncio.run(run())
+    assert server.opened == 1
+    assert server.holders == {}
+
+def test_reconnects_after_connection_loss(server):
+    provider = SessionLockProvider(backend="advisory", timeout_seconds=0.1)
+
+    async def run():
+        held = await provider.acquire("s1")
+        await provider._conn.close()  # 커넥션이 끊기면 락도 풀린다
+        await held.release()
+        again = await provider.acquire("s1")
+        await again.release()
+
+    asyncio.run(run())
+    assert server.opened == 2
+
+def test_new_entry_is_not_evicted_while_in_use():
+    provider = SessionLockProvider(backend="local", timeout_seconds=0.1, max_local=1)
+
+    async def run():
+        held_a = await provider.acquire("a")
+        held_b = await provider.acquire("b")
+        # 둘 다 쓰는 중이라 정리되지 않고, 같은 세션은 같은 락을 기다린다
+        assert set(provider._local) == {"a", "b"}
+        with pytest.raises(SessionBusy):
+            await provider.acquire("b", timeout_seconds=0.02)
+        await held_b.release()
+        await held_a.release()
+        # 쓰지 않는 락은 다음 획득 때 정리된다
+        held_c = await provider.acquire("c")
+        assert list(provider._local) == ["c"]
+        await held_c.release()
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+import asyncio
+
+from backend.server import _discussion_kwargs
+from backend.speculation import DiscussionSpeculator
+from game.ai_player import AIPlayer
+
+from .conftest import HUMAN
+
+def _fake_generation(monkeypatch):
+    calls = []
+
+    async def generate_discussion(self, **kwargs):
+        calls.append(self.name)
+        return f"{self.name} 발언 {len(calls)}"
+
+    monkeypatch.setattr(AIPlayer, "generate_discussion", generate_discussion)
+    return calls
+
+def _speculate_then_speak(game, typed: str, sent: str):
+    """typed로 추측 생성 -> 인간이 sent를 보냄 -> 다음 AI 차례의 take() 결과"""
+    speculator = DiscussionSpeculator(depth=2)
+
+    async def run():
+        assert speculator.start("s1", game, HUMAN, _discussion_kwargs, typed)
+        await speculator._jobs["s1"].runner
+        game.handle_discussion(sent)
+        p = game.current_player
+        return await speculator.take("s1", p, _discussion_kwargs(game, p, game.prompt_context))
+
+    return speculator, asyncio.run(run())
+
+def test_unchanged_human_line_is_a_hit(monkeypatch, discussion_game):
+    calls = _fake_generation(monkeypatch)
+    game = discussion_game(["Bot_1", HUMAN, "Bot_2", "Bot_3", "Bot_4"])
+    game.handle_discussion("Bot_3 설명이 좀 애매했어요")
+
+    speculator, text = _speculate_then_speak(game, "그냥 다들 비슷해 보여요", "그냥 다들 비슷해 보여요")
+
+    assert text == "Bot_2 발언 1"
+    assert speculator.hits == 1 and speculator.misses == 0
+    assert calls == ["Bot_2", "Bot_3"]
+
+def test_second_speculative_turn_is_reused_after_the_first(monkeypatch, discussion_game):
+    _fake_generation(monkeypatch)
+    game = discussion_game(["Bot_1", HUMAN, "Bot_2", "Bot_3", "Bot_4"])
+    game.handle_discussion("Bot_3 설명이 좀 애매했어요")
+    speculator, first = _speculate_then_speak(game, "잘 모르겠네요", "잘 모르겠네요")
+    game.handle_discussion(first)
+
+    async def take_next():
+        p = game.current_player
+        return await speculator.take("s1", p, _discussion_kwargs(game, p, game.prompt_context))
+
+    assert asyncio.run(take_next()) == "Bot_3 발언 2"
+    assert speculator.hits == 2
+
+def test_different_human_line_is_a_miss(monkeypatch, discussion_game):
+    _fake_generation(monkeypatch)
+    game = discussion_game(["Bot_1", HUMAN, "Bot_2", "Bot_3", "Bot_4"])
+    game.handle_discussion("Bot_3 설명이 좀 애매했어요")
+
+    speculator, text = _speculate_then_speak(game, "그냥 다들 비슷해 보여요", "음 다들 비슷하네요")
+
+    assert text is None
+    assert speculator.misses == 1 and speculator.hits == 0
+    assert "s1" not in speculator._jobs
+
+def test_same_draft_does_not_restart(monkeypatch, discussion_game):
+    _fake_generation(monkeypatch)
+    game = discussion_game(["Bot_1", HUMAN, "Bot_2", "Bot_3", "Bot_4"])
+    game.handle_discussion("Bot_3 설명이 좀 애매했어요")
+    speculator = DiscussionSpeculator(depth=2)
+
+    async def run():
+        assert speculator.start("s1", game, HUMAN, _discussion_kwargs, "안녕하세요")
+        assert not speculator.start("s1", game, HUMAN, _discussion_kwargs, "  안녕하세요 ")
+        assert speculator.start("s1", game, HUMAN, _discussion_kwargs, "안녕하세요!")
+        speculator.cancel("s1")
+
+    asyncio.run(run())
+    assert speculator.started == 4
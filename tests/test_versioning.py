@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import backend.db as db
+import backend.server as server
+from backend.session_cache import session_cache
+
+from .conftest import HUMAN, FakeConn, make_game, use_fake_db
+
+def _update_params(conn):
+    [params] = [params for sql, params in conn.executed if "update sessions" in sql]
+    return params
+
+def _buffer():
+    events = db.EventBuffer("s1")
+    events.add("AI_DESCRIPTION", {"by": "Bot_1", "text": "설명"})
+    return events
+
+def test_save_bumps_version(monkeypatch):
+    conn = use_fake_db(monkeypatch, FakeConn(version=4, inserted=[{"seq": 1, "ts": None}]))
+    state = {"participantName": HUMAN}
+    events = _buffer()
+
+    version = asyncio.run(db.save_session_state("s1", state, events, expected_version=3))
+
+    assert version == state["version"] == 4
+    # 읽었던 버전이 조건으로 들어간다
+    assert _update_params(conn)[-2:] == (3, 3)
+    assert conn.ran("insert into events")
+    assert len(events) == 0
+
+def test_conflict_writes_nothing_else(monkeypatch):
+    conn = use_fake_db(monkeypatch, FakeConn(version=None))
+    events = _buffer()
+
+    with pytest.raises(db.VersionConflict):
+        asyncio.run(db.save_session_state("s1", {}, events, enqueue_job=True, expected_version=3, snapshot=b"x"))
+
+    assert not conn.ran("insert into events")
+    assert not conn.ran("insert into ai_jobs")
+    assert not conn.ran("session_snapshots")
+    # 저장되지 않은 이벤트는 버리지 않는다
+    assert len(events) == 1
+
+def test_missing_session(monkeypatch):
+    use_fake_db(monkeypatch, FakeConn(version=None, exists=False))
+
+    with pytest.raises(KeyError):
+        asyncio.run(db.save_session_state("s1", {}, expected_version=3))
+
+def test_stale_save_returns_409_and_drops_cache(monkeypatch):
+    monkeypatch.setattr(server, "SESSION_CACHE_ENABLED", True)
+    conn = use_fake_db(monkeypatch, FakeConn(version=4))
+    game = make_game()
+    state = {"participantName": HUMAN, "version": 3}
+
+    asyncio.run(server._save_session("s-cas", game, state, db.EventBuffer("s-cas"), full=True))
+    assert session_cache.get("s-cas").version == 4
+
+    # 그 사이 다른 프로세스가 먼저 저장함
+    conn.version = None
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(server._save_session("s-cas", game, state, db.EventBuffer("s-cas")))
+
+    assert e.value.status_code == 409
+    assert session_cache.get("s-cas") is None
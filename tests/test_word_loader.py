@@ -0,0 +1,42 @@
+import json
+from collections import Counter
+
+import pytest
+
+from utils.word_loader import WordLoader, export_compact
+
+WORDS = {"동물": ["고양이", "강아지", "토끼"], "과일": ["사과", "배"], "탈것": ["버스"]}
+ALL = {w for words in WORDS.values() for w in words}
+
+@pytest.fixture(params=["json", "tsv"])
+def loader(request, tmp_path):
+    if request.param == "json":
+        path = tmp_path / "words.json"
+        path.write_text(json.dumps(WORDS, ensure_ascii=False), encoding="utf-8")
+    else:
+        path = tmp_path / "words.tsv"
+        export_compact(WORDS, str(path))
+    return WordLoader(str(path))
+
+def test_sample_without_exclude(loader):
+    assert loader.categories == tuple(WORDS)
+    for _ in range(50):
+        category, keyword = loader.get_random_topic_and_keyword()
+        assert keyword in WORDS[category]
+
+def test_exclude_skips_used_words(loader):
+    used = ALL - {"토끼", "배"}
+    seen = Counter(loader.get_random_topic_and_keyword(exclude=used) for _ in range(200))
+    assert set(seen) == {("동물", "토끼"), ("과일", "배")}
+
+def test_exhausted_category_is_not_chosen(loader):
+    used = set(WORDS["동물"]) | set(WORDS["탈것"])
+    for _ in range(50):
+        category, keyword = loader.get_random_topic_and_keyword(exclude=used)
+        assert category == "과일"
+        assert keyword not in used
+
+def test_everything_used_starts_over(loader):
+    category, keyword = loader.get_random_topic_and_keyword(exclude=ALL)
+    # 남은 제시어가 없으면 제외 목록을 무시 (호출자가 목록을 비운다)
+    assert keyword in WORDS[category]
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+import backend.server as server
+import backend.worker as worker
+from backend.serialize import serialize_game
+
+from .conftest import HUMAN, make_game
+
+class FakeJobs:
+    """claim_ai_job / finish_ai_job / touch_ai_job 대역"""
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.finished = []
+        self.touched = []
+
+    async def claim(self, lease_seconds):
+        return self.jobs.pop(0) if self.jobs else None
+
+    async def finish(self, job_id, error=None, max_attempts=3):
+        self.finished.append((job_id, error))
+
+    async def touch(self, job_id):
+        self.touched.append(job_id)
+
+@pytest.fixture
+def jobs(monkeypatch):
+    fake = FakeJobs([{"id": 1, "session_id": "s1", "attempts": 1}])
+    monkeypatch.setattr(worker, "claim_ai_job", fake.claim)
+    monkeypatch.setattr(worker, "finish_ai_job", fake.finish)
+    monkeypatch.setattr(worker, "touch_ai_job", fake.touch)
+    monkeypatch.setattr(worker, "AI_WORKER_POLL_INTERVAL", 0.01)
+    return fake
+
+def _run_worker(handler, until):
+    async def run():
+        task = asyncio.create_task(worker._worker_loop(0, handler))
+        for _ in range(200):
+            if until():
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+def test_successful_job_is_completed_by_the_handler(jobs, monkeypatch):
+    monkeypatch.setattr(worker, "AI_JOB_LEASE_SECONDS", 0.03)
+    handled = []
+
+    async def handler(session_id, job_id):
+        await asyncio.sleep(0.05)  # lease보다 오래 걸림 -> 갱신돼야 함
+        handled.append((session_id, job_id))
+
+    _run_worker(handler, lambda: handled)
+    assert handled == [("s1", 1)]
+    assert jobs.finished == []        # 완료 표시는 핸들러(저장 트랜잭션) 몫
+    assert jobs.touched and set(jobs.touched) == {1}
+
+def test_failed_job_is_released_for_retry(jobs):
+    async def handler(session_id, job_id):
+        raise RuntimeError("boom")
+
+    _run_worker(handler, lambda: jobs.finished)
+    assert jobs.finished == [(1, "boom")]
+
+class FakeLock:
+    def __init__(self, log):
+        self.log = log
+
+    async def release(self):
+        self.log.append("release")
+
+def _patch_session(monkeypatch, game, log):
+    state = {"participantName": HUMAN, "version": 3}
+
+    async def acquire(session_id):
+        log.append("acquire")
+        return FakeLock(log)
+
+    async def load(session_id):
+        return game, state
+
+    monkeypatch.setattr(server, "_acquire_session_lock", acquire)
+    monkeypatch.setattr(server, "_load_session", load)
+
+def test_advance_session_completes_job_in_the_save_transaction(monkeypatch):
+    log = []
+    game = make_game()
+    _patch_session(monkeypatch, game, log)
+
+    async def run_ai(game, human_name, events, *args, **kwargs):
+        events.add("AI_DESCRIPTION", {"by": "Bot_1", "text": "..."})
+
+    async def save(session_id, state, events=None, **kwargs):
+        log.append(("save", kwargs.get("complete_job")))
+        return state.get("version", 0) + 1
+
+    monkeypatch.setattr(server, "_run_ai_until_human", run_ai)
+    monkeypatch.setattr(server, "save_session_state", save)
+    monkeypatch.setattr(server, "notify_job_enqueued", lambda: None)
+
+    asyncio.run(server.advance_session("s1", 7))
+    assert log == ["acquire", ("save", 7), "release"]
+
+def test_advance_session_without_ai_turns_finishes_job_under_the_lock(monkeypatch):
+    log = []
+    _patch_session(monkeypatch, make_game(), log)
+
+    async def run_ai(*args, **kwargs):
+        pass
+
+    async def finish(job_id, error=None, max_attempts=3):
+        log.append(("finish", job_id))
+
+    monkeypatch.setattr(server, "_run_ai_until_human", run_ai)
+    monkeypatch.setattr(server, "finish_ai_job", finish)
+
+    asyncio.run(server.advance_session("s1", 7))
+    assert log == ["acquire", ("finish", 7), "release"]
+
+def test_queue_mode_noop_is_read_only(monkeypatch):
+    game = make_game()
+    calls = {}
+
+    async def forbidden(*args, **kwargs):
+        raise AssertionError("queue-mode noop must not lock or write")
+
+    async def get_state(session_id):
+        return {"participantName": HUMAN, "version": 3, "game": serialize_game(game)}
+
+    async def events_after(session_id, after, types):
+        calls["after"] = after
+        return []
+
+    async def last_seq(session_id):
+        return 42
+
+    async def job_status(session_id):
+        return "running"
+
+    monkeypatch.setattr(server, "AI_WORKER_MODE", "queue")
+    monkeypatch.setattr(server, "_acquire_session_lock", forbidden)
+    monkeypatch.setattr(server, "save_session_state", forbidden)
+    monkeypatch.setattr(server, "get_session_state", get_state)
+    monkeypatch.setattr(server, "get_events_after", events_after)
+    monkeypatch.setattr(server, "get_last_event_seq", last_seq)
+    monkeypatch.setattr(server, "get_ai_job_status", job_status)
+
+    out = asyncio.run(server._step(server.StepReq(sessionId="s1", action={"type": "noop"}), stream=True))
+    assert out["pending"] is True
+    assert out["cursor"] == 42 and calls["after"] == 42
+    assert out["messages"] == []
@@ -1,6 +1,10 @@
 import json
+import mmap
 import random
 import os
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 
 # 현재 파일 word_loader.py를 기준으로 data/words.json 위치를 찾는다.
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -9,29 +13,138 @@ DATA_FILE_PATH = os.path.join(BASE_DIR, '..', 'data', 'words.json')
 class WordLoader:
     """
     JSON 파일에서 단어 목록을 로드하고 무작위 단어를 제공하는 클래스
+
+    - .json: {"카테고리": ["제시어", ...]} 형식 (기본)
+    - .tsv : "카테고리\\t제시어" 한 줄씩 기록한 압축 형식. mmap으로 열고 줄 오프셋만 인덱싱한다.
+      (game/config.py WORD_BANK_PATH로 지정, export_compact로 생성)
+
+    제시어는 카테고리 순서대로 전역 번호(position)를 가진다. 제외 목록은 hash(제시어) 정렬 배열로
+    번호를 찾아서, 전체를 훑지 않고 제외 목록 크기에 비례하는 시간에 남은 후보 중 하나를 고른다.
     """
     def __init__(self, file_path:str=DATA_FILE_PATH):
+        self._words: tuple[str, ...] = ()
+        self._mm: mmap.mmap | None = None
+        self._offsets = array("Q")       # .tsv: position -> 제시어 시작 오프셋
+        self._starts = array("Q")        # 카테고리별 첫 position
+        self.categories: tuple[str, ...] = ()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.word_data = json.load(f)
-            if not self.word_data:
-                raise ValueError("단어 파일이 비어있습니다.")
+            if file_path.endswith(".tsv"):
+                self._load_compact(file_path)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if not data:
+                    raise ValueError("단어 파일이 비어있습니다.")
+                self._load_words({category: words for category, words in data.items() if words})
         except FileNotFoundError:
             print(f"오류: {file_path} 파일을 찾을 수 없습니다.")
             print("현재 경로:", os.getcwd())
-            self.word_data = {}
         except json.JSONDecodeError:
             print(f"오류: {file_path} 파일의 형식이 올바르지 않습니다.")
-            self.word_data = {}
+        self._build_index()
+
+    def _load_words(self, data: dict[str, list[str]]):
+        words: list[str] = []
+        for category, items in data.items():
+            self._starts.append(len(words))
+            words.extend(items)
+        self._words = tuple(words)
+        self.categories = tuple(data.keys())
+
+    def _load_compact(self, file_path: str):
+        with open(file_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mm
+        categories: list[str] = []
+        pos = 0
+        size = mm.size()
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end == -1:
+                end = size
+            tab = mm.find(b"\t", pos, end)
+            if tab != -1:
+                category = mm[pos:tab].decode("utf-8")
+                # export_compact는 카테고리별로 이어서 쓴다
+                if not categories or categories[-1] != category:
+                    categories.append(category)
+                    self._starts.append(len(self._offsets))
+                self._offsets.append(tab + 1)
+            pos = end + 1
+        self.categories = tuple(categories)
+
+    def _build_index(self):
+        # (hash, position)을 hash 순으로: 제외할 제시어의 position을 bisect로 찾는다
+        pairs = sorted((hash(self._word(i)), i) for i in range(self._total()))
+        self._hashes = array("q", (h for h, _ in pairs))
+        self._hash_positions = array("Q", (i for _, i in pairs))
+
+    def _total(self) -> int:
+        return len(self._offsets) if self._mm is not None else len(self._words)
+
+    def _word(self, position: int) -> str:
+        if self._mm is None:
+            return self._words[position]
+        offset = self._offsets[position]
+        end = self._mm.find(b"\n", offset)
+        if end == -1:
+            end = self._mm.size()
+        return self._mm[offset:end].decode("utf-8").rstrip("\r")
 
-    def get_random_topic_and_keyword(self) -> tuple[str,str] | tuple[None,None]:
+    def _bounds(self, c: int) -> tuple[int, int]:
+        """카테고리 c의 position 범위 [start, end)"""
+        end = self._starts[c + 1] if c + 1 < len(self._starts) else self._total()
+        return self._starts[c], end
+
+    def _positions(self, word: str) -> list[int]:
+        h = hash(word)
+        lo = bisect_left(self._hashes, h)
+        hi = bisect_right(self._hashes, h, lo)
+        # 해시 충돌은 실제 단어로 확인
+        return [p for p in self._hash_positions[lo:hi] if self._word(p) == word]
+
+    def get_random_topic_and_keyword(self, exclude: set[str] | None = None) -> tuple[str,str] | tuple[None,None]:
         """
         무작위 카테고리와 해당 카테고리의 무작위 제시어를 반환한다.
+        :param exclude: 이미 사용한 제시어 (참가자별 중복 방지). 남은 제시어가 없으면 무시한다
+                        (이 경우 돌려준 제시어가 exclude에 들어 있으므로 호출자는 새 주기로 목록을 비운다).
         :return: (카테고리, 제시어) 튜플. 데이터 로드 실패 시 (None, None)
         """
-        if not self.word_data:
+        if not self.categories:
             return None, None
-        category = random.choice(list(self.word_data.keys()))
-        keyword = random.choice(self.word_data[category])
 
-        return category, keyword
+        # 카테고리별 제외된 position (정렬)
+        excluded: dict[int, list[int]] = {}
+        for word in exclude or ():
+            for p in self._positions(word):
+                excluded.setdefault(bisect_right(self._starts, p) - 1, []).append(p)
+
+        candidates = [
+            c for c in range(len(self.categories))
+            if self._bounds(c)[1] - self._bounds(c)[0] > len(excluded.get(c, ()))
+        ]
+        if not candidates:
+            excluded, candidates = {}, range(len(self.categories))
+
+        c = random.choice(candidates)
+        start, end = self._bounds(c)
+        skipped = sorted(excluded.get(c, ()))
+        # 남은 후보 중 r번째: 앞에 있는 제외 position 수만큼 밀어낸다
+        position = start + random.randrange(end - start - len(skipped))
+        for p in skipped:
+            if p > position:
+                break
+            position += 1
+        return self.categories[c], self._word(position)
+
+def export_compact(word_data: dict[str, list[str]], file_path: str):
+    """JSON 단어 사전을 mmap용 .tsv 압축 형식으로 저장한다."""
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+        for category, words in word_data.items():
+            for word in words:
+                f.write(f"{category}\t{word}\n")
+
+@lru_cache(maxsize=None)
+def get_word_loader(file_path: str = DATA_FILE_PATH) -> WordLoader:
+    """프로세스당 한 번만 로드되는 공유 WordLoader (첫 사용 시 로드)"""
+    return WordLoader(file_path)